@@ -0,0 +1 @@
+"""Awaaz AI Service performance benchmarks"""
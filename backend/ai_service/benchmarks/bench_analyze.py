@@ -0,0 +1,138 @@
+"""
+Benchmark: ingest latency of /api/v1/analyze vs. the four separate calls
+
+Replays what the Node middleware does for each new complaint - /classify,
+then /prioritize with the returned category, /sentiment and /embed, one
+after the other - against a single /api/v1/analyze call per complaint.
+Both flows go through the ASGI app in process (JSON encode/decode,
+validation, middleware), so the difference excludes network round trips,
+which only widen it.
+
+Models are the deterministic stubs from ``benchmarks/stub_models.py``.
+Every request uses a different complaint so neither flow is answered
+from the classification or embedding cache. ``--cascade`` serves
+classification from a student head fitted on the stub embeddings of
+held-out complaints (their corpus category standing in for the teacher
+label), escalating to the zero-shot stub below ``--cascade-threshold``.
+
+Usage:
+    python -m benchmarks.bench_analyze
+    python -m benchmarks.bench_analyze --requests 200 --cost-scale 0.5
+    python -m benchmarks.bench_analyze --cascade
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.stub_models import install_stubs
+
+
+def separate_calls(client, complaint: dict):
+    classification = client.post("/api/v1/classify", json={
+        'text': complaint['text'], 'title': complaint['title']
+    }).json()
+    client.post("/api/v1/prioritize", json={
+        'issue_id': complaint['id'],
+        'category': classification['primary_category'],
+        'location_density': complaint['location_density'],
+        'citizen_upvotes': complaint['citizen_upvotes'],
+        'age_hours': complaint['age_hours'],
+        'safety_rating': complaint['safety_rating']
+    }).raise_for_status()
+    client.post("/api/v1/sentiment", json=[complaint['text']]).raise_for_status()
+    client.post("/api/v1/embed", json={'texts': [f"{complaint['title']}. {complaint['text']}"]}).raise_for_status()
+
+
+def single_call(client, complaint: dict):
+    response = client.post("/api/v1/analyze", json={
+        'issue_id': complaint['id'],
+        'text': complaint['text'],
+        'title': complaint['title'],
+        'location_density': complaint['location_density'],
+        'citizen_upvotes': complaint['citizen_upvotes'],
+        'age_hours': complaint['age_hours'],
+        'safety_rating': complaint['safety_rating']
+    })
+    response.raise_for_status()
+    return response.json()['timings_ms']
+
+
+def summarize(latencies: list) -> dict:
+    latencies = np.asarray(latencies) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'mean_ms': round(float(latencies.mean()), 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-call /analyze vs. four calls per complaint")
+    parser.add_argument("--requests", type=int, default=100, help="Complaints per flow")
+    parser.add_argument("--cost-scale", type=float, default=1.0, help="Multiplier on stub model costs (0 = free)")
+    parser.add_argument("--cascade", action="store_true", help="Classify with a distilled student head first")
+    parser.add_argument("--cascade-threshold", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("JOBS_DIR", "/tmp/awaaz-bench-jobs")
+    logging.disable(logging.INFO)
+    from fastapi.testclient import TestClient
+    import main as service
+    from services.distillation import StudentHead
+
+    install_stubs(service.classifier, service.clustering, service.sentiment, cost_scale=args.cost_scale)
+    # Two disjoint sets of complaints so the flows never share cache entries
+    corpus = [c for c in generate_corpus(4 * args.requests, seed=args.seed, duplicate_rate=0) if c['text']]
+    separate_corpus, single_corpus = corpus[:args.requests], corpus[args.requests:2 * args.requests]
+
+    with TestClient(service.app) as client:
+        while not service.model_loader.is_ready():
+            time.sleep(0.05)
+        if args.cascade:
+            training = corpus[2 * args.requests:]
+            head = StudentHead.fit(
+                service.clustering.get_embedding_matrix([f"{c['title']}. {c['text']}" for c in training]),
+                [c['category'] for c in training],
+                embedding_model=service.clustering.model_name
+            )
+            service.classifier.enable_cascade(head, service.clustering.get_embeddings, threshold=args.cascade_threshold)
+            service.clustering.cache.clear()
+        warmup = corpus[2 * args.requests:2 * args.requests + 4]
+        for complaint in warmup:
+            separate_calls(client, complaint)
+            single_call(client, dict(complaint, id=complaint['id'] + "-warm", text=complaint['text'] + " again"))
+
+        separate, single, stage_timings = [], [], []
+        for complaint in separate_corpus:
+            started = time.perf_counter()
+            separate_calls(client, complaint)
+            separate.append(time.perf_counter() - started)
+        for complaint in single_corpus:
+            started = time.perf_counter()
+            stage_timings.append(single_call(client, complaint))
+            single.append(time.perf_counter() - started)
+
+    report = {
+        'requests': args.requests,
+        'cost_scale': args.cost_scale,
+        'cascade': service.classifier.get_cascade_stats() if args.cascade else None,
+        'separate_calls': summarize(separate),
+        'analyze': summarize(single),
+        'analyze_stage_p50_ms': {
+            name: round(float(np.median([timings[name] for timings in stage_timings])), 2)
+            for name in stage_timings[0]
+        }
+    }
+    report['latency_reduction_p50'] = round(1 - report['analyze']['p50_ms'] / report['separate_calls']['p50_ms'], 3)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: cost and accuracy of sampled cluster quality
+
+For each size, clusters synthetic MiniLM-like embeddings with the tiled
+threshold engine, then reports:
+
+* clustering wall time vs. sampled quality wall time (overhead share)
+  at each ``--budgets`` value
+* the estimates and their confidence intervals
+* for sizes up to ``--exact-max``, the exact silhouette / cohesion /
+  separation over every merged issue and the share of ``--repeats``
+  differently seeded samples whose interval covers it
+
+Usage:
+    python -m benchmarks.bench_cluster_quality
+    python -m benchmarks.bench_cluster_quality --sizes 10000 100000 --budgets 5000000 20000000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks.bench_clustering import synthetic_embeddings
+from services.cluster_quality import sampled_cluster_quality
+from services.graph_clustering import threshold_components
+
+METRICS = ("silhouette", "cohesion", "separation")
+
+
+def run_size(n: int, args) -> dict:
+    X = synthetic_embeddings(n, seed=args.seed)
+    started = time.perf_counter()
+    labels = threshold_components(X, args.threshold)
+    cluster_seconds = time.perf_counter() - started
+    _, labels = np.unique(labels, return_inverse=True)
+
+    result = {
+        'n': n,
+        'clusters': int(labels.max() + 1),
+        'cluster_seconds': round(cluster_seconds, 3),
+        'budgets': {}
+    }
+
+    exact = None
+    if n <= args.exact_max:
+        exact = sampled_cluster_quality(X, labels, budget=np.iinfo(np.int64).max, max_sample=n)
+        result['exact'] = {metric: exact[metric]['mean'] for metric in METRICS}
+        result['exact_seconds'] = exact['seconds']
+
+    for budget in args.budgets:
+        sampled = sampled_cluster_quality(X, labels, budget=budget, max_sample=args.max_sample, seed=args.seed)
+        if sampled is None:
+            result['budgets'][str(budget)] = None
+            continue
+        entry = {
+            'sample_size': sampled['sample_size'],
+            'quality_seconds': sampled['seconds'],
+            'overhead': round(sampled['seconds'] / cluster_seconds, 4),
+            **{metric: sampled[metric] for metric in METRICS}
+        }
+        if exact is not None:
+            covered = {metric: 0 for metric in METRICS}
+            for seed in range(args.repeats):
+                repeat = sampled_cluster_quality(X, labels, budget=budget, max_sample=args.max_sample, seed=seed)
+                for metric in METRICS:
+                    covered[metric] += repeat[metric]['ci_low'] <= exact[metric]['mean'] <= repeat[metric]['ci_high']
+            entry['ci_coverage'] = {metric: round(count / args.repeats, 3) for metric, count in covered.items()}
+        result['budgets'][str(budget)] = entry
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sampled silhouette / cohesion / separation: cost and CI coverage")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--budgets", type=int, nargs="+", default=[2000000, 20000000])
+    parser.add_argument("--max-sample", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.75)
+    parser.add_argument("--exact-max", type=int, default=20000, help="Largest size to compute the exact metrics for")
+    parser.add_argument("--repeats", type=int, default=100, help="Seeds per budget for interval coverage")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(json.dumps([run_size(n, args) for n in args.sizes], indent=2))
+
+
+if __name__ == "__main__":
+    main()
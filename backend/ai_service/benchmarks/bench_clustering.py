@@ -0,0 +1,120 @@
+"""
+Benchmark: tiled cosine-threshold clustering vs. the previous DBSCAN path
+
+Each engine runs in a fresh subprocess so its peak RSS can be reported in
+isolation. The previous path is reproduced as it was: float64 array,
+Euclidean DBSCAN with eps = 1 - similarity_threshold. Its partition is
+also compared against the exact cosine-threshold criterion the API
+promises.
+
+Usage:
+    python -m benchmarks.bench_clustering --sizes 10000 50000 100000
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+
+def synthetic_embeddings(n: int, dim: int = 384, seed: int = 0) -> np.ndarray:
+    """Unnormalized embeddings with near-duplicate groups, like MiniLM output"""
+    rng = np.random.default_rng(seed)
+    topics = max(1, n // 5)
+    centers = rng.normal(size=(topics, dim)).astype(np.float32)
+    X = centers[rng.integers(0, topics, n)]
+    X += 0.25 * rng.standard_normal(X.shape, dtype=np.float32)
+    # MiniLM vectors are not unit length
+    X *= rng.uniform(0.5, 2.0, size=(n, 1)).astype(np.float32)
+    return X
+
+
+def run_engine(engine: str, n: int, threshold: float, budget_mb: float) -> dict:
+    X = synthetic_embeddings(n)
+
+    if engine == "dbscan":
+        from sklearn.cluster import DBSCAN
+
+        def cluster(data):
+            return DBSCAN(eps=1 - threshold, min_samples=1).fit_predict(np.array(data.tolist()))
+    else:
+        from services.graph_clustering import threshold_components
+
+        def cluster(data):
+            return threshold_components(data, threshold, memory_budget_mb=budget_mb)
+
+    # Warm up BLAS and lazy imports outside the timed region
+    cluster(X[:64])
+
+    started = time.perf_counter()
+    labels = cluster(X)
+    seconds = time.perf_counter() - started
+    np.save(f"/tmp/bench_clustering_{engine}_{n}.npy", labels)
+
+    return {
+        'engine': engine,
+        'n': n,
+        'seconds': round(seconds, 3),
+        'clusters': int(len(np.unique(labels))),
+        # ru_maxrss is KiB on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+
+def same_partition(a: np.ndarray, b: np.ndarray) -> bool:
+    pairs = np.unique(np.stack([a, b], axis=1), axis=0)
+    return len(pairs) == len(np.unique(a)) == len(np.unique(b))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clustering engine wall time and peak RSS")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--threshold", type=float, default=0.75)
+    parser.add_argument("--budget-mb", type=float, default=256)
+    parser.add_argument("--engines", nargs="+", default=["dbscan", "tiled"])
+    parser.add_argument("--worker", nargs=2, metavar=("ENGINE", "N"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        engine, n = args.worker
+        print(json.dumps(run_engine(engine, int(n), args.threshold, args.budget_mb)))
+        return
+
+    results = []
+    for n in args.sizes:
+        for engine in args.engines:
+            output = subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.bench_clustering",
+                    "--worker", engine, str(n),
+                    "--threshold", str(args.threshold),
+                    "--budget-mb", str(args.budget_mb)
+                ],
+                capture_output=True,
+                text=True
+            )
+            if output.returncode != 0:
+                results.append({'engine': engine, 'n': n, 'error': output.stderr.strip().splitlines()[-1:]})
+                continue
+            results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+        if set(args.engines) >= {"dbscan", "tiled"}:
+            try:
+                dbscan = np.load(f"/tmp/bench_clustering_dbscan_{n}.npy")
+                tiled = np.load(f"/tmp/bench_clustering_tiled_{n}.npy")
+                results.append({
+                    'n': n,
+                    'dbscan_matches_cosine_threshold': bool(same_partition(dbscan, tiled))
+                })
+            except FileNotFoundError:
+                pass
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
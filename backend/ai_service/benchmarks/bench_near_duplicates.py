@@ -0,0 +1,144 @@
+"""
+Benchmark: MinHash-LSH near-duplicate prefilter ahead of embedding + clustering
+
+Runs the /cluster pipeline over the synthetic complaint corpus twice, with
+and without the prefilter, and reports:
+
+* grouping throughput of ``near_duplicate_groups`` (partitioned by
+  category and geohash cell, as the API does)
+* texts sent to the encoder, and embed + cluster wall time, both ways
+* recall of the corpus' planted duplicates per variant (exact, edited,
+  reordered) and the false-merge rate: the share of complaints grouped
+  with a complaint that is not a copy of the same original
+
+The encoder is the deterministic stub from ``benchmarks/stub_models.py``,
+which costs what MiniLM would per padded token (``--cost-scale`` scales
+it), so the numbers compare across machines with and without the weights.
+
+Usage:
+    python -m benchmarks.bench_near_duplicates
+    python -m benchmarks.bench_near_duplicates --n 20000 --duplicate-rate 0.3 --thresholds 0.7 0.8 0.9
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.stub_models import install_stubs
+from services.clustering import ClusteringService, cluster_embeddings
+from services.model_registry import ModelRegistry
+from services.near_duplicates import expand_labels, group_stats, near_duplicate_groups
+from services.sharded_clustering import shard_keys
+
+VARIANTS = ("exact", "edited", "reordered")
+
+
+def embed_and_cluster(clustering: ClusteringService, texts, similarity_threshold: float, batch_size: int):
+    """Embed texts in request-sized batches and cluster them; returns (labels, seconds)"""
+    started = time.perf_counter()
+    matrix = np.concatenate([
+        clustering.get_embedding_matrix(texts[start:start + batch_size])
+        for start in range(0, len(texts), batch_size)
+    ])
+    clusters = cluster_embeddings(matrix, similarity_threshold, clustering.memory_budget_mb)
+    labels = np.empty(len(texts), dtype=np.int64)
+    for cluster in clusters:
+        labels[cluster['members']] = cluster['cluster_id']
+    return labels, time.perf_counter() - started
+
+
+def duplicate_quality(corpus, groups: np.ndarray) -> dict:
+    """Per-variant recall of planted duplicates and the false-merge rate"""
+    index = {complaint['id']: idx for idx, complaint in enumerate(corpus)}
+    origin = np.array([index[complaint.get('duplicate_of', complaint['id'])] for complaint in corpus])
+
+    recall = {}
+    for variant in VARIANTS:
+        copies = np.array([idx for idx, complaint in enumerate(corpus) if complaint.get('variant') == variant])
+        if len(copies):
+            recall[variant] = round(float(np.mean(groups[copies] == groups[origin[copies]])), 4)
+    return {
+        'duplicates': int(sum(1 for complaint in corpus if 'duplicate_of' in complaint)),
+        'recall': recall,
+        'false_merge_rate': round(float(np.mean(origin[groups] != origin)), 4)
+    }
+
+
+def run(args) -> dict:
+    corpus = generate_corpus(args.n, seed=args.seed, duplicate_rate=args.duplicate_rate)
+    texts = [complaint['text'] for complaint in corpus]
+    partitions = shard_keys(
+        [(complaint['latitude'], complaint['longitude']) for complaint in corpus],
+        [complaint['category'] for complaint in corpus],
+        args.geohash_precision
+    )
+
+    clustering = ClusteringService(registry=ModelRegistry())
+    install_stubs(clustering=clustering, cost_scale=args.cost_scale)
+    clustering.load_models()
+    # Warm up lazy imports outside the timed regions
+    near_duplicate_groups(texts[:64])
+    clustering.get_embedding_matrix(texts[:8])
+
+    baseline_labels, baseline_seconds = embed_and_cluster(
+        clustering, texts, args.similarity_threshold, args.batch_size
+    )
+    report = {
+        'n': args.n,
+        'duplicate_rate': args.duplicate_rate,
+        'cost_scale': args.cost_scale,
+        'without_prefilter': {
+            'texts_embedded': len(texts),
+            'embed_cluster_seconds': round(baseline_seconds, 3),
+            'cluster_count': int(baseline_labels.max() + 1)
+        },
+        'thresholds': {}
+    }
+
+    for threshold in args.thresholds:
+        started = time.perf_counter()
+        groups = near_duplicate_groups(texts, threshold=threshold, partitions=partitions)
+        group_seconds = time.perf_counter() - started
+
+        representatives = np.unique(groups)
+        labels, seconds = embed_and_cluster(
+            clustering, [texts[idx] for idx in representatives], args.similarity_threshold, args.batch_size
+        )
+        labels = expand_labels(labels, groups, representatives)
+        total = group_seconds + seconds
+
+        report['thresholds'][str(threshold)] = {
+            **group_stats(groups),
+            'group_seconds': round(group_seconds, 3),
+            'group_throughput_per_s': round(args.n / group_seconds, 1),
+            'texts_embedded': len(representatives),
+            'encoder_reduction': round(1 - len(representatives) / len(texts), 4),
+            'embed_cluster_seconds': round(seconds, 3),
+            'total_seconds': round(total, 3),
+            'speedup': round(baseline_seconds / total, 3),
+            'cluster_count': int(labels.max() + 1),
+            **duplicate_quality(corpus, groups)
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-duplicate prefilter: encoder savings and duplicate recall")
+    parser.add_argument("--n", type=int, default=10000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.1)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.7, 0.8, 0.9])
+    parser.add_argument("--similarity-threshold", type=float, default=0.75)
+    parser.add_argument("--geohash-precision", type=int, default=6)
+    parser.add_argument("--batch-size", type=int, default=64, help="Texts per encoder call")
+    parser.add_argument("--cost-scale", type=float, default=1.0, help="Multiplier on stub encoder cost (0 = free)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
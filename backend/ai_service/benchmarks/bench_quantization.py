@@ -0,0 +1,224 @@
+"""
+Benchmark: fp32 vs. int8 dynamic quantization on labelled civic complaints
+
+Loads each transformer twice, once in fp32 and once with
+``quantization="int8"``, and runs both over the same labelled sample:
+
+* classifier: accuracy against the ``category`` label, agreement with fp32
+* sentiment: accuracy against the ``sentiment`` label, agreement with fp32
+* embeddings: cosine similarity between fp32 and int8 vectors and how often
+  the nearest neighbour of each complaint is unchanged
+
+For every model the load time (cold quantization and warm load from
+``--cache-dir``), serialized size and per-batch latency (mean / p95) are
+reported. Run it on a CPU host: on GPU the services load fp32 either way.
+
+Usage:
+    python -m benchmarks.bench_quantization
+    python -m benchmarks.bench_quantization --input complaints.jsonl --repeat 5
+
+Input is a JSON array or JSON-lines file with 'title', 'description' (or
+'text') and optionally 'category' and 'sentiment' labels; the default is
+the small hand-labelled sample in ``benchmarks/data``.
+"""
+
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from services.classifier import ClassificationService
+from services.clustering import ClusteringService
+from services.model_registry import ModelRegistry
+from services.sentiment import SentimentService
+
+DEFAULT_INPUT = os.path.join(os.path.dirname(__file__), "data", "civic_complaints.jsonl")
+
+
+def load_sample(path: str, limit: int = None) -> list:
+    """Read labelled complaints from a JSON array or JSON-lines file"""
+    with open(path, encoding="utf-8") as f:
+        content = f.read().strip()
+
+    if content.startswith("["):
+        records = json.loads(content)
+    else:
+        records = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    sample = [
+        {
+            'title': record.get('title', ''),
+            'text': record.get('description') or record.get('text', ''),
+            'category': record.get('category'),
+            'sentiment': record.get('sentiment')
+        }
+        for record in records
+        if record.get('description') or record.get('text')
+    ]
+    return sample[:limit] if limit else sample
+
+
+def serialized_mb(model) -> float:
+    """Size of the model's state dict as torch.save writes it"""
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return round(buffer.tell() / 1e6, 1)
+
+
+def latency(fn, batches, repeat: int) -> tuple:
+    """Run fn over every batch ``repeat`` times; first-pass results and mean / p95 per batch"""
+    fn(batches[0])  # warm up
+    seconds = []
+    results = []
+    for round_idx in range(repeat):
+        for batch in batches:
+            started = time.perf_counter()
+            output = fn(batch)
+            seconds.append(time.perf_counter() - started)
+            if round_idx == 0:
+                results.extend(output)
+    seconds = np.asarray(seconds)
+    return results, {
+        'mean_ms': round(float(seconds.mean()) * 1000, 1),
+        'p95_ms': round(float(np.percentile(seconds, 95)) * 1000, 1)
+    }
+
+
+def timed_load(service) -> float:
+    started = time.perf_counter()
+    service.load_models()
+    return round(time.perf_counter() - started, 2)
+
+
+def accuracy(predicted, expected):
+    pairs = [(p, e) for p, e in zip(predicted, expected) if e]
+    if not pairs:
+        return None
+    return round(sum(p == e for p, e in pairs) / len(pairs), 3)
+
+
+def agreement(a, b) -> float:
+    return round(sum(x == y for x, y in zip(a, b)) / len(a), 3)
+
+
+def bench_classifier(sample, batches, repeat, cache_dir) -> dict:
+    report = {}
+    predictions = {}
+    for mode in ("none", "int8"):
+        service = ClassificationService(quantization=mode, quantized_cache_dir=cache_dir)
+        entry = {'load_seconds': timed_load(service)}
+        if mode == "int8":
+            # Second load, in a fresh registry, reads the quantized module from the cache
+            entry['warm_load_seconds'] = timed_load(ClassificationService(quantization=mode, quantized_cache_dir=cache_dir, registry=ModelRegistry()))
+        entry['serialized_mb'] = serialized_mb(service.zero_shot_classifier.model)
+
+        results, entry['latency'] = latency(service.classify_many, batches, repeat)
+        predictions[mode] = [result['primary_category'] for result in results]
+        entry['accuracy'] = accuracy(predictions[mode], [item['category'] for item in sample])
+        report['fp32' if mode == "none" else mode] = entry
+
+    report['agreement'] = agreement(predictions['none'], predictions['int8'])
+    return report
+
+
+def bench_sentiment(sample, batches, repeat, cache_dir) -> dict:
+    report = {}
+    predictions = {}
+    scores = {}
+    texts = [f"{item['title']}. {item['text']}" for item in sample]
+    text_batches = [[f"{item['title']}. {item['text']}" for item in batch] for batch in batches]
+    for mode in ("none", "int8"):
+        service = SentimentService(quantization=mode, quantized_cache_dir=cache_dir)
+        entry = {'load_seconds': timed_load(service)}
+        if mode == "int8":
+            entry['warm_load_seconds'] = timed_load(SentimentService(quantization=mode, quantized_cache_dir=cache_dir, registry=ModelRegistry()))
+        entry['serialized_mb'] = serialized_mb(service.sentiment_classifier.model)
+
+        results, entry['latency'] = latency(service.analyze_batch, text_batches, repeat)
+        predictions[mode] = [result['sentiment'] for result in results]
+        scores[mode] = np.asarray([result['score'] for result in results])
+        entry['accuracy'] = accuracy(predictions[mode], [item['sentiment'] for item in sample])
+        report['fp32' if mode == "none" else mode] = entry
+
+    report['n'] = len(texts)
+    report['agreement'] = agreement(predictions['none'], predictions['int8'])
+    report['max_score_diff'] = round(float(np.abs(scores['none'] - scores['int8']).max()), 3)
+    return report
+
+
+def nearest_neighbours(matrix: np.ndarray) -> np.ndarray:
+    normed = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    similarity = normed @ normed.T
+    np.fill_diagonal(similarity, -np.inf)
+    return similarity.argmax(axis=1)
+
+
+def bench_embeddings(sample, batches, repeat, cache_dir) -> dict:
+    report = {}
+    matrices = {}
+    text_batches = [[f"{item['title']}. {item['text']}" for item in batch] for batch in batches]
+    for mode in ("none", "int8"):
+        service = ClusteringService(quantization=mode, quantized_cache_dir=cache_dir)
+        entry = {'load_seconds': timed_load(service)}
+        if mode == "int8":
+            entry['warm_load_seconds'] = timed_load(ClusteringService(quantization=mode, quantized_cache_dir=cache_dir, registry=ModelRegistry()))
+        entry['serialized_mb'] = serialized_mb(service.embedder)
+
+        results, entry['latency'] = latency(service.get_embedding_matrix, text_batches, repeat)
+        matrices[mode] = np.asarray(results, dtype=np.float32)
+        report['fp32' if mode == "none" else mode] = entry
+
+    fp32, int8 = matrices['none'], matrices['int8']
+    cosine = (fp32 * int8).sum(axis=1) / (np.linalg.norm(fp32, axis=1) * np.linalg.norm(int8, axis=1))
+    report['cosine_mean'] = round(float(cosine.mean()), 4)
+    report['cosine_min'] = round(float(cosine.min()), 4)
+    report['nearest_neighbour_agreement'] = round(
+        float((nearest_neighbours(fp32) == nearest_neighbours(int8)).mean()), 3
+    )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fp32 vs. int8 dynamic quantization")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="JSON / JSON-lines file of labelled complaints")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the sample")
+    parser.add_argument("--cache-dir", default=None, help="Quantized model cache (a temporary directory by default)")
+    parser.add_argument(
+        "--models", nargs="+", default=["classifier", "sentiment", "embedding"],
+        choices=["classifier", "sentiment", "embedding"]
+    )
+    args = parser.parse_args()
+
+    import torch
+
+    sample = load_sample(args.input, args.limit)
+    batches = [sample[start:start + args.batch_size] for start in range(0, len(sample), args.batch_size)]
+    benches = {
+        'classifier': bench_classifier,
+        'sentiment': bench_sentiment,
+        'embedding': bench_embeddings
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir = args.cache_dir or tmp_dir
+        report = {
+            'n': len(sample),
+            'batch_size': args.batch_size,
+            'torch_threads': torch.get_num_threads()
+        }
+        for name in args.models:
+            report[name] = benches[name](sample, batches, args.repeat, cache_dir)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
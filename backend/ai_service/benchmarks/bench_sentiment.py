@@ -0,0 +1,145 @@
+"""
+Benchmark: keyword sentiment throughput, substring scans vs. compiled matcher
+
+The previous path is reproduced as it was: one substring scan per keyword
+for the score and two more for the keyword list. It is compared against
+the compiled matcher per text (``analyze``) and in one pass over the
+whole batch (``analyze_batch``); ``match_batch_only`` is the matcher scan
+without building result dicts. No transformer is loaded.
+
+With ``--transformer`` the DistilBERT SST-2 model is loaded instead and
+batched ``analyze_batch`` throughput is reported per batch size, together
+with its agreement with per-text ``analyze``.
+
+Usage:
+    python -m benchmarks.bench_sentiment --n 1000000
+    python -m benchmarks.bench_sentiment --transformer --n 2000 --batch-sizes 1 8 16 32 64
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+
+from services.sentiment import SentimentService
+
+FILLER = (
+    "the road near my house has a big pothole and water is leaking from the "
+    "pipe since last week please fix it soon council office staff response "
+    "garbage street light park badminton court drain sewage complaint"
+).split()
+
+
+def synthetic_feedback(n: int, seed: int = 0):
+    """Short feedback texts, about a third containing sentiment keywords"""
+    rng = random.Random(seed)
+    keywords = SentimentService.POSITIVE_KEYWORDS + SentimentService.NEGATIVE_KEYWORDS + SentimentService.NEUTRAL_KEYWORDS
+    texts = []
+    for _ in range(n):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(4, 16))]
+        for _ in range(rng.choice((0, 0, 1, 2))):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        texts.append(" ".join(words).capitalize())
+    return texts
+
+
+def legacy_analyze(text: str) -> dict:
+    """The substring implementation this benchmark replaces"""
+    service = SentimentService
+    text_lower = text.lower()
+    positive = sum(1 for word in service.POSITIVE_KEYWORDS if word in text_lower)
+    negative = sum(1 for word in service.NEGATIVE_KEYWORDS if word in text_lower)
+    neutral = sum(1 for word in service.NEUTRAL_KEYWORDS if word in text_lower)
+    total = positive + negative + neutral
+    score = (positive - negative) / total if total else 0.0
+    keywords = [f"+{word}" for word in service.POSITIVE_KEYWORDS if word in text_lower]
+    keywords += [f"-{word}" for word in service.NEGATIVE_KEYWORDS if word in text_lower]
+    return {'score': round(score, 3), 'keywords': keywords[:5]}
+
+
+def timed(fn, *args):
+    # Like timeit: cyclic GC over millions of result dicts would dominate
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        result = fn(*args)
+        return result, time.perf_counter() - started
+    finally:
+        gc.enable()
+
+
+def bench_transformer(texts, batch_sizes):
+    """Batched transformer sentiment per batch size vs. one text at a time"""
+    service = SentimentService()
+    service.load_models()
+    service.analyze_batch(texts[:32])  # warm up
+
+    reference, reference_seconds = timed(lambda: [service.analyze(text) for text in texts])
+    report = {
+        'n': len(texts),
+        'per_text': {
+            'seconds': round(reference_seconds, 3),
+            'texts_per_second': round(len(texts) / reference_seconds, 1)
+        }
+    }
+    for batch_size in batch_sizes:
+        results, seconds = timed(service.analyze_batch, texts, batch_size)
+        report[f'batch_{batch_size}'] = {
+            'seconds': round(seconds, 3),
+            'texts_per_second': round(len(texts) / seconds, 1),
+            # Padding changes logits only in the last float digits
+            'max_score_diff': max(abs(a['score'] - b['score']) for a, b in zip(results, reference)),
+            'sentiment_mismatches': sum(a['sentiment'] != b['sentiment'] for a, b in zip(results, reference))
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword sentiment throughput")
+    parser.add_argument("--n", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--transformer", action="store_true", help="Benchmark the DistilBERT path instead")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    texts = synthetic_feedback(args.n, args.seed)
+    if args.transformer:
+        # Some long complaints so token-level truncation is exercised
+        texts = [text if i % 50 else " ".join([text] * 40) for i, text in enumerate(texts)]
+        print(json.dumps(bench_transformer(texts, args.batch_sizes), indent=2))
+        return
+
+    service = SentimentService()
+    service.analyze_batch(texts[:1000])  # warm up
+
+    legacy, legacy_seconds = timed(lambda: [legacy_analyze(text) for text in texts])
+    single, single_seconds = timed(lambda: [service.analyze(text) for text in texts])
+    batch, batch_seconds = timed(service.analyze_batch, texts)
+    _, scan_seconds = timed(service.matcher.match_batch, texts)
+
+    assert batch == single, "analyze_batch disagrees with analyze"
+
+    report = {'n': args.n}
+    for name, seconds in (
+        ('substring', legacy_seconds),
+        ('matcher', single_seconds),
+        ('matcher_batch', batch_seconds),
+        ('match_batch_only', scan_seconds)
+    ):
+        report[name] = {
+            'seconds': round(seconds, 3),
+            'texts_per_second': round(args.n / seconds)
+        }
+    report['speedup_batch_vs_substring'] = round(legacy_seconds / batch_seconds, 2)
+    # Texts whose keywords differ, e.g. "badminton" no longer counting as "bad"
+    report['texts_changed_by_word_boundaries'] = sum(
+        1 for old, new in zip(legacy, batch) if old['keywords'] != new['keywords'] or old['score'] != new['score']
+    )
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: IVF vector index vs. the exact find_similar_issues scan
+
+Builds an index over synthetic clustered 384-dim embeddings and reports
+build time, per-query latency (p50/p99) for both paths and recall@k of the
+index against exact search.
+
+Usage:
+    python -m benchmarks.bench_similar --size 1000000 --queries 200
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from services.clustering import ClusteringService
+from services.vector_index import VectorIndex
+
+
+def synthetic_embeddings(n: int, dim: int, topics: int, seed: int = 0) -> np.ndarray:
+    """Gaussian blobs around random topic directions, like complaint embeddings"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(topics, dim)).astype(np.float32)
+    X = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100000):
+        stop = min(n, start + 100000)
+        X[start:stop] = centers[rng.integers(0, topics, stop - start)]
+        X[start:stop] += 0.6 * rng.standard_normal((stop - start, dim), dtype=np.float32)
+    return X
+
+
+def percentiles(samples: list) -> dict:
+    ms = np.asarray(samples) * 1000
+    return {'p50_ms': round(float(np.percentile(ms, 50)), 3), 'p99_ms': round(float(np.percentile(ms, 99)), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ANN index latency and recall benchmark")
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=1024)
+    parser.add_argument("--probe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--exact-queries", type=int, default=20, help="Queries timed on the exact path")
+    args = parser.parse_args()
+
+    X = synthetic_embeddings(args.size, args.dim, args.topics)
+    ids = [f"issue-{i}" for i in range(args.size)]
+    rng = np.random.default_rng(1)
+    queries = X[rng.choice(args.size, args.queries, replace=False)]
+    queries = queries + 0.2 * rng.standard_normal(queries.shape, dtype=np.float32)
+
+    index = VectorIndex(dim=args.dim, n_lists=args.lists, train_threshold=min(args.size, 20000))
+    started = time.perf_counter()
+    for start in range(0, args.size, 50000):
+        index.add(ids[start:start + 50000], X[start:start + 50000])
+    index.wait_for_training()
+    if not index.is_trained:
+        index.train()
+    build_seconds = time.perf_counter() - started
+
+    # Current path: caller ships every embedding, brute-force dot product
+    clustering = ClusteringService()
+    exact_latency = []
+    for query in queries[:args.exact_queries]:
+        started = time.perf_counter()
+        clustering.find_similar_issues(query, X, top_k=args.top_k, min_similarity=-1.0)
+        exact_latency.append(time.perf_counter() - started)
+
+    report = {
+        'size': args.size,
+        'dimension': args.dim,
+        'build_seconds': round(build_seconds, 2),
+        'index': index.get_stats(),
+        'exact_scan': percentiles(exact_latency),
+        'ivf': []
+    }
+
+    for probe in args.probe:
+        latency = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query, top_k=args.top_k, min_similarity=-1.0, n_probe=probe)
+            latency.append(time.perf_counter() - started)
+        report['ivf'].append({
+            'n_probe': probe,
+            **percentiles(latency),
+            f'recall@{args.top_k}': round(index.recall_at_k(queries, args.top_k, n_probe=probe), 4)
+        })
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
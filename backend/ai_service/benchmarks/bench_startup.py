@@ -0,0 +1,124 @@
+"""
+Benchmark: import time, time to first request and time to readiness
+
+Starts the service under uvicorn in a subprocess and polls it: when does
+``/health/live`` first answer, when does a keyword-only request
+(``/api/v1/sentiment`` before the model is loaded) succeed, and when does
+``/health/ready`` turn 200. Runs once with every model loading
+concurrently and once with ``MODEL_LOAD_WORKERS=1`` (one after another,
+as startup used to do). Import cost is measured separately with
+``python -X importtime``.
+
+Usage:
+    python -m benchmarks.bench_startup --timeout 600
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def import_times(modules, top: int = 8) -> dict:
+    """Cumulative import time in seconds of each module, in a fresh interpreter"""
+    report = {}
+    for module in modules:
+        output = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True
+        )
+        if output.returncode != 0:
+            report[module] = {'error': output.stderr.strip().splitlines()[-1:]}
+            continue
+        rows = []
+        for line in output.stderr.splitlines():
+            match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+            if match:
+                rows.append((int(match.group(2)), len(match.group(3)), match.group(4)))
+        total = next(us for us, _, name in reversed(rows) if name == module)
+        # Heaviest packages imported directly by the module
+        children = sorted((row for row in rows if row[1] == 3), reverse=True)[:top]
+        report[module] = {
+            'seconds': round(total / 1e6, 3),
+            'heaviest': {name: round(us / 1e6, 3) for us, _, name in children}
+        }
+    return report
+
+
+def request(url: str, body=None, timeout: float = 5.0):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+
+
+def measure_startup(port: int, timeout: float, env_overrides: dict) -> dict:
+    env = dict(os.environ, **env_overrides)
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    report = {'env': env_overrides}
+    try:
+        while 'live_seconds' not in report:
+            if server.poll() is not None:
+                report['error'] = f"server exited with {server.returncode}"
+                return report
+            try:
+                request(f"{base}/health/live", timeout=1.0)
+                report['live_seconds'] = round(time.perf_counter() - started, 3)
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.05)
+
+        status, _ = request(f"{base}/api/v1/sentiment", ["Great work, thanks for the quick fix"])
+        report['first_keyword_request_seconds'] = round(time.perf_counter() - started, 3)
+        report['first_keyword_request_status'] = status
+
+        while time.perf_counter() - started < timeout:
+            status, body = request(f"{base}/health/ready")
+            if status == 200:
+                report['ready_seconds'] = round(time.perf_counter() - started, 3)
+                report['models'] = body['models']
+                break
+            if any(model['status'] == 'failed' and model['required'] for model in body['models'].values()):
+                report['error'] = "required model failed to load"
+                report['models'] = body['models']
+                break
+            time.sleep(0.25)
+        else:
+            report['error'] = f"not ready after {timeout}s"
+        return report
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service startup latency")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    report = {
+        'imports': import_times(["main", "services.classifier", "torch", "transformers"]),
+        'concurrent_loading': measure_startup(args.port, args.timeout, {}),
+        'sequential_loading': measure_startup(args.port, args.timeout, {'MODEL_LOAD_WORKERS': "1"})
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Benchmark suite: offline throughput and latency of every AI stage
+
+Runs each service entry point over a synthetic civic-complaint corpus
+(``benchmarks/corpus.py``) and reports, per benchmark, throughput in
+items per second and p50 / p99 latency per request:
+
+* classify: ``classify_many`` on requests of ``--request-size`` complaints
+* embed: ``get_embedding_matrix`` on requests of ``--request-size`` texts
+* cluster_1k / cluster_10k / cluster_100k: ``cluster_issues`` on
+  synthetic embeddings (one request = the whole set)
+* sentiment: ``analyze_batch`` on requests of ``--request-size`` texts
+* prioritize: ``calculate_priority`` per issue
+* prioritize_batch: ``calculate_priority_batch`` on 50 requests of 1000 issues
+
+No network access is needed. Models that are cached locally are used
+as is (``--models auto``); the others are replaced by the deterministic
+stubs in ``benchmarks/stub_models.py``, which cost what the real model
+would per padded token. ``--models stub`` forces stubs everywhere, for
+numbers that compare across machines with and without the weights.
+
+The report is JSON. ``--write-baseline`` saves it with regression
+thresholds; ``--baseline`` compares a run against a saved baseline and
+exits with status 1 if any metric regressed past its threshold
+(throughput lower, or latency higher, by more than the given fraction).
+
+Usage:
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --models stub --write-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_suite --models stub --baseline benchmarks/baseline.json
+    python -m benchmarks.bench_suite --only classify embed --cost-scale 0.1
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.bench_clustering import synthetic_embeddings
+from benchmarks.corpus import generate_corpus
+from benchmarks.stub_models import install_stubs, model_cached
+from services.classifier import ClassificationService
+from services.clustering import ClusteringService
+from services.model_registry import ModelRegistry
+from services.priority import PriorityService
+from services.sentiment import SentimentService
+
+BENCHMARKS = [
+    "classify", "embed", "cluster_1k", "cluster_10k", "cluster_100k", "sentiment", "prioritize", "prioritize_batch"
+]
+CLUSTER_SIZES = {'cluster_1k': 1000, 'cluster_10k': 10000, 'cluster_100k': 100000}
+
+# Allowed fractional change before a metric counts as a regression. Tail
+# latency is noisier than the median, and cluster runs have few samples.
+DEFAULT_THRESHOLDS = {
+    'default': {'throughput_per_s': 0.15, 'p50_ms': 0.20, 'p99_ms': 0.35},
+    'cluster_100k': {'throughput_per_s': 0.25, 'p50_ms': 0.30, 'p99_ms': 0.30},
+    'prioritize': {'throughput_per_s': 0.25, 'p50_ms': 0.30, 'p99_ms': 0.50},
+    'prioritize_batch': {'throughput_per_s': 0.25, 'p50_ms': 0.30, 'p99_ms': 0.50}
+}
+HIGHER_IS_BETTER = {'throughput_per_s'}
+
+
+def measure(fn, requests: list, items_per_request, warmup: int = 1) -> dict:
+    """
+    Time fn on every request, after ``warmup`` untimed calls
+
+    Args:
+        fn: Callable taking one request
+        requests: Request payloads, run in order
+        items_per_request: Items in each request (int, or a callable on the request)
+
+    Returns:
+        Dict with requests, items, seconds, throughput_per_s, p50_ms, p99_ms
+    """
+    for request in requests[:warmup]:
+        fn(request)
+
+    count = items_per_request if callable(items_per_request) else (lambda _: items_per_request)
+    seconds = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for request in requests:
+            started = time.perf_counter()
+            fn(request)
+            seconds.append(time.perf_counter() - started)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    seconds = np.asarray(seconds)
+    items = sum(count(request) for request in requests)
+    return {
+        'requests': len(requests),
+        'items': items,
+        'seconds': round(float(seconds.sum()), 3),
+        'throughput_per_s': round(items / max(float(seconds.sum()), 1e-9), 1),
+        'p50_ms': round(float(np.percentile(seconds, 50)) * 1000, 3),
+        'p99_ms': round(float(np.percentile(seconds, 99)) * 1000, 3)
+    }
+
+
+def chunks(items: list, size: int) -> list:
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def complaint_text(item: dict) -> str:
+    return f"{item['title']}. {item['text']}"
+
+
+def check_priority_batch(priority: PriorityService):
+    """Assert calculate_priority_batch scores every point of an input grid like calculate_priority"""
+    grid = [
+        (category, density, upvotes, age, safety)
+        for category in list(PriorityService.CATEGORY_RISK_MAP) + ["Unknown"]
+        for density in range(0, 101, 7)
+        for upvotes in range(0, 12, 3)
+        for age in range(0, 800, 53)
+        for safety in range(0, 101, 9)
+    ]
+    columns = list(zip(*grid))
+    batch = priority.calculate_priority_batch(*columns)
+    for row, score in zip(grid, batch['priority_score']):
+        single = priority.calculate_priority("grid", *row)['priority_score']
+        assert single == score, f"calculate_priority_batch disagrees with calculate_priority on {row}"
+
+
+def prepare_services(mode: str, cost_scale: float) -> tuple:
+    """
+    Build services on a private registry, with real or stub models
+
+    Returns:
+        (classifier, clustering, sentiment, models) where models maps each
+        service to "real" or "stub"
+    """
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+    registry = ModelRegistry()
+    classifier = ClassificationService(registry=registry)
+    clustering = ClusteringService(registry=registry)
+    sentiment = SentimentService(registry=registry)
+
+    cached = {
+        'classifier': model_cached(classifier.model_name),
+        'clustering': model_cached(clustering.model_name, ("torch", "sentence_transformers")),
+        'sentiment': model_cached(SentimentService.MODEL_NAME)
+    }
+    if mode == "real" and not all(cached.values()):
+        missing = ", ".join(name for name, path in cached.items() if not path)
+        raise SystemExit(f"--models real: no local copy (or no torch) for {missing}")
+    models = {name: "real" if mode != "stub" and path else "stub" for name, path in cached.items()}
+
+    install_stubs(
+        classifier=classifier if models['classifier'] == "stub" else None,
+        clustering=clustering if models['clustering'] == "stub" else None,
+        sentiment=sentiment if models['sentiment'] == "stub" else None,
+        cost_scale=cost_scale
+    )
+    for service in (classifier, clustering, sentiment):
+        service.load_models()
+    return classifier, clustering, sentiment, models
+
+
+def run_suite(args) -> dict:
+    classifier, clustering, sentiment, models = prepare_services(args.models, args.cost_scale)
+    priority = PriorityService()
+    corpus = generate_corpus(max(args.n, args.classify_n), seed=args.seed)
+    results = {}
+
+    def record(name: str, result: dict, **config):
+        result.update(config)
+        results[name] = result
+        print(f"{name}: {result['throughput_per_s']}/s p50 {result['p50_ms']} ms p99 {result['p99_ms']} ms", file=sys.stderr)
+
+    if "classify" in args.only:
+        requests = chunks(corpus[:args.classify_n], args.request_size)
+        record("classify", measure(classifier.classify_many, requests, len), model=models['classifier'])
+
+    if "embed" in args.only:
+        requests = chunks([complaint_text(item) for item in corpus[:args.n]], args.request_size)
+        record("embed", measure(clustering.get_embedding_matrix, requests, len), model=models['clustering'])
+
+    for name, size in CLUSTER_SIZES.items():
+        if name not in args.only:
+            continue
+        embeddings = synthetic_embeddings(size, clustering.embedding_dim, seed=args.seed)
+        # Enough samples for a median at 1k, a single timed run at 100k
+        repeats = max(1, min(20, 20000 // size))
+        clustering.cluster_issues(embeddings[:64])  # warm up BLAS outside the timed runs
+        record(name, measure(clustering.cluster_issues, [embeddings] * repeats, size, warmup=0), model="none")
+
+    if "sentiment" in args.only:
+        requests = chunks([complaint_text(item) for item in corpus[:args.n]], args.request_size)
+        record("sentiment", measure(sentiment.analyze_batch, requests, len), model=models['sentiment'])
+
+    if "prioritize" in args.only or "prioritize_batch" in args.only:
+        issues = corpus[:args.n]
+        if "prioritize" in args.only:
+            record("prioritize", measure(
+                lambda item: priority.calculate_priority(
+                    item['id'], item['category'], item['location_density'],
+                    item['citizen_upvotes'], item['age_hours'], item['safety_rating']
+                ),
+                issues,
+                1
+            ), model="none")
+        if "prioritize_batch" in args.only:
+            check_priority_batch(priority)
+
+            def prioritize_batch(batch):
+                return priority.calculate_priority_batch(
+                    [item['category'] for item in batch],
+                    [item['location_density'] for item in batch],
+                    [item['citizen_upvotes'] for item in batch],
+                    [item['age_hours'] for item in batch],
+                    [item['safety_rating'] for item in batch],
+                    [item['id'] for item in batch]
+                )
+            # Sub-millisecond calls; 50 samples keep the percentiles stable
+            batch = (issues * (1000 // len(issues) + 1))[:1000]
+            record("prioritize_batch", measure(prioritize_batch, [batch] * 50, len), model="none")
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'models': models,
+            'cost_scale': args.cost_scale,
+            'n': args.n,
+            'classify_n': args.classify_n,
+            'request_size': args.request_size,
+            'seed': args.seed
+        },
+        'results': results
+    }
+
+
+def threshold_for(thresholds: dict, name: str, metric: str) -> float:
+    return thresholds.get(name, {}).get(metric, thresholds.get('default', {}).get(metric, DEFAULT_THRESHOLDS['default'][metric]))
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """
+    Compare a report with a baseline, metric by metric
+
+    Benchmarks are only compared when both ran the same number of items
+    with the same kind of model (real or stub); others are listed as
+    skipped.
+
+    Returns:
+        Dict with per-benchmark metric comparisons, skipped benchmarks and
+        the list of regressions
+    """
+    thresholds = baseline.get('thresholds', DEFAULT_THRESHOLDS)
+    comparison, skipped, regressions = {}, {}, []
+    if report['meta'].get('cost_scale') != baseline.get('meta', {}).get('cost_scale'):
+        return {'comparison': {}, 'skipped': {'*': "different --cost-scale"}, 'regressions': []}
+
+    for name, current in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            skipped[name] = "not in baseline"
+            continue
+        if (base['items'], base.get('model')) != (current['items'], current.get('model')):
+            skipped[name] = f"baseline ran {base['items']} items on {base.get('model')} model"
+            continue
+
+        entry = {}
+        for metric in DEFAULT_THRESHOLDS['default']:
+            allowed = threshold_for(thresholds, name, metric)
+            change = (current[metric] - base[metric]) / max(base[metric], 1e-9)
+            regressed = -change > allowed if metric in HIGHER_IS_BETTER else change > allowed
+            entry[metric] = {
+                'baseline': base[metric],
+                'current': current[metric],
+                'change': round(change, 3),
+                'threshold': allowed,
+                'regressed': regressed
+            }
+            if regressed:
+                regressions.append(f"{name}.{metric}")
+        comparison[name] = entry
+
+    return {'comparison': comparison, 'skipped': skipped, 'regressions': regressions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline throughput / latency suite with regression baselines")
+    parser.add_argument("--models", choices=["auto", "stub", "real"], default="auto",
+                        help="auto: real models where cached locally, stubs otherwise")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--n", type=int, default=2000, help="Complaints for embed, sentiment and prioritize")
+    parser.add_argument("--classify-n", type=int, default=256, help="Complaints for classify (zero-shot is slow)")
+    parser.add_argument("--request-size", type=int, default=16, help="Complaints per request")
+    parser.add_argument("--cost-scale", type=float, default=1.0, help="Multiplier on stub model costs (0 = free)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the report to this file")
+    parser.add_argument("--write-baseline", metavar="PATH", help="Save this run as a baseline with thresholds")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against a baseline; exit 1 on regression")
+    args = parser.parse_args()
+
+    report = run_suite(args)
+
+    if args.write_baseline:
+        with open(args.write_baseline, "w") as f:
+            json.dump(dict(report, thresholds=DEFAULT_THRESHOLDS), f, indent=2)
+            f.write("\n")
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['baseline'] = compare(report, json.load(f))
+        exit_code = 1 if report['baseline']['regressions'] else 0
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Synthetic civic-complaint corpus for offline benchmarks
+
+Complaints are assembled from per-category vocabulary and sentence
+templates, so every category in ``ClassificationService.CATEGORIES`` is
+covered and a keyword-based stub classifier has signal to work with.
+Lengths follow a log-normal distribution (median around 35 words, a long
+tail of multi-paragraph complaints), a configurable share of complaints
+are near-duplicates of earlier ones (the same issue reported by
+neighbours), and each carries a sentiment label, a location and the
+numeric fields ``/api/v1/prioritize`` takes. The same seed always gives
+the same corpus.
+"""
+
+import random
+from typing import Dict, List
+
+from services.classifier import ClassificationService
+
+CATEGORY_VOCAB = {
+    "Roads & Infrastructure": {
+        'issues': ["pothole", "broken footpath", "damaged road", "collapsed culvert", "missing manhole cover",
+                   "cracked bridge railing", "unmarked speed breaker", "caved-in pavement"],
+        'details': ["two bikers fell here", "cars swerve into the other lane", "the asphalt keeps breaking",
+                    "school buses cannot pass", "it fills with water when it rains"]
+    },
+    "Water & Sanitation": {
+        'issues': ["sewage overflow", "no water supply", "contaminated tap water", "leaking pipeline",
+                   "blocked drain", "locked public toilet", "open sewer line", "low water pressure"],
+        'details': ["the smell is unbearable", "families are buying tankers", "children fell sick",
+                    "mosquitoes are breeding", "dirty water is entering homes"]
+    },
+    "Electricity & Power": {
+        'issues': ["streetlight not working", "frequent power cuts", "sparking transformer",
+                   "hanging electric wires", "voltage fluctuation", "damaged electric pole"],
+        'details': ["the street is dark at night", "appliances got damaged", "students cannot study",
+                    "it could catch fire", "women feel unsafe walking home"]
+    },
+    "Waste Management": {
+        'issues': ["garbage not collected", "overflowing dustbin", "burning of plastic waste",
+                   "construction debris dumped", "dead animal on road", "no segregation bins"],
+        'details': ["stray dogs spread it everywhere", "the smoke is choking", "it has been lying for weeks",
+                    "flies are everywhere", "the collection truck skips our lane"]
+    },
+    "Public Amenities": {
+        'issues': ["broken park swings", "damaged bus shelter", "closed public library", "benches removed",
+                   "broken open gym equipment", "community hall locked"],
+        'details': ["kids got injured", "elderly people have nowhere to sit", "commuters wait in the rain",
+                    "nobody maintains it", "it was promised months ago"]
+    },
+    "Environment": {
+        'issues': ["illegal tree cutting", "factory air pollution", "plastic in the lake",
+                   "loudspeakers past midnight", "chemical dumping in canal", "dust from construction site"],
+        'details': ["it is hard to breathe", "fish are dying", "nobody can sleep", "birds have left",
+                    "the water has turned black"]
+    },
+    "Others": {
+        'issues': ["stray dog menace", "illegal parking", "encroachment on footpath", "cattle on the road",
+                   "delay in certificate", "unauthorized hawkers"],
+        'details': ["a child was bitten", "ambulances cannot pass", "pedestrians walk on the road",
+                    "traffic is blocked every evening", "the office keeps sending us back"]
+    }
+}
+
+PLACES = ["MG Road", "sector 4", "block C", "the bus stand", "the railway station", "ward 12", "the market",
+          "the government school", "5th Avenue", "the temple", "the lake road", "Gandhi Nagar"]
+DURATIONS = ["two days", "a week", "ten days", "three weeks", "a month", "since Monday", "two months"]
+NEGATIVE = ["This is terrible.", "Very frustrated with the slow response.", "Nobody is listening, pathetic.",
+            "Disappointed with the council.", "This is horrible and shameful."]
+POSITIVE = ["Thanks for the quick fix last time.", "Appreciate the helpful staff.",
+            "Great work on the earlier complaint.", "We are grateful for the response."]
+NEUTRAL = ["Please look into it.", "Kindly take necessary action.", "Requesting an inspection.",
+           "Please update the status."]
+FILLER = ["Residents of the area have raised this before.", "I am attaching photos for reference.",
+          "The ward officer was informed last month.", "Many senior citizens live on this street.",
+          "This happens every year during the monsoon.", "Shopkeepers nearby are also affected.",
+          "The complaint number from last time is not traceable.", "We pay our taxes on time."]
+
+
+def _complaint(rng: random.Random, category: str, sentiment: str, target_words: int) -> Dict:
+    vocab = CATEGORY_VOCAB[category]
+    issue = rng.choice(vocab['issues'])
+    place = rng.choice(PLACES)
+    sentences = [
+        f"There is a {issue} near {place} for {rng.choice(DURATIONS)}.",
+        f"{rng.choice(vocab['details']).capitalize()}."
+    ]
+    tone = {'Negative': NEGATIVE, 'Positive': POSITIVE, 'Neutral': NEUTRAL}[sentiment]
+    sentences.append(rng.choice(tone))
+    words = sum(len(sentence.split()) for sentence in sentences)
+    while words < target_words:
+        sentence = rng.choice(FILLER if rng.random() < 0.7 else vocab['details'] + tone)
+        sentence = sentence if sentence.endswith(".") else f"{sentence.capitalize()}."
+        sentences.insert(rng.randrange(1, len(sentences) + 1), sentence)
+        words += len(sentence.split())
+
+    return {
+        'title': f"{issue.capitalize()} near {place}",
+        'text': " ".join(sentences),
+        'category': category,
+        'sentiment': sentiment
+    }
+
+
+EDIT_WORDS = ["please", "urgent", "again", "still", "kindly", "sir", "madam", "very", "now"]
+
+
+def _rephrase(rng: random.Random, text: str, variant: str) -> str:
+    """
+    A neighbour's copy of a complaint: resubmitted as is (up to case and
+    spacing), edited in a few words, or with its sentences reordered
+    """
+    if variant == "exact":
+        return text.upper() if rng.random() < 0.2 else "  ".join(text.split(" ", 1))
+    if variant == "reordered":
+        sentences = text.rstrip(".").split(". ")
+        rng.shuffle(sentences)
+        return ". ".join(sentences) + "."
+    words = text.split()
+    for _ in range(rng.randint(1, 3)):
+        position = rng.randrange(len(words))
+        action = rng.random()
+        if action < 0.4:
+            words.insert(position, rng.choice(EDIT_WORDS))
+        elif action < 0.7 and len(words) > 4:
+            del words[position]
+        else:
+            words[position] = rng.choice(EDIT_WORDS)
+    return " ".join(words)
+
+
+def generate_corpus(n: int, seed: int = 0, duplicate_rate: float = 0.1) -> List[Dict]:
+    """
+    Generate ``n`` labelled synthetic complaints
+
+    Args:
+        n: Number of complaints
+        seed: Random seed; the corpus is a pure function of (n, seed, duplicate_rate)
+        duplicate_rate: Share of complaints that rephrase an earlier one
+
+    Returns:
+        List of dicts with id, title, text, category, sentiment, latitude,
+        longitude, location_density, citizen_upvotes, age_hours and
+        safety_rating; duplicates also carry ``duplicate_of`` (id of the
+        first report) and ``variant`` (exact, edited or reordered)
+    """
+    rng = random.Random(seed)
+    categories = ClassificationService.CATEGORIES
+    # Roads and water dominate real complaint volume
+    weights = [0.26, 0.22, 0.15, 0.15, 0.08, 0.07, 0.07]
+    corpus = []
+    for idx in range(n):
+        if corpus and rng.random() < duplicate_rate:
+            original = rng.choice(corpus)
+            variant = rng.choices(["exact", "edited", "reordered"], [0.35, 0.45, 0.2])[0]
+            complaint = dict(original, text=_rephrase(rng, original['text'], variant))
+            complaint.update({'duplicate_of': original.get('duplicate_of', original['id']), 'variant': variant})
+        else:
+            category = rng.choices(categories, weights)[0]
+            sentiment = rng.choices(["Negative", "Neutral", "Positive"], [0.7, 0.2, 0.1])[0]
+            target_words = int(min(400, max(8, rng.lognormvariate(3.55, 0.6))))
+            complaint = _complaint(rng, category, sentiment, target_words)
+            complaint.update({
+                'latitude': round(12.90 + rng.random() * 0.15, 6),
+                'longitude': round(77.50 + rng.random() * 0.15, 6),
+                'location_density': round(rng.uniform(0, 100), 1),
+                'citizen_upvotes': int(rng.expovariate(1 / 4)),
+                'age_hours': int(rng.expovariate(1 / 72)),
+                'safety_rating': round(rng.uniform(0, 100), 1)
+            })
+            complaint.pop('duplicate_of', None)
+            complaint.pop('variant', None)
+        complaint['id'] = f"issue-{idx}"
+        corpus.append(complaint)
+    return corpus
@@ -0,0 +1,259 @@
+"""
+Deterministic stand-ins for the transformer models, for offline benchmarks
+
+Each stub has the call signature the services use (zero-shot pipeline,
+sentiment pipeline, sentence transformer), returns the same output for the
+same input, and sleeps for what the real model would spend on the batch:
+a fixed per-call overhead plus a cost per padded token, taken from CPU
+measurements of the real models (4 threads, fp32). Sleeping releases the
+GIL the way torch kernels do, so thread pools and batchers behave as they
+would in production. ``cost_scale`` scales every cost (0 for free models).
+
+Use ``install_stubs`` to make services load stubs instead of the real
+models, and ``model_cached`` to check whether a real model can be loaded
+without network access.
+"""
+
+import math
+import os
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.corpus import CATEGORY_VOCAB
+from services.metrics import instrument_model
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+STOP_WORDS = {"the", "a", "of", "on", "in", "is", "it", "to", "and", "for", "not", "no", "near", "from", "our"}
+
+
+@dataclass(frozen=True)
+class TokenCost:
+    """Seconds per call: fixed_ms plus per_token_ms for every padded token"""
+    fixed_ms: float
+    per_token_ms: float
+
+    def seconds(self, texts: int, max_tokens: int, pairs: int = 1, scale: float = 1.0) -> float:
+        return scale * (self.fixed_ms + self.per_token_ms * texts * max_tokens * pairs) / 1000
+
+
+# Measured on the fp32 models; zero-shot pays once per (text, label) pair
+ZERO_SHOT_COST = TokenCost(fixed_ms=8.0, per_token_ms=0.35)
+SENTIMENT_COST = TokenCost(fixed_ms=3.0, per_token_ms=0.05)
+EMBEDDING_COST = TokenCost(fixed_ms=2.0, per_token_ms=0.015)
+
+
+def tokenize(text: str, max_length: int) -> List[str]:
+    """Word-piece-like tokens: words and punctuation, plus [CLS] / [SEP]"""
+    return ["[CLS]"] + TOKEN_PATTERN.findall(text.lower())[:max_length - 2] + ["[SEP]"]
+
+
+def _stable_hash(value: str) -> int:
+    return zlib.crc32(value.encode("utf-8"))
+
+
+def _category_keywords() -> Dict[str, set]:
+    keywords = {}
+    for category, vocab in CATEGORY_VOCAB.items():
+        words = set()
+        for phrase in vocab['issues'] + vocab['details']:
+            words.update(TOKEN_PATTERN.findall(phrase.lower()))
+        keywords[category] = words - STOP_WORDS
+    return keywords
+
+
+class StubZeroShotPipeline:
+    """Zero-shot classification scored by category keyword overlap"""
+
+    def __init__(self, cost: TokenCost = ZERO_SHOT_COST, cost_scale: float = 1.0, max_length: int = 1024):
+        self.cost = cost
+        self.cost_scale = cost_scale
+        self.max_length = max_length
+        self.keywords = _category_keywords()
+
+    def __call__(self, sequences, candidate_labels, multi_class: bool = False, batch_size: int = 1, **kwargs):
+        single = isinstance(sequences, str)
+        texts = [sequences] if single else list(sequences)
+        outputs = []
+        for start in range(0, len(texts), max(1, batch_size)):
+            chunk = texts[start:start + max(1, batch_size)]
+            outputs.extend(self.postprocess(self.forward(self.preprocess(chunk, candidate_labels))))
+        return outputs[0] if single else outputs
+
+    def preprocess(self, texts: List[str], candidate_labels: List[str]) -> Dict:
+        return {
+            'texts': texts,
+            'tokens': [tokenize(text, self.max_length) for text in texts],
+            'labels': list(candidate_labels)
+        }
+
+    def forward(self, inputs: Dict) -> Dict:
+        tokens, labels = inputs['tokens'], inputs['labels']
+        time.sleep(self.cost.seconds(len(tokens), max(map(len, tokens)), len(labels), self.cost_scale))
+        logits = []
+        for text, text_tokens in zip(inputs['texts'], tokens):
+            words = set(text_tokens)
+            logits.append([
+                len(words & self.keywords.get(label, set())) + (_stable_hash(text + label) % 100) / 1000
+                for label in labels
+            ])
+        return dict(inputs, logits=logits)
+
+    def postprocess(self, outputs: Dict) -> List[Dict]:
+        results = []
+        for text, logits in zip(outputs['texts'], outputs['logits']):
+            peak = max(logits)
+            weights = [math.exp(2 * (logit - peak)) for logit in logits]
+            total = sum(weights)
+            ranked = sorted(zip(outputs['labels'], weights), key=lambda pair: -pair[1])
+            results.append({
+                'sequence': text,
+                'labels': [label for label, _ in ranked],
+                'scores': [weight / total for _, weight in ranked]
+            })
+        return results
+
+
+class StubSentimentPipeline:
+    """SST-2 style POSITIVE / NEGATIVE labels from a small lexicon"""
+
+    POSITIVE = {"good", "great", "thanks", "appreciate", "grateful", "helpful", "quick", "fixed"}
+    NEGATIVE = {"terrible", "frustrated", "pathetic", "disappointed", "horrible", "shameful", "unbearable",
+                "sick", "unsafe", "broken", "nobody", "slow", "damaged", "dying"}
+
+    def __init__(self, cost: TokenCost = SENTIMENT_COST, cost_scale: float = 1.0):
+        self.cost = cost
+        self.cost_scale = cost_scale
+
+    def __call__(self, inputs, batch_size: int = 1, truncation: bool = True, max_length: int = 512, **kwargs):
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        outputs = []
+        for start in range(0, len(texts), max(1, batch_size)):
+            chunk = texts[start:start + max(1, batch_size)]
+            outputs.extend(self.postprocess(self.forward(self.preprocess(chunk, max_length))))
+        return outputs
+
+    def preprocess(self, texts: List[str], max_length: int = 512) -> Dict:
+        return {'texts': texts, 'tokens': [tokenize(text, max_length) for text in texts]}
+
+    def forward(self, inputs: Dict) -> Dict:
+        tokens = inputs['tokens']
+        time.sleep(self.cost.seconds(len(tokens), max(map(len, tokens)), scale=self.cost_scale))
+        logits = []
+        for text, text_tokens in zip(inputs['texts'], tokens):
+            words = set(text_tokens)
+            jitter = (_stable_hash(text) % 100 - 50) / 200
+            logits.append(1.5 * len(words & self.POSITIVE) - 1.5 * len(words & self.NEGATIVE) + 0.5 + jitter)
+        return dict(inputs, logits=logits)
+
+    def postprocess(self, outputs: Dict) -> List[Dict]:
+        results = []
+        for logit in outputs['logits']:
+            positive = 1 / (1 + math.exp(-logit))
+            label = "POSITIVE" if positive >= 0.5 else "NEGATIVE"
+            results.append({'label': label, 'score': max(positive, 1 - positive)})
+        return results
+
+
+class StubSentenceTransformer:
+    """
+    Mean of per-token random unit vectors (hashing trick), L2-normalised
+
+    Texts that share most of their words get similar vectors, so duplicate
+    complaints and same-category complaints end up close together.
+    """
+
+    def __init__(self, dim: int = 384, cost: TokenCost = EMBEDDING_COST, cost_scale: float = 1.0, max_seq_length: int = 256):
+        self.dim = dim
+        self.cost = cost
+        self.cost_scale = cost_scale
+        self.max_seq_length = max_seq_length
+        self._vectors: Dict[str, np.ndarray] = {}
+
+    def _vector(self, token: str) -> np.ndarray:
+        vector = self._vectors.get(token)
+        if vector is None:
+            rng = np.random.default_rng(_stable_hash(token))
+            vector = rng.standard_normal(self.dim).astype(np.float32)
+            # Frequent filler words carry little meaning
+            if token in STOP_WORDS or not token.isalnum():
+                vector *= 0.2
+            vector = self._vectors[token] = vector
+        return vector
+
+    def tokenize(self, texts: List[str]) -> Dict:
+        return {'tokens': [tokenize(text, self.max_seq_length)[1:-1] or ["[UNK]"] for text in texts]}
+
+    def forward(self, features: Dict) -> Dict:
+        tokens = features['tokens']
+        time.sleep(self.cost.seconds(len(tokens), max(map(len, tokens)) + 2, scale=self.cost_scale))
+        lengths = [len(text_tokens) for text_tokens in tokens]
+        stacked = np.stack([self._vector(token) for text_tokens in tokens for token in text_tokens])
+        sums = np.add.reduceat(stacked, np.cumsum([0] + lengths[:-1]), axis=0)
+        embeddings = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        return dict(features, sentence_embedding=embeddings.astype(np.float32))
+
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        chunks = [
+            self.forward(self.tokenize(texts[start:start + batch_size]))['sentence_embedding']
+            for start in range(0, len(texts), batch_size)
+        ]
+        embeddings = np.concatenate(chunks)
+        return embeddings[0] if single else embeddings
+
+
+def install_stubs(classifier=None, clustering=None, sentiment=None, cost_scale: float = 1.0):
+    """
+    Make services load stub models in place of the real ones
+
+    The stubs go through the service's registry like the real models
+    (instrumented, leased, counted), only the loader is replaced. Call
+    ``load_models`` on the services afterwards as usual.
+    """
+    if classifier is not None:
+        classifier._load_models = lambda: instrument_model(StubZeroShotPipeline(cost_scale=cost_scale), "classifier")
+    if clustering is not None:
+        dim = clustering.embedding_dim
+        clustering._load_models = lambda: instrument_model(StubSentenceTransformer(dim, cost_scale=cost_scale), "clustering")
+    if sentiment is not None:
+        sentiment._load_models = lambda: instrument_model(StubSentimentPipeline(cost_scale=cost_scale), "sentiment")
+
+
+def _hub_cache_dirs() -> List[str]:
+    dirs = [os.environ.get("HF_HUB_CACHE"), os.environ.get("TRANSFORMERS_CACHE")]
+    hf_home = os.environ.get("HF_HOME", os.path.join(os.path.expanduser("~"), ".cache", "huggingface"))
+    dirs.append(os.path.join(hf_home, "hub"))
+    dirs.append(os.environ.get("SENTENCE_TRANSFORMERS_HOME"))
+    return [path for path in dirs if path]
+
+
+def model_cached(model_name: str, packages: tuple = ("torch", "transformers")) -> Optional[str]:
+    """
+    Path of a locally cached copy of a Hugging Face model, or None
+
+    Also None when the packages needed to load it are missing, so callers
+    can fall back to a stub without attempting (and failing) a download.
+    """
+    import importlib.util
+
+    if any(importlib.util.find_spec(package) is None for package in packages):
+        return None
+    names = {model_name, model_name.split("/")[-1]}
+    if "/" not in model_name:
+        # Canonical ids moved under an organisation on the hub
+        names.add(f"distilbert/{model_name}")
+    for cache_dir in _hub_cache_dirs():
+        for name in names:
+            for entry in (f"models--{name.replace('/', '--')}", name.replace("/", "_")):
+                path = os.path.join(cache_dir, entry)
+                if os.path.isdir(path):
+                    return path
+    return None
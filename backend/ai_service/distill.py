@@ -0,0 +1,120 @@
+"""
+Offline distillation of the zero-shot classifier into a MiniLM student head
+
+Labels historical complaints with BART-MNLI, embeds them with the MiniLM
+encoder used for clustering, trains a softmax head over the existing
+CATEGORIES and reports agreement and escalation rate on a held-out split.
+
+Usage:
+    python distill.py --input complaints.jsonl --output models/student_head.npz
+
+Input is a JSON array or JSON-lines file of issues with 'title' and
+'description' (or 'text') fields, e.g. a mongoexport of the issues
+collection.
+"""
+
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+
+from services.classifier import ClassificationService
+from services.clustering import ClusteringService
+from services.distillation import StudentHead, evaluate_cascade
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def load_issues(path: str, limit: int = None) -> list:
+    """Read issues from a JSON array or JSON-lines file"""
+    with open(path, encoding="utf-8") as f:
+        content = f.read().strip()
+
+    if content.startswith("["):
+        records = json.loads(content)
+    else:
+        records = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    issues = [
+        {
+            'title': record.get('title', ''),
+            'text': record.get('description') or record.get('text', '')
+        }
+        for record in records
+        if record.get('description') or record.get('text')
+    ]
+    return issues[:limit] if limit else issues
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill BART-MNLI into a MiniLM student head")
+    parser.add_argument("--input", required=True, help="JSON / JSON-lines file of historical issues")
+    parser.add_argument("--output", default="models/student_head.npz", help="Where to write the head")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Cascade confidence threshold")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for evaluation")
+    parser.add_argument("--batch-size", type=int, default=32, help="Teacher batch size")
+    parser.add_argument("--limit", type=int, default=None, help="Use at most this many issues")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    issues = load_issues(args.input, args.limit)
+    if len(issues) < 10:
+        raise SystemExit(f"Need at least 10 issues to distill, got {len(issues)}")
+    logger.info(f"Loaded {len(issues)} issues from {args.input}")
+
+    classifier = ClassificationService(batch_size=args.batch_size)
+    clustering = ClusteringService()
+
+    # Teacher labels
+    logger.info("Labelling with zero-shot teacher...")
+    teacher = classifier.classify_many(issues)
+    keep = [idx for idx, result in enumerate(teacher) if result['confidence'] > 0]
+    labels = [teacher[idx]['primary_category'] for idx in keep]
+
+    # Student inputs: same combined text the teacher saw
+    logger.info("Embedding with student encoder...")
+    texts = [classifier._combine(issues[idx]['text'], issues[idx]['title']) for idx in keep]
+    embeddings = np.asarray(clustering.get_embeddings(texts), dtype=np.float32)
+
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(keep))
+    n_holdout = int(len(keep) * args.holdout)
+    test_idx, train_idx = order[:n_holdout], order[n_holdout:]
+
+    head = StudentHead.fit(
+        embeddings[train_idx],
+        [labels[i] for i in train_idx],
+        embedding_model=clustering.model_name
+    )
+
+    report = {
+        'issues': len(issues),
+        'labelled': len(keep),
+        'train': len(train_idx),
+        'label_distribution': {
+            category: labels.count(category) for category in ClassificationService.CATEGORIES
+        }
+    }
+    if n_holdout:
+        report['holdout'] = evaluate_cascade(
+            head,
+            embeddings[test_idx],
+            [labels[i] for i in test_idx],
+            args.threshold
+        )
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    head.save(args.output)
+
+    report_path = os.path.splitext(args.output)[0] + ".report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,18 +3,49 @@ Awaaz AI Service - NLP Classification, Semantic Clustering, and Prioritization
 FastAPI-based service for intelligent complaint processing
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import asyncio
+import functools
+from collections import deque
+import time
+from contextvars import ContextVar
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional, Dict, Tuple, Union
 import os
 from dotenv import load_dotenv
 import logging
 
 from services.classifier import ClassificationService
-from services.clustering import ClusteringService
+from services.clustering import ClusteringService, cluster_embeddings
+from services.online_clustering import OnlineClusteringService
+from services.streaming import stream_ndjson
+from services.sharded_clustering import (
+    parse_location, plan_shards, shard_keys, pack_shards, iter_shard_groups, cluster_shard_group, merge_shard_labels
+)
+from services.near_duplicates import near_duplicate_groups, expand_labels
+from services.cluster_quality import sampled_cluster_quality
 from services.priority import PriorityService
 from services.sentiment import SentimentService
+from services.batching import MicroBatcher
+from services.executor import InferencePools
+from services.model_loader import ModelLoader
+from services.model_registry import ModelRegistry, process_rss_bytes
+from services.result_cache import ResultCache
+from services.jobs import JobManager, JobQueueFull
+from services.metrics import metrics, stage
+from services.inference_host import InferenceClient, RemoteRegistry, host_address, new_authkey, start_hosts
+from services.distillation import StudentHead
+from services.embedding_cache import EmbeddingCache
+from services.embedding_codec import (
+    OCTET_STREAM, SHAPE_HEADER, DTYPE_HEADER,
+    accepts_binary, resolve_dtype, decode_matrix, decode_base64, encode_matrix, encode_base64, matrix_headers
+)
+from services.vector_index import VectorIndex, claim_snapshot_owner
 
 # Load environment variables
 load_dotenv()
@@ -23,12 +54,93 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# ============================================
+# REQUEST METRICS
+# ============================================
+
+REQUEST_SECONDS = metrics.histogram(
+    "awaaz_request_seconds",
+    "End-to-end request latency per endpoint",
+    ("method", "endpoint")
+)
+REQUEST_STAGE_SECONDS = metrics.histogram(
+    "awaaz_request_stage_seconds",
+    "Request latency per endpoint split into deserialize, handler and serialize",
+    ("endpoint", "stage")
+)
+REQUESTS = metrics.counter(
+    "awaaz_requests_total",
+    "Requests per endpoint and status code",
+    ("method", "endpoint", "status")
+)
+NEAR_DUPLICATE_ISSUES = metrics.counter(
+    "awaaz_near_duplicate_issues_total",
+    "Clustering input issues folded into a near-duplicate instead of embedded",
+    ("source",)
+)
+_request_timings: ContextVar = ContextVar("request_timings", default=None)
+
+class TimedRoute(APIRoute):
+    """
+    Route that records latency per endpoint (path template, not raw URL)
+    
+    The time before the endpoint function starts is request parsing and
+    validation (deserialize); the time after it returns is response
+    validation and rendering (serialize).
+    """
+    
+    def __init__(self, path: str, endpoint, **kwargs):
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args, **kw):
+            timings = _request_timings.get()
+            started = time.perf_counter()
+            try:
+                return await endpoint(*args, **kw)
+            finally:
+                if timings is not None:
+                    timings['handler'] = (started, time.perf_counter())
+        
+        super().__init__(path, timed_endpoint, **kwargs)
+    
+    def get_route_handler(self):
+        route_handler = super().get_route_handler()
+        endpoint = self.path
+        
+        async def timed_route_handler(request: Request):
+            timings = {}
+            token = _request_timings.set(timings)
+            status = 500
+            started = time.perf_counter()
+            try:
+                response = await route_handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            except RequestValidationError:
+                status = 422
+                raise
+            finally:
+                finished = time.perf_counter()
+                _request_timings.reset(token)
+                REQUEST_SECONDS.observe(finished - started, request.method, endpoint)
+                REQUESTS.inc(request.method, endpoint, str(status))
+                if 'handler' in timings:
+                    handler_started, handler_finished = timings['handler']
+                    REQUEST_STAGE_SECONDS.observe(handler_started - started, endpoint, "deserialize")
+                    REQUEST_STAGE_SECONDS.observe(handler_finished - handler_started, endpoint, "handler")
+                    REQUEST_STAGE_SECONDS.observe(finished - handler_finished, endpoint, "serialize")
+        
+        return timed_route_handler
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Awaaz AI Service",
     description="NLP Classification, Clustering, and Prioritization Service",
     version="1.0.0"
 )
+app.router.route_class = TimedRoute
 
 # CORS middleware
 app.add_middleware(
@@ -40,10 +152,197 @@ app.add_middleware(
 )
 
 # Initialize services
-classifier = ClassificationService()
-clustering = ClusteringService()
+# INFERENCE_QUANTIZATION=int8 loads CPU models with int8 dynamic quantization
+INFERENCE_QUANTIZATION = os.getenv("INFERENCE_QUANTIZATION", "none")
+QUANTIZED_MODEL_DIR = os.getenv("QUANTIZED_MODEL_DIR", "models/quantized")
+# Every service gets its models from one registry, so each is loaded once;
+# idle models are evicted when resident weights exceed MODEL_MEMORY_BUDGET_MB
+# With INFERENCE_HOSTS > 0 this process is a thin HTTP worker and forward
+# passes run in a shared inference host process (see __main__ below)
+INFERENCE_HOSTS = int(os.getenv("INFERENCE_HOSTS", 0))
+INFERENCE_HOST_SOCKET = os.getenv("INFERENCE_HOST_SOCKET", "/tmp/awaaz-inference")
+if INFERENCE_HOSTS > 0 and os.getenv("INFERENCE_HOST_AUTHKEY"):
+    model_registry = RemoteRegistry(InferenceClient(
+        host_address(INFERENCE_HOST_SOCKET, os.getpid() % INFERENCE_HOSTS),
+        os.environ["INFERENCE_HOST_AUTHKEY"].encode("utf-8")
+    ))
+else:
+    model_registry = ModelRegistry(
+        memory_budget_mb=float(os.getenv("MODEL_MEMORY_BUDGET_MB", 0)) or None,
+        idle_seconds=float(os.getenv("MODEL_IDLE_SECONDS", 300))
+    )
+classifier = ClassificationService(
+    batch_size=int(os.getenv("CLASSIFY_BATCH_SIZE", 16)),
+    quantization=INFERENCE_QUANTIZATION,
+    quantized_cache_dir=QUANTIZED_MODEL_DIR,
+    registry=model_registry
+)
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH")
+if VECTOR_INDEX_PATH and os.path.exists(VECTOR_INDEX_PATH):
+    vector_index = VectorIndex.load(VECTOR_INDEX_PATH)
+else:
+    vector_index = VectorIndex(
+        dim=384,
+        n_lists=int(os.getenv("VECTOR_INDEX_LISTS", 1024)),
+        n_probe=int(os.getenv("VECTOR_INDEX_PROBE", 16))
+    )
+
+clustering = ClusteringService(
+    cache=EmbeddingCache(
+        max_bytes=int(float(os.getenv("EMBEDDING_CACHE_MB", 64)) * 1024 * 1024),
+        disk_dir=os.getenv("EMBEDDING_CACHE_DIR") or None
+    ),
+    index=vector_index,
+    memory_budget_mb=float(os.getenv("CLUSTER_MEMORY_BUDGET_MB", 256)),
+    quantization=INFERENCE_QUANTIZATION,
+    quantized_cache_dir=QUANTIZED_MODEL_DIR,
+    registry=model_registry
+)
+online_clustering = OnlineClusteringService(
+    dim=384,
+    similarity_threshold=float(os.getenv("ONLINE_SIMILARITY_THRESHOLD", 0.75))
+)
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 32))
+STREAM_MAX_IN_FLIGHT = int(os.getenv("STREAM_MAX_IN_FLIGHT", 2))
+ONLINE_CONSOLIDATE_SECONDS = float(os.getenv("ONLINE_CONSOLIDATE_SECONDS", 300))
 priority = PriorityService()
-sentiment = SentimentService()
+sentiment = SentimentService(
+    batch_size=int(os.getenv("SENTIMENT_BATCH_SIZE", 16)),
+    quantization=INFERENCE_QUANTIZATION,
+    quantized_cache_dir=QUANTIZED_MODEL_DIR,
+    registry=model_registry
+)
+
+# Transformers load concurrently in the background; keyword sentiment,
+# priority and clustering of supplied embeddings work before they finish
+model_loader = ModelLoader(max_workers=int(os.getenv("MODEL_LOAD_WORKERS", 0)) or None)
+model_loader.register("classifier", classifier.load_models)
+model_loader.register("embedding", clustering.load_models)
+model_loader.register("sentiment", sentiment.load_models, required=False)
+
+# Blocking inference runs on bounded per-model pools, never on the event loop
+pools = InferencePools()
+pools.configure("classifier", kind="thread", max_workers=1)
+pools.configure("embedding", kind="thread", max_workers=1)
+pools.configure("sentiment", kind="thread", max_workers=1)
+pools.configure("clustering", kind="process", max_workers=os.cpu_count() or 2)
+pools.configure("index", kind="thread", max_workers=2)
+
+# Coalesce concurrent /classify calls into batched pipeline calls
+classify_batcher = MicroBatcher(
+    classifier.classify_many,
+    max_batch_size=int(os.getenv("CLASSIFY_MAX_BATCH_SIZE", 16)),
+    max_wait_ms=float(os.getenv("CLASSIFY_MAX_WAIT_MS", 10)),
+    name="classify_batcher",
+    runner=lambda fn, items: pools.run("classifier", fn, items)
+)
+
+# Unchanged complaints (edits, retries, resubmits) are answered from a result
+# cache; identical requests in flight share one classification. With
+# REDIS_URL set, cached results are shared between workers
+classify_cache_redis = None
+if os.getenv("REDIS_URL"):
+    try:
+        import redis
+        classify_cache_redis = redis.Redis.from_url(os.environ["REDIS_URL"], socket_timeout=0.5)
+    except Exception as e:
+        logger.warning(f"Classification cache running without Redis: {str(e)}")
+classification_cache = ResultCache(
+    key_fn=lambda item: ResultCache.make_key(classifier.model_version, item['title'], item['text'], item['language']),
+    max_entries=int(os.getenv("CLASSIFY_CACHE_SIZE", 10000)),
+    ttl_seconds=float(os.getenv("CLASSIFY_CACHE_TTL_SECONDS", 3600)),
+    redis_client=classify_cache_redis,
+    namespace="awaaz:classify",
+    # Fallback results (model unavailable) have zero confidence
+    cacheable=lambda result: result.get('confidence', 0) > 0
+)
+
+# Copy-pasted and lightly edited complaints are grouped by MinHash before
+# clustering; only one issue per group is embedded. 0 disables the prefilter
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", 0.8))
+
+# Rows of small geohash shards sent to the clustering pool in one task
+SHARD_TASK_ROWS = int(os.getenv("SHARD_TASK_ROWS", 4096))
+
+# Silhouette / cohesion / separation on a stratified sample of clustered
+# issues; the budget caps point-to-cluster comparisons, so cost stays
+# linear in N
+CLUSTER_QUALITY_BUDGET = int(float(os.getenv("CLUSTER_QUALITY_BUDGET", 2e7)))
+CLUSTER_QUALITY_MAX_SAMPLE = int(os.getenv("CLUSTER_QUALITY_MAX_SAMPLE", 2000))
+CLUSTER_QUALITY_CONFIDENCE = float(os.getenv("CLUSTER_QUALITY_CONFIDENCE", 0.95))
+
+# Large clustering / embedding / classification runs are submitted as jobs:
+# a bounded queue, a few concurrent jobs, results persisted under JOBS_DIR
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", 64))
+job_manager = JobManager(
+    os.getenv("JOBS_DIR", "data/jobs"),
+    workers=int(os.getenv("JOB_WORKERS", 1)),
+    max_queue=int(os.getenv("JOB_QUEUE_SIZE", 32)),
+    retention_seconds=float(os.getenv("JOB_RETENTION_HOURS", 168)) * 3600
+)
+
+# Scrape-time gauges read from the components' own stats
+metrics.callback(
+    "awaaz_pool_calls", "Calls per inference pool by state (active, waiting)", ("pool", "state"),
+    lambda: [
+        ((name, state), pool_stats[state])
+        for name, pool_stats in pools.get_stats().items()
+        for state in ("active", "waiting")
+    ]
+)
+metrics.callback(
+    "awaaz_pool_completed_total", "Calls completed per inference pool", ("pool", "outcome"),
+    lambda: [
+        ((name, outcome), pool_stats[key])
+        for name, pool_stats in pools.get_stats().items()
+        for outcome, key in (("ok", "completed"), ("failed", "failed"))
+    ],
+    kind="counter"
+)
+metrics.callback(
+    "awaaz_batcher_queue_depth", "Requests waiting in a micro-batcher", ("batcher",),
+    lambda: [((classify_batcher.name,), classify_batcher.get_stats()['queue_depth'])]
+)
+metrics.callback(
+    "awaaz_cache_hit_ratio", "Hit ratio per cache", ("cache",),
+    lambda: [(("classification",), classification_cache.get_stats()['hit_ratio'])] + (
+        [(("embedding",), clustering.cache.get_stats()['hit_ratio'])] if clustering.cache else []
+    )
+)
+metrics.callback(
+    "awaaz_cache_lookups_total", "Lookups per cache by result", ("cache", "result"),
+    lambda: [
+        (("embedding", result), clustering.cache.get_stats()[key])
+        for result, key in (("memory_hit", "memory_hits"), ("disk_hit", "disk_hits"), ("miss", "misses"))
+    ] if clustering.cache else [],
+    kind="counter"
+)
+metrics.callback(
+    "awaaz_classification_cache_lookups_total", "Classification cache lookups per endpoint by result",
+    ("endpoint", "result"),
+    lambda: [
+        ((endpoint, result), endpoint_stats[result])
+        for endpoint, endpoint_stats in classification_cache.get_stats()['endpoints'].items()
+        for result in ("hits", "coalesced", "misses")
+    ],
+    kind="counter"
+)
+metrics.callback(
+    "awaaz_model_load_seconds", "Time each model took to load", ("model",),
+    lambda: [((name, ), state['seconds']) for name, state in model_loader.get_status()['models'].items()]
+)
+metrics.callback(
+    "awaaz_model_memory_bytes", "Tensor memory of each resident model", ("model",),
+    lambda: [
+        ((key,), int(state['memory_mb'] * 1024 * 1024))
+        for key, state in model_registry.get_status().get('models', {}).items()
+        if state['status'] == 'ready'
+    ]
+)
+metrics.callback(
+    "process_resident_memory_bytes", "Resident memory of this process", (),
+    lambda: [((), process_rss_bytes())]
+)
 
 # ============================================
 # MODELS
@@ -66,7 +365,14 @@ class ClusteringRequest(BaseModel):
     """Request for clustering"""
     issues: List[Dict] = None  # List of issue dicts with 'id' and 'embedding'
     embeddings: List[List[float]] = None  # Pre-computed embeddings
+    embeddings_base64: Optional[str] = None  # Packed little-endian matrix instead of 'embeddings'
+    embeddings_shape: Optional[str] = None  # "n,dim" of embeddings_base64
+    embeddings_dtype: str = "float32"  # float32 or float16
     similarity_threshold: float = 0.75
+    shard: bool = True  # Cluster per (category, geohash cell) when issues carry them
+    geohash_precision: int = Field(6, ge=1, le=10)  # 10 ~ 1.2 m x 0.6 m cells
+    near_duplicate_threshold: Optional[float] = None  # Defaults to NEAR_DUPLICATE_THRESHOLD; 0 disables
+    quality_budget: Optional[int] = None  # Defaults to CLUSTER_QUALITY_BUDGET; 0 skips sampled quality
 
 class ClusteringResponse(BaseModel):
     """Clustering response"""
@@ -84,6 +390,16 @@ class PriorityRequest(BaseModel):
     age_hours: int
     safety_rating: float  # 0-100
 
+class PriorityBatchColumns(BaseModel):
+    """Columnar (parallel arrays) request for batch priority calculation"""
+    categories: List[str]
+    location_density: List[float]
+    citizen_upvotes: List[int]
+    age_hours: List[int]
+    safety_rating: List[float]
+    issue_ids: Optional[List[str]] = None
+    include_reasoning: bool = False
+
 class PriorityResponse(BaseModel):
     """Priority response"""
     priority_level: str  # High, Medium, Low
@@ -94,12 +410,59 @@ class PriorityResponse(BaseModel):
 class EmbeddingRequest(BaseModel):
     """Request for text embeddings"""
     texts: List[str]
+    encoding: str = "json"  # "json" (nested lists) or "base64" (packed matrix)
+    dtype: str = "float32"  # float32 or float16 for packed responses
 
 class EmbeddingResponse(BaseModel):
     """Embedding response"""
     embeddings: List[List[float]]
     model_info: Dict
 
+class SimilarRequest(BaseModel):
+    """Request for a duplicate lookup against the vector index"""
+    text: Optional[str] = None
+    embedding: Optional[List[float]] = None
+    top_k: int = 5
+    min_similarity: float = 0.6
+
+class AssignRequest(BaseModel):
+    """Request to place one new issue into the online clusters"""
+    issue_id: str
+    text: Optional[str] = None
+    embedding: Optional[List[float]] = None
+
+class IndexRequest(BaseModel):
+    """Issues to insert or replace in the vector index"""
+    issues: List[Dict]  # Each with 'id' and either 'embedding' or 'text'
+
+ANALYZE_STAGES = ("classify", "sentiment", "embed", "prioritize")
+
+class AnalyzeRequest(BaseModel):
+    """Request for the single-call ingest pipeline"""
+    text: str
+    title: str = ""
+    language: str = "en"
+    issue_id: Optional[str] = None
+    stages: List[str] = list(ANALYZE_STAGES)  # Any of classify, sentiment, embed, prioritize
+    category: Optional[str] = None  # Priority input when 'classify' is not requested
+    location_density: float = 50  # 0-100
+    citizen_upvotes: int = 0
+    age_hours: int = 0
+    safety_rating: float = 50  # 0-100
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for generators that still read the request body
+
+    On ASGI servers older than spec 2.4 StreamingResponse listens for
+    http.disconnect on receive(), which would steal body chunks from
+    request.stream(). Here the body reader itself sees the disconnect.
+    """
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
 # ============================================
 # HEALTH CHECK
 # ============================================
@@ -110,9 +473,27 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "Awaaz AI Service",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "models_ready": model_loader.is_ready()
     }
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness probe: 200 once every required model has loaded, 503 before
+    
+    Reports each model's status (pending, loading, ready, failed) and load
+    time in seconds
+    """
+    status = model_loader.get_status()
+    status["status"] = "ready" if status["ready"] else "loading"
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
 # ============================================
 # CLASSIFICATION ENDPOINTS
 # ============================================
@@ -132,10 +513,10 @@ async def classify_issue(request: ClassificationRequest):
     - Others
     """
     try:
-        result = classifier.classify(
-            text=request.text,
-            title=request.title,
-            language=request.language
+        result = await classification_cache.get_or_compute(
+            {'text': request.text, 'title': request.title, 'language': request.language},
+            classify_batcher.submit,
+            endpoint="classify"
         )
         
         logger.info(f"Classified issue: {result['primary_category']}")
@@ -151,86 +532,549 @@ async def classify_issue(request: ClassificationRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/api/v1/classify-batch")
-async def classify_batch(requests: List[ClassificationRequest]):
-    """Batch classification of multiple issues"""
+async def classify_batch(requests: List[ClassificationRequest], batch_size: Optional[int] = None):
+    """
+    Batch classification of multiple issues
+    
+    Inputs are length-bucketed and sent to the zero-shot pipeline in
+    batches of ``batch_size`` (query parameter, defaults to CLASSIFY_BATCH_SIZE)
+    """
     try:
-        results = []
-        for req in requests:
-            result = classifier.classify(
-                text=req.text,
-                title=req.title,
-                language=req.language
-            )
-            results.append(result)
+        results = await classification_cache.get_or_compute_many(
+            [
+                {'text': req.text, 'title': req.title, 'language': req.language}
+                for req in requests
+            ],
+            lambda items: pools.run("classifier", classifier.classify_many, items, batch_size=batch_size),
+            endpoint="classify_batch"
+        )
         
         return {"classifications": results, "count": len(results)}
     except Exception as e:
         logger.error(f"Batch classification error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/api/v1/classify-batch/stream")
+async def classify_batch_stream(request: Request, batch_size: Optional[int] = None):
+    """
+    Streaming batch classification
+    
+    Body is NDJSON, one ClassificationRequest per line. Results are streamed
+    back as NDJSON ({"index", "result"} or {"index", "error"}) as each
+    micro-batch finishes.
+    """
+    def parse(value):
+        req = ClassificationRequest(**value)
+        return {'text': req.text, 'title': req.title, 'language': req.language}
+    
+    return NDJSONStreamingResponse(
+        stream_ndjson(
+            request.stream(),
+            lambda items: classification_cache.get_or_compute_many(
+                items,
+                lambda misses: pools.run("classifier", classifier.classify_many, misses),
+                endpoint="classify_stream"
+            ),
+            parse=parse,
+            batch_size=batch_size or STREAM_BATCH_SIZE,
+            max_in_flight=STREAM_MAX_IN_FLIGHT
+        )
+    )
+
+@app.get("/api/v1/classify/batching")
+async def classify_batching_stats():
+    """Queue depth and achieved batch sizes of the /classify scheduler"""
+    return classify_batcher.get_stats()
+
+@app.get("/api/v1/classify/cache")
+async def classify_cache_stats():
+    """Size, backend and per-endpoint hit ratio of the classification result cache"""
+    return classification_cache.get_stats()
+
+@app.get("/api/v1/classify/cascade")
+async def classify_cascade_stats():
+    """Escalation rate and student/BART agreement of the distilled cascade"""
+    return classifier.get_cascade_stats()
+
+@app.get("/api/v1/pools")
+async def get_pool_stats():
+    """Active and waiting calls on each inference pool"""
+    return pools.get_stats()
+
 # ============================================
 # EMBEDDING ENDPOINTS
 # ============================================
 
 @app.post("/api/v1/embed", response_model=EmbeddingResponse)
-async def get_embeddings(request: EmbeddingRequest):
+async def get_embeddings(request: EmbeddingRequest, http_request: Request):
     """
     Get semantic embeddings for texts
     Uses Sentence-BERT for semantic similarity
+    
+    With ``Accept: application/octet-stream`` the embeddings are returned as
+    a packed little-endian matrix (shape and dtype in headers); with
+    ``"encoding": "base64"`` the same bytes are base64-encoded in JSON.
     """
     try:
-        embeddings = clustering.get_embeddings(request.texts)
+        if request.encoding not in ("json", "base64"):
+            raise ValueError(f"Unsupported encoding '{request.encoding}', expected 'json' or 'base64'")
+        resolve_dtype(request.dtype)
+        
+        embeddings = await pools.run("embedding", clustering.get_embedding_matrix, request.texts)
+        model_info = {
+            "model": "sentence-transformers/all-MiniLM-L6-v2",
+            "dimension": 384,
+            "type": "semantic"
+        }
+        
+        if accepts_binary(http_request.headers.get("accept")):
+            return Response(
+                content=encode_matrix(embeddings, request.dtype),
+                media_type=OCTET_STREAM,
+                headers=matrix_headers(embeddings.shape, request.dtype)
+            )
+        if request.encoding == "base64":
+            headers = matrix_headers(embeddings.shape, request.dtype)
+            return JSONResponse(
+                content={
+                    "embeddings_base64": encode_base64(embeddings, request.dtype),
+                    "shape": list(embeddings.shape),
+                    "dtype": headers[DTYPE_HEADER],
+                    "model_info": model_info
+                },
+                headers=headers
+            )
         
         return EmbeddingResponse(
-            embeddings=embeddings,
-            model_info={
-                "model": "sentence-transformers/all-MiniLM-L6-v2",
-                "dimension": 384,
-                "type": "semantic"
-            }
+            embeddings=embeddings.tolist(),
+            model_info=model_info
         )
     except Exception as e:
         logger.error(f"Embedding error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
+def parse_stream_text(value) -> str:
+    """An NDJSON text line is either a JSON string or {"text": ...}"""
+    if isinstance(value, dict):
+        value = value.get('text')
+    if not isinstance(value, str):
+        raise ValueError("Expected a JSON string or an object with 'text'")
+    return value
+
+@app.post("/api/v1/embed/stream")
+async def get_embeddings_stream(request: Request, batch_size: Optional[int] = None):
+    """Streaming embeddings: NDJSON texts in, NDJSON embeddings out"""
+    return NDJSONStreamingResponse(
+        stream_ndjson(
+            request.stream(),
+            lambda texts: pools.run("embedding", clustering.get_embeddings, texts),
+            parse=parse_stream_text,
+            batch_size=batch_size or STREAM_BATCH_SIZE,
+            max_in_flight=STREAM_MAX_IN_FLIGHT
+        )
+    )
+
+@app.get("/api/v1/embed/cache")
+async def get_embedding_cache_stats():
+    """Embedding cache size and hit ratio"""
+    return clustering.cache.get_stats() if clustering.cache else {"enabled": False}
+
 # ============================================
 # CLUSTERING ENDPOINTS
 # ============================================
 
+async def read_clustering_request(http_request: Request):
+    """
+    Parse a clustering request from JSON or from a packed embedding matrix
+    
+    An ``application/octet-stream`` body is the matrix itself (shape and
+    dtype in the X-Embedding-Shape / X-Embedding-Dtype headers, other options
+    as query parameters). In JSON, ``embeddings_base64`` carries the same
+    bytes. Either way the matrix is viewed in place, not parsed per float.
+    
+    Returns:
+        (ClusteringRequest, packed matrix or None)
+    """
+    try:
+        if http_request.headers.get("content-type", "").startswith(OCTET_STREAM):
+            request = ClusteringRequest.model_validate(dict(http_request.query_params))
+            body = await http_request.body()
+            headers = http_request.headers
+            try:
+                matrix = decode_matrix(
+                    body,
+                    headers.get(DTYPE_HEADER),
+                    headers.get(SHAPE_HEADER),
+                    dim=clustering.embedding_dim
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return request, matrix
+        
+        # model_validate rejects a non-object body (e.g. a JSON array) as 422
+        request = ClusteringRequest.model_validate(await http_request.json())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {str(e)}")
+    
+    if request.embeddings_base64 is None:
+        return request, None
+    try:
+        matrix = decode_base64(
+            request.embeddings_base64,
+            request.embeddings_dtype,
+            request.embeddings_shape,
+            dim=clustering.embedding_dim
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return request, matrix
+
 @app.post("/api/v1/cluster", response_model=ClusteringResponse)
-async def cluster_issues(request: ClusteringRequest):
+async def cluster_issues(http_request: Request):
     """
     Cluster similar issues together to identify duplicates
     Uses semantic similarity for intelligent deduplication
+    
+    Accepts a ClusteringRequest as JSON, or a packed embedding matrix as
+    application/octet-stream (see read_clustering_request)
     """
+    with stage("clustering", "deserialize"):
+        request, packed = await read_clustering_request(http_request)
     try:
-        if request.issues:
-            # Extract embeddings from issues if available
-            embeddings = [issue.get('embedding') for issue in request.issues]
-            if not all(embeddings):
-                # Compute embeddings if not provided
-                texts = [issue.get('text', '') for issue in request.issues]
-                embeddings = clustering.get_embeddings(texts)
+        if packed is not None:
+            with stage("clustering", "cluster"):
+                clusters = await cluster_request_embeddings(request, packed)
+            sampled = await sample_cluster_quality(request, packed, clusters)
+            total_issues = len(packed)
+        elif request.issues:
+            clusters, sampled = await cluster_issue_request(request, source="request")
+            total_issues = len(request.issues)
         else:
-            embeddings = request.embeddings
-        
-        clusters = clustering.cluster_issues(
-            embeddings=embeddings,
-            similarity_threshold=request.similarity_threshold
-        )
+            with stage("clustering", "cluster"):
+                clusters = await cluster_request_embeddings(request, request.embeddings)
+            sampled = await sample_cluster_quality(request, request.embeddings, clusters)
+            total_issues = len(request.embeddings)
         
         logger.info(f"Created {len(clusters)} clusters")
         
+        cluster_quality = clustering.get_cluster_quality(clusters)
+        if sampled:
+            cluster_quality['sampled'] = sampled
         return ClusteringResponse(
             clusters=clusters,
-            cluster_quality=clustering.get_cluster_quality(clusters),
-            total_issues=len(embeddings),
+            cluster_quality=cluster_quality,
+            total_issues=total_issues,
             cluster_count=len(clusters)
         )
     except Exception as e:
         logger.error(f"Clustering error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
+async def embed_issues(issues: List[Dict], chunk_size: Optional[int] = None, progress=None) -> List:
+    """
+    Embedding of every issue, computing only those the issue does not carry
+    
+    Args:
+        issues: Issue dicts with 'embedding' or 'text'
+        chunk_size: Embed in chunks of this many texts (all at once if None)
+        progress: Optional callback(done, total) after each chunk
+    """
+    embeddings = [issue.get('embedding') for issue in issues]
+    missing = [idx for idx, embedding in enumerate(embeddings) if not embedding]
+    chunk_size = chunk_size or max(1, len(missing))
+    for start in range(0, len(missing), chunk_size):
+        chunk = missing[start:start + chunk_size]
+        computed = await pools.run(
+            "embedding",
+            clustering.get_embeddings,
+            [issues[idx].get('text', '') for idx in chunk]
+        )
+        for idx, embedding in zip(chunk, computed):
+            embeddings[idx] = embedding
+        if progress:
+            progress(start + len(chunk), len(missing))
+    return embeddings
+
+async def cluster_issue_request(
+    request: ClusteringRequest,
+    source: str,
+    chunk_size: Optional[int] = None,
+    progress=None
+) -> Tuple[List[Dict], Optional[Dict]]:
+    """
+    Cluster request.issues, embedding one issue per near-duplicate group
+    
+    Issues whose texts are near-identical (same category and geohash cell
+    when sharding) are grouped by MinHash-LSH first; only the lowest-index
+    issue of each group is embedded and clustered, and the rest inherit its
+    cluster. Clusters list every original issue index.
+    
+    Returns:
+        (clusters, sampled quality of the embedded issues or None)
+    """
+    issues = request.issues
+    threshold = request.near_duplicate_threshold
+    if threshold is None:
+        threshold = NEAR_DUPLICATE_THRESHOLD
+    
+    groups = None
+    if threshold > 0 and len(issues) > 1:
+        partitions = None
+        if request.shard:
+            partitions = shard_keys(
+                [parse_location(issue) for issue in issues],
+                [issue.get('category') for issue in issues],
+                request.geohash_precision
+            )
+        with stage("clustering", "near_duplicates"):
+            groups = await pools.run(
+                "clustering",
+                near_duplicate_groups,
+                [issue.get('text') or None for issue in issues],
+                threshold=threshold,
+                partitions=partitions
+            )
+    representatives = np.unique(groups) if groups is not None else None
+    if representatives is None or len(representatives) == len(issues):
+        embeddings = await embed_issues(issues, chunk_size, progress)
+        with stage("clustering", "cluster"):
+            clusters = await cluster_request_embeddings(request, embeddings)
+        return clusters, await sample_cluster_quality(request, embeddings, clusters)
+    
+    NEAR_DUPLICATE_ISSUES.inc(source, amount=len(issues) - len(representatives))
+    logger.info(f"Folded {len(issues) - len(representatives)} near-duplicate issues into {len(representatives)}")
+    
+    reduced = request.model_copy(update={'issues': [issues[idx] for idx in representatives]})
+    embeddings = await embed_issues(reduced.issues, chunk_size, progress)
+    with stage("clustering", "cluster"):
+        clusters = await cluster_request_embeddings(reduced, embeddings)
+    # Folded copies carry no embedding, so quality covers the embedded issues
+    sampled = await sample_cluster_quality(reduced, embeddings, clusters)
+    
+    labels = clustering.clusters_to_labels(clusters)
+    return clustering.labels_to_clusters(expand_labels(labels, groups, representatives)), sampled
+
+async def sample_cluster_quality(request: ClusteringRequest, embeddings, clusters: List[Dict]) -> Optional[Dict]:
+    """
+    Sampled silhouette, cohesion and separation of a clustering, or None
+    
+    Runs on the clustering pool within the request's quality budget. A
+    failure is logged and leaves the clusters unaffected.
+    """
+    budget = CLUSTER_QUALITY_BUDGET if request.quality_budget is None else request.quality_budget
+    if budget <= 0 or len(clusters) < 2:
+        return None
+    try:
+        with stage("clustering", "quality"):
+            return await pools.run(
+                "clustering",
+                sampled_cluster_quality,
+                np.asarray(embeddings, dtype=np.float32),
+                clustering.clusters_to_labels(clusters),
+                budget=budget,
+                max_sample=CLUSTER_QUALITY_MAX_SAMPLE,
+                confidence=CLUSTER_QUALITY_CONFIDENCE
+            )
+    except Exception as e:
+        logger.error(f"Cluster quality error: {str(e)}")
+        return None
+
+async def cluster_request_embeddings(request: ClusteringRequest, embeddings) -> List[Dict]:
+    """Cluster a request's embeddings, sharded when its issues carry category / location"""
+    locations = categories = None
+    if request.issues and request.shard:
+        locations = [parse_location(issue) for issue in request.issues]
+        categories = [issue.get('category') for issue in request.issues]
+    
+    if locations and (any(locations) or any(categories)):
+        return await cluster_in_shards(
+            embeddings,
+            locations,
+            categories,
+            request.similarity_threshold,
+            request.geohash_precision
+        )
+    return await pools.run(
+        "clustering",
+        cluster_embeddings,
+        embeddings=embeddings,
+        similarity_threshold=request.similarity_threshold,
+        memory_budget_mb=clustering.memory_budget_mb
+    )
+
+async def cluster_in_shards(embeddings, locations, categories, similarity_threshold, precision):
+    """
+    Cluster each (category, geohash cell) shard in parallel on the clustering
+    pool and stitch clusters back together across shard borders
+    """
+    X = np.asarray(embeddings, dtype=np.float32)
+    shards, homes = await pools.run("clustering", plan_shards, locations, categories, precision)
+    # Pack small shards into one task each up to SHARD_TASK_ROWS rows, but
+    # keep about four tasks per worker so the pool stays balanced
+    workers = pools.get("clustering").max_workers
+    task_rows = max(1, min(SHARD_TASK_ROWS, -(-sum(len(indices) for indices in shards) // (4 * workers))))
+    groups = pack_shards(shards, task_rows)
+    # Slices are cut per task and at most two tasks per worker are queued,
+    # so only a few tasks' embeddings are copied (and pickled) at a time
+    group_labels = []
+    pending = deque()
+    try:
+        for group in iter_shard_groups(X, shards, homes, groups):
+            if len(pending) >= 2 * workers:
+                group_labels.append(await pending.popleft())
+            pending.append(asyncio.ensure_future(pools.run(
+                "clustering",
+                cluster_shard_group,
+                group,
+                similarity_threshold,
+                clustering.memory_budget_mb
+            )))
+        while pending:
+            group_labels.append(await pending.popleft())
+    finally:
+        for task in pending:
+            task.cancel()
+    shard_labels = [labels for group in group_labels for labels in group]
+    labels = await pools.run("clustering", merge_shard_labels, len(X), shards, shard_labels)
+    
+    logger.info(f"Clustered {len(X)} issues in {len(shards)} shards ({len(groups)} tasks)")
+    
+    return clustering.labels_to_clusters(labels)
+
+# ============================================
+# ONLINE CLUSTERING ENDPOINTS
+# ============================================
+
+@app.post("/api/v1/clusters/assign")
+async def assign_to_cluster(request: AssignRequest):
+    """
+    Assign a newly filed issue to an existing duplicate cluster or open a new one
+    Compares against cluster centroids only, no re-clustering of the open set
+    """
+    try:
+        if request.embedding is not None:
+            embedding = request.embedding
+        elif request.text:
+            embedding = (await pools.run("embedding", clustering.get_embeddings, [request.text]))[0]
+        else:
+            raise ValueError("Either 'text' or 'embedding' is required")
+        
+        result = await pools.run("index", online_clustering.assign, request.issue_id, embedding)
+        
+        logger.info(f"Assigned issue {request.issue_id} to cluster {result['cluster_id']}")
+        
+        return result
+    except Exception as e:
+        logger.error(f"Cluster assignment error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.delete("/api/v1/clusters/issues/{issue_id}")
+async def remove_from_cluster(issue_id: str):
+    """Remove a resolved issue from the online clusters"""
+    return {"removed": await pools.run("index", online_clustering.remove, issue_id)}
+
+@app.get("/api/v1/clusters")
+async def get_online_clusters(min_size: int = 1):
+    """Current online clusters and their members"""
+    def snapshot():
+        return online_clustering.get_clusters(min_size=min_size), online_clustering.get_stats()
+    
+    # Off the event loop: the lock may be held by a consolidation
+    clusters, stats = await pools.run("index", snapshot)
+    return {
+        "clusters": clusters,
+        "cluster_count": len(clusters),
+        "stats": stats
+    }
+
+@app.post("/api/v1/clusters/consolidate")
+async def consolidate_clusters():
+    """Merge drifted-together clusters and split off outliers now"""
+    return await pools.run("index", online_clustering.consolidate)
+
+async def consolidate_periodically():
+    """Background consolidation of the online clusters"""
+    while True:
+        await asyncio.sleep(ONLINE_CONSOLIDATE_SECONDS)
+        try:
+            await pools.run("index", online_clustering.consolidate)
+        except Exception as e:
+            logger.error(f"Cluster consolidation error: {str(e)}")
+
+# ============================================
+# SIMILARITY SEARCH ENDPOINTS
+# ============================================
+
+@app.post("/api/v1/similar")
+async def find_similar(request: SimilarRequest):
+    """
+    Find indexed issues similar to a new complaint ("is this a duplicate?")
+    Searches the server-side IVF vector index
+    """
+    try:
+        if request.embedding is not None:
+            query = request.embedding
+        elif request.text:
+            query = (await pools.run("embedding", clustering.get_embeddings, [request.text]))[0]
+        else:
+            raise ValueError("Either 'text' or 'embedding' is required")
+        
+        results = await pools.run(
+            "index",
+            clustering.find_similar_issues,
+            query,
+            top_k=request.top_k,
+            min_similarity=request.min_similarity
+        )
+        
+        return {"similar": results, "count": len(results)}
+    except Exception as e:
+        logger.error(f"Similarity search error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/v1/similar/index")
+async def index_issues(request: IndexRequest):
+    """Insert or replace issues in the vector index"""
+    try:
+        ids = [str(issue['id']) for issue in request.issues]
+        embeddings = [issue.get('embedding') for issue in request.issues]
+        missing = [idx for idx, embedding in enumerate(embeddings) if not embedding]
+        if missing:
+            texts = [request.issues[idx].get('text', '') for idx in missing]
+            computed = await pools.run("embedding", clustering.get_embeddings, texts)
+            for idx, embedding in zip(missing, computed):
+                embeddings[idx] = embedding
+        
+        indexed = await pools.run("index", vector_index.add, ids, embeddings)
+        
+        return {"indexed": indexed, "total": len(vector_index)}
+    except Exception as e:
+        logger.error(f"Indexing error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.delete("/api/v1/similar/index/{issue_id}")
+async def remove_indexed_issue(issue_id: str):
+    """Remove a resolved or deleted issue from the vector index"""
+    removed = await pools.run("index", vector_index.remove, issue_id)
+    return {"removed": removed, "total": len(vector_index)}
+
+@app.get("/api/v1/similar/index")
+async def get_index_stats():
+    """Vector index size and layout"""
+    return vector_index.get_stats()
+
+@app.post("/api/v1/similar/snapshot")
+async def snapshot_index():
+    """Persist the vector index to VECTOR_INDEX_PATH"""
+    if not VECTOR_INDEX_PATH:
+        raise HTTPException(status_code=400, detail="VECTOR_INDEX_PATH is not configured")
+    if getattr(app.state, "index_owner", None) is None:
+        raise HTTPException(status_code=409, detail="Another worker persists the vector index")
+    await pools.run("index", vector_index.save, VECTOR_INDEX_PATH)
+    return {"path": VECTOR_INDEX_PATH, "total": len(vector_index)}
+
 # ============================================
 # PRIORITY ENDPOINTS
 # ============================================
@@ -264,40 +1108,349 @@ async def calculate_priority(request: PriorityRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/api/v1/prioritize-batch")
-async def prioritize_batch(requests: List[PriorityRequest]):
-    """Batch priority calculation"""
+async def prioritize_batch(requests: Union[List[PriorityRequest], PriorityBatchColumns]):
+    """
+    Batch priority calculation
+    
+    Accepts either a list of PriorityRequest objects (per-issue response with
+    reasoning, as before) or a columnar payload of parallel arrays, which is
+    answered with parallel arrays and only generates reasoning on request
+    """
     try:
-        results = []
-        for req in requests:
-            result = priority.calculate_priority(
-                issue_id=req.issue_id,
-                category=req.category,
-                location_density=req.location_density,
-                citizen_upvotes=req.citizen_upvotes,
-                age_hours=req.age_hours,
-                safety_rating=req.safety_rating
+        if isinstance(requests, PriorityBatchColumns):
+            batch = priority.calculate_priority_batch(
+                categories=requests.categories,
+                location_density=requests.location_density,
+                citizen_upvotes=requests.citizen_upvotes,
+                age_hours=requests.age_hours,
+                safety_rating=requests.safety_rating,
+                issue_ids=requests.issue_ids
             )
-            results.append(result)
+            content = {
+                "issue_ids": requests.issue_ids,
+                "priority_score": batch['priority_score'].tolist(),
+                "priority_level": batch['priority_level'].tolist(),
+                "factors": {name: values.tolist() for name, values in batch['factors'].items()},
+                "count": len(batch['priority_score'])
+            }
+            if requests.include_reasoning:
+                content["reasoning"] = priority.batch_reasoning(batch, requests.categories)
+            # Plain JSON response skips per-element encoding of large arrays
+            return JSONResponse(content=content)
+        
+        categories = [req.category for req in requests]
+        batch = priority.calculate_priority_batch(
+            categories=categories,
+            location_density=[req.location_density for req in requests],
+            citizen_upvotes=[req.citizen_upvotes for req in requests],
+            age_hours=[req.age_hours for req in requests],
+            safety_rating=[req.safety_rating for req in requests]
+        )
+        reasoning = priority.batch_reasoning(batch, categories)
+        
+        results = [
+            {
+                'priority_level': str(batch['priority_level'][i]),
+                'priority_score': int(batch['priority_score'][i]),
+                'factors': {name: float(values[i]) for name, values in batch['factors'].items()},
+                'reasoning': reasoning[i]
+            }
+            for i in range(len(requests))
+        ]
         
         return {"priorities": results, "count": len(results)}
     except Exception as e:
         logger.error(f"Batch priority error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
+# ============================================
+# SINGLE-CALL ANALYSIS PIPELINE
+# ============================================
+
+@app.post("/api/v1/analyze")
+async def analyze_issue(request: AnalyzeRequest):
+    """
+    Classify, score sentiment, embed and prioritize one complaint in one call
+    
+    Stages run as a DAG: classification feeds its category into priority,
+    while sentiment and embedding run concurrently on their own pools. In
+    cascade mode classification waits for the embedding instead: the
+    student head answers from that vector, and only complaints it is
+    unsure about go through the batcher to the zero-shot model.
+    
+    ``stages`` selects a subset. A stage that fails is reported under
+    ``errors`` and the others still return; ``timings_ms`` has each
+    stage's wall time and the total.
+    """
+    stages = set(request.stages)
+    unknown = stages - set(ANALYZE_STAGES)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown stages {sorted(unknown)}, expected any of {list(ANALYZE_STAGES)}"
+        )
+    if "prioritize" in stages and "classify" not in stages and not request.category:
+        raise HTTPException(status_code=400, detail="'prioritize' needs the 'classify' stage or a 'category'")
+    
+    started = time.perf_counter()
+    timings = {}
+    
+    async def timed_stage(name: str, awaitable):
+        stage_started = time.perf_counter()
+        try:
+            with stage("analyze", name):
+                return await awaitable
+        finally:
+            timings[name] = round((time.perf_counter() - stage_started) * 1000, 2)
+    
+    # Title and text are combined once, as the classifier and /embed callers do
+    combined = f"{request.title}. {request.text}" if request.title else request.text
+    embed_task = None
+    if "embed" in stages:
+        embed_task = asyncio.ensure_future(
+            timed_stage("embed", pools.run("embedding", clustering.get_embeddings, [combined]))
+        )
+    
+    async def classify_and_prioritize() -> Dict:
+        results = {}
+        category = request.category
+        if "classify" in stages:
+            classification = None
+            if embed_task is not None and classifier.student is not None:
+                await asyncio.wait([embed_task])
+                if not embed_task.exception():
+                    # A few microseconds: one matrix-vector product
+                    student_started = time.perf_counter()
+                    classification = classifier.classify_embedded(request.text, request.title, embed_task.result()[0])
+                    timings['classify'] = round((time.perf_counter() - student_started) * 1000, 2)
+            if classification is None:
+                classification = await timed_stage("classify", classification_cache.get_or_compute(
+                    {'text': request.text, 'title': request.title, 'language': request.language},
+                    classify_batcher.submit,
+                    endpoint="analyze"
+                ))
+            results['classification'] = classification
+            category = classification['primary_category']
+        if "prioritize" in stages:
+            prioritize_started = time.perf_counter()
+            with stage("analyze", "prioritize"):
+                result = priority.calculate_priority(
+                    issue_id=request.issue_id or "",
+                    category=category,
+                    location_density=request.location_density,
+                    citizen_upvotes=request.citizen_upvotes,
+                    age_hours=request.age_hours,
+                    safety_rating=request.safety_rating
+                )
+            timings['prioritize'] = round((time.perf_counter() - prioritize_started) * 1000, 2)
+            results['priority'] = {key: result[key] for key in PriorityResponse.model_fields}
+        return results
+    
+    branches = {}
+    if stages & {"classify", "prioritize"}:
+        branches['classify'] = classify_and_prioritize()
+    if "sentiment" in stages:
+        branches['sentiment'] = timed_stage("sentiment", pools.run("sentiment", sentiment.analyze, request.text))
+    if embed_task is not None:
+        branches['embed'] = embed_task
+    
+    outcomes = await asyncio.gather(*branches.values(), return_exceptions=True)
+    
+    response = {"issue_id": request.issue_id}
+    errors = {}
+    for name, outcome in zip(branches, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Analyze {name} error: {str(outcome)}")
+            errors[name] = str(outcome)
+        elif name == "classify":
+            response.update(outcome)
+        elif name == "sentiment":
+            response['sentiment'] = outcome
+        else:
+            response['embedding'] = outcome[0]
+    
+    timings['total'] = round((time.perf_counter() - started) * 1000, 2)
+    response['timings_ms'] = timings
+    response['errors'] = errors
+    return response
+
 # ============================================
 # SENTIMENT ANALYSIS ENDPOINTS
 # ============================================
 
 @app.post("/api/v1/sentiment")
-async def analyze_sentiment(texts: List[str]):
-    """Analyze sentiment of texts"""
+async def analyze_sentiment(texts: List[str], batch_size: Optional[int] = None):
+    """
+    Analyze sentiment of texts
+    
+    The transformer runs over length-bucketed batches of ``batch_size``
+    (query parameter, defaults to SENTIMENT_BATCH_SIZE)
+    """
     try:
-        results = sentiment.analyze_batch(texts)
+        results = await pools.run("sentiment", sentiment.analyze_batch, texts, batch_size)
         return {"sentiments": results}
     except Exception as e:
         logger.error(f"Sentiment analysis error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/api/v1/sentiment/stream")
+async def analyze_sentiment_stream(request: Request, batch_size: Optional[int] = None):
+    """Streaming sentiment: NDJSON texts in, NDJSON sentiments out"""
+    return NDJSONStreamingResponse(
+        stream_ndjson(
+            request.stream(),
+            lambda texts: pools.run("sentiment", sentiment.analyze_batch, texts),
+            parse=parse_stream_text,
+            batch_size=batch_size or STREAM_BATCH_SIZE,
+            max_in_flight=STREAM_MAX_IN_FLIGHT
+        )
+    )
+
+# ============================================
+# JOB ENDPOINTS
+# ============================================
+
+async def run_classify_job(items: List[Dict], job) -> Dict:
+    """Classify in chunks, emitting {"index", "result"} records"""
+    for start in range(0, len(items), JOB_CHUNK_SIZE):
+        chunk = items[start:start + JOB_CHUNK_SIZE]
+        results = await classification_cache.get_or_compute_many(
+            chunk,
+            lambda misses: pools.run("classifier", classifier.classify_many, misses),
+            endpoint="jobs"
+        )
+        await job.emit(
+            [{'index': start + offset, 'result': result} for offset, result in enumerate(results)],
+            done=start + len(chunk),
+            total=len(items),
+            phase="classify"
+        )
+    return {'count': len(items)}
+
+async def run_embed_job(texts: List[str], job) -> Dict:
+    """Embed in chunks, emitting {"index", "embedding"} records"""
+    for start in range(0, len(texts), JOB_CHUNK_SIZE):
+        chunk = texts[start:start + JOB_CHUNK_SIZE]
+        matrix = await pools.run("embedding", clustering.get_embedding_matrix, chunk)
+        await job.emit(
+            [{'index': start + offset, 'embedding': row} for offset, row in enumerate(matrix.tolist())],
+            done=start + len(chunk),
+            total=len(texts),
+            phase="embed"
+        )
+    return {'count': len(texts), 'dimension': clustering.embedding_dim}
+
+async def run_cluster_job(request: ClusteringRequest, job) -> Dict:
+    """
+    Embed issues that lack an embedding (reported as progress), then cluster
+    and emit one {"cluster": ...} record per cluster
+    """
+    if request.embeddings_base64 is None and request.issues:
+        clusters, sampled = await cluster_issue_request(
+            request,
+            source="job",
+            chunk_size=JOB_CHUNK_SIZE,
+            progress=lambda done, total: job.progress(done, total, phase="embed")
+        )
+        total_issues = len(request.issues)
+    else:
+        if request.embeddings_base64 is not None:
+            embeddings = decode_base64(
+                request.embeddings_base64,
+                request.embeddings_dtype,
+                request.embeddings_shape,
+                dim=clustering.embedding_dim
+            )
+        else:
+            embeddings = request.embeddings
+        job.progress(0, len(embeddings), phase="cluster")
+        clusters = await cluster_request_embeddings(request, embeddings)
+        sampled = await sample_cluster_quality(request, embeddings, clusters)
+        total_issues = len(embeddings)
+    
+    await job.emit([{'cluster': cluster} for cluster in clusters], done=total_issues, total=total_issues, phase="cluster")
+    cluster_quality = clustering.get_cluster_quality(clusters)
+    if sampled:
+        cluster_quality['sampled'] = sampled
+    return {
+        'cluster_quality': cluster_quality,
+        'total_issues': total_issues,
+        'cluster_count': len(clusters)
+    }
+
+job_manager.register("classify", run_classify_job)
+job_manager.register("embed", run_embed_job)
+job_manager.register("cluster", run_cluster_job)
+
+def submit_job(kind: str, payload) -> Dict:
+    try:
+        job = job_manager.submit(kind, payload)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    logger.info(f"Queued {kind} job {job['job_id']}")
+    return job
+
+@app.post("/api/v1/jobs/classify", status_code=202)
+async def submit_classify_job(requests: List[ClassificationRequest]):
+    """Classify many issues in the background; results stream as they finish"""
+    return submit_job("classify", [
+        {'text': req.text, 'title': req.title, 'language': req.language}
+        for req in requests
+    ])
+
+@app.post("/api/v1/jobs/embed", status_code=202)
+async def submit_embed_job(request: EmbeddingRequest):
+    """Embed many texts in the background"""
+    return submit_job("embed", request.texts)
+
+@app.post("/api/v1/jobs/cluster", status_code=202)
+async def submit_cluster_job(request: ClusteringRequest):
+    """Cluster a large backlog in the background (same body as /api/v1/cluster)"""
+    return submit_job("cluster", request)
+
+@app.get("/api/v1/jobs")
+async def list_jobs(status: Optional[str] = None):
+    """Jobs of this worker, newest first, with queue statistics"""
+    return {"jobs": job_manager.list(status), "stats": job_manager.get_stats()}
+
+@app.get("/api/v1/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress and summary of a job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@app.get("/api/v1/jobs/{job_id}/results")
+async def get_job_results(job_id: str, offset: int = 0, follow: bool = True):
+    """
+    Results as NDJSON, starting at record ``offset``
+    
+    With ``follow`` (default) the response stays open and streams partial
+    results until the job finishes; without it, only what is ready now.
+    """
+    if job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return StreamingResponse(
+        job_manager.stream_results(job_id, offset=max(0, offset), follow=follow),
+        media_type="application/x-ndjson"
+    )
+
+@app.post("/api/v1/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; results emitted so far are kept"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found on this worker")
+    return job
+
+@app.delete("/api/v1/jobs/{job_id}")
+async def delete_job(job_id: str):
+    """Delete a finished job and its results"""
+    if not job_manager.delete(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is unknown or still active")
+    return {"deleted": job_id}
+
 # ============================================
 # UTILITY ENDPOINTS
 # ============================================
@@ -319,12 +1472,18 @@ async def get_categories():
 
 @app.get("/api/v1/models")
 async def get_model_info():
-    """Get information about loaded models"""
+    """Get information about loaded models, their memory and load times"""
     return {
         "classification_model": classifier.model_name,
         "embedding_model": clustering.model_name,
         "embedding_dimension": 384,
-        "language": "multilingual"
+        "language": "multilingual",
+        "quantization": {
+            "classifier": classifier.quantization,
+            "embedding": clustering.quantization,
+            "sentiment": sentiment.quantization
+        },
+        "registry": model_registry.get_status()
     }
 
 # ============================================
@@ -334,10 +1493,26 @@ async def get_model_info():
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Custom HTTP exception handler"""
-    return {
-        "error": exc.detail,
-        "status_code": exc.status_code
-    }
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={
+            "error": exc.detail,
+            "status_code": exc.status_code
+        }
+    )
+
+# ============================================
+# METRICS
+# ============================================
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics: per-endpoint and per-stage latency histograms,
+    model batch sizes, pool and batcher queue depths, cache hit ratios,
+    model load times and memory, process RSS
+    """
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 # ============================================
 # STARTUP & SHUTDOWN
@@ -347,25 +1522,68 @@ async def http_exception_handler(request, exc):
 async def startup_event():
     """Initialize services on startup"""
     logger.info("Starting Awaaz AI Service...")
-    logger.info("Loading NLP models...")
-    classifier.load_models()
-    clustering.load_models()
-    logger.info("AI Service ready!")
+    logger.info("Loading NLP models in the background...")
+    # Requests that need a model wait for its load; /health/ready reports progress
+    model_loader.start()
+    
+    if os.getenv("CLASSIFIER_MODE", "zero_shot") == "cascade":
+        head_path = os.getenv("STUDENT_HEAD_PATH", "models/student_head.npz")
+        try:
+            classifier.enable_cascade(
+                StudentHead.load(head_path),
+                clustering.get_embeddings,
+                threshold=float(os.getenv("CASCADE_THRESHOLD", 0.8))
+            )
+        except Exception as e:
+            logger.error(f"Could not enable cascade from {head_path}: {str(e)}")
+    
+    if VECTOR_INDEX_PATH:
+        # With several workers only one writes the snapshot (see shutdown)
+        app.state.index_owner = claim_snapshot_owner(VECTOR_INDEX_PATH)
+        if app.state.index_owner is None:
+            logger.info("Vector index snapshot is owned by another worker; this worker will not save it")
+    
+    classify_batcher.start()
+    job_manager.start()
+    if ONLINE_CONSOLIDATE_SECONDS > 0:
+        app.state.consolidation_task = asyncio.create_task(consolidate_periodically())
+    logger.info("AI Service accepting requests")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down Awaaz AI Service...")
+    await classify_batcher.stop()
+    await job_manager.stop()
+    consolidation_task = getattr(app.state, "consolidation_task", None)
+    if consolidation_task:
+        consolidation_task.cancel()
+    if VECTOR_INDEX_PATH and getattr(app.state, "index_owner", None) is not None:
+        vector_index.save(VECTOR_INDEX_PATH)
+    pools.shutdown(wait=False)
 
 if __name__ == "__main__":
     import uvicorn
     
     port = int(os.getenv("AI_SERVICE_PORT", 8001))
     host = os.getenv("AI_SERVICE_HOST", "0.0.0.0")
+    workers = int(os.getenv("AI_SERVICE_WORKERS", 1))
+    
+    if INFERENCE_HOSTS > 0:
+        # Models load once per host (one per core group), not once per
+        # worker; workers find their host through the inherited environment
+        os.environ.setdefault("INFERENCE_HOST_AUTHKEY", new_authkey())
+        inference_hosts = start_hosts(
+            INFERENCE_HOSTS,
+            INFERENCE_HOST_SOCKET,
+            os.environ["INFERENCE_HOST_AUTHKEY"].encode("utf-8")
+        )
+        logger.info(f"Started {len(inference_hosts)} inference host(s) for {workers} HTTP worker(s)")
     
     uvicorn.run(
-        app,
+        "main:app" if workers > 1 or INFERENCE_HOSTS > 0 else app,
         host=host,
         port=port,
+        workers=workers,
         log_level="info"
     )
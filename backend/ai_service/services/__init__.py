@@ -2,12 +2,14 @@
 
 from .classifier import ClassificationService
 from .clustering import ClusteringService
+from .online_clustering import OnlineClusteringService
 from .priority import PriorityService
 from .sentiment import SentimentService
 
 __all__ = [
     'ClassificationService',
     'ClusteringService',
+    'OnlineClusteringService',
     'PriorityService',
     'SentimentService'
 ]
@@ -0,0 +1,187 @@
+"""
+Micro-batching Scheduler - Coalesce concurrent requests into batched model calls
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .metrics import BATCH_SIZE_BUCKETS, metrics
+
+logger = logging.getLogger(__name__)
+
+BATCHER_BATCH_SIZE = metrics.histogram(
+    "awaaz_batcher_batch_size",
+    "Requests coalesced per micro-batch",
+    ("batcher",),
+    BATCH_SIZE_BUCKETS
+)
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent single-item requests into one batched call.
+
+    Callers ``await submit(item)`` and receive their own result. A background
+    task drains the queue: it waits for the first item, then keeps collecting
+    until either ``max_batch_size`` items are queued or ``max_wait_ms`` has
+    elapsed, and hands the whole batch to ``batch_fn`` in one call.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        name: str = "batcher",
+        runner: Optional[Callable[..., Awaitable[Any]]] = None
+    ):
+        """
+        Args:
+            batch_fn: Synchronous function mapping a list of items to a list
+                of results of the same length and order
+            max_batch_size: Upper bound on items per batched call
+            max_wait_ms: How long to hold the first item waiting for company
+            name: Label used in logs and stats
+            runner: Coroutine function ``runner(fn, items)`` that executes
+                the batch off the event loop (defaults to the loop's
+                default executor)
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self.runner = runner or self._run_in_default_executor
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # Tuning statistics
+        self._batches = 0
+        self._items = 0
+        self._last_batch_size = 0
+        self._max_seen_batch_size = 0
+        self._size_histogram: Dict[int, int] = {}
+
+    def start(self):
+        """Start the background worker on the running event loop"""
+        if self._worker and not self._worker.done():
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+        logger.info(
+            f"Started {self.name} (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.1f})"
+        )
+
+    async def stop(self):
+        """Stop the worker, failing any requests still waiting"""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        if self._queue:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError(f"{self.name} stopped"))
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue a single item and wait for its result
+
+        Args:
+            item: One input for ``batch_fn``
+
+        Returns:
+            The result ``batch_fn`` produced for this item
+        """
+        if not self._worker or self._worker.done():
+            self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> list:
+        """Wait for one item, then gather more until full or the window closes"""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Window closed, but take whatever is already waiting
+                while len(batch) < self.max_batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    @staticmethod
+    async def _run_in_default_executor(fn: Callable, items: List[Any]) -> List[Any]:
+        return await asyncio.get_running_loop().run_in_executor(None, fn, items)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+
+            self._record(len(batch))
+
+            try:
+                results = await self.runner(self.batch_fn, items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name} returned {len(results)} results for {len(items)} items"
+                    )
+            except Exception as e:
+                logger.error(f"{self.name} batch error: {str(e)}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for future, result in zip(futures, results):
+                # Caller may have gone away (client disconnect / timeout)
+                if not future.done():
+                    future.set_result(result)
+
+    def _record(self, size: int):
+        self._batches += 1
+        self._items += size
+        self._last_batch_size = size
+        self._max_seen_batch_size = max(self._max_seen_batch_size, size)
+        self._size_histogram[size] = self._size_histogram.get(size, 0) + 1
+        BATCHER_BATCH_SIZE.observe(size, self.name)
+
+    def get_stats(self) -> Dict:
+        """Queue depth and achieved batch sizes for tuning"""
+        return {
+            'name': self.name,
+            'running': bool(self._worker and not self._worker.done()),
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': round(self.max_wait * 1000, 3),
+            'batches': self._batches,
+            'items': self._items,
+            'avg_batch_size': round(self._items / self._batches, 2) if self._batches else 0,
+            'last_batch_size': self._last_batch_size,
+            'max_seen_batch_size': self._max_seen_batch_size,
+            'batch_size_histogram': {
+                str(size): count for size, count in sorted(self._size_histogram.items())
+            }
+        }
@@ -3,8 +3,12 @@ NLP Classification Service - Categorize civic issues
 """
 
 import logging
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-import torch
+import threading
+from typing import Optional
+
+from .metrics import instrument_model, observe_batch, stage
+from .model_registry import ModelRegistry, default_registry
+from .quantization import load_model, mode_for_device, resolve_mode
 
 logger = logging.getLogger(__name__)
 
@@ -21,25 +25,97 @@ class ClassificationService:
         "Others"
     ]
     
-    def __init__(self):
-        self.model_name = "distilbert-base-uncased-finetuned-sst-2-english"
+    TASK = "zero-shot-classification"
+    
+    def __init__(
+        self,
+        batch_size: int = 16,
+        quantization: str = "none",
+        quantized_cache_dir: str = None,
+        registry: Optional[ModelRegistry] = None
+    ):
+        """
+        Args:
+            batch_size: Default texts per zero-shot forward pass
+            quantization: "int8" for dynamic int8 linear layers on CPU
+            quantized_cache_dir: Where quantized weights are cached
+            registry: Shared model registry (the process default when None)
+        """
+        self.model_name = "facebook/bart-large-mnli"
         self.classifier = None
-        self.zero_shot_classifier = None
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = None  # Resolved when the models are loaded
+        self.batch_size = max(1, batch_size)
+        self.quantization = resolve_mode(quantization)
+        self.quantized_cache_dir = quantized_cache_dir
+        self.registry = registry or default_registry
+        # Registry variant; quantization may fall back to fp32 at load time
+        self._variant = self.quantization
+        
+        # Optional distilled cascade (see services/distillation.py)
+        self.student = None
+        self.embed_fn = None
+        self.cascade_threshold = 0.8
+        self._cascade_lock = threading.Lock()
+        self._cascade_stats = {'total': 0, 'escalated': 0, 'compared': 0, 'agreed': 0}
         
     def load_models(self):
-        """Load pre-trained models"""
+        """
+        Load pre-trained models
+        
+        torch and transformers are imported here rather than at module
+        import, so the service starts without paying for them. The pipeline
+        lives in the model registry, which loads it once per process.
+        """
+        self.registry.get(self.model_name, self.TASK, self._load_models, self._variant, owner="classifier")
+    
+    @property
+    def zero_shot_classifier(self):
+        """The zero-shot pipeline if it is resident, else None"""
+        return self.registry.peek(self.model_name, self.TASK, self._variant)
+    
+    def _zero_shot(self):
+        """Lease the zero-shot pipeline from the registry, loading it if needed"""
+        return self.registry.use(self.model_name, self.TASK, self._load_models, self._variant, owner="classifier")
+
+    @property
+    def model_version(self) -> str:
+        """Identifies what produces results: model, quantization and cascade"""
+        version = f"{self.model_name}@{self._variant}"
+        if self.student:
+            version += f"+cascade:{self.cascade_threshold}"
+        return version
+
+    def _load_models(self):
         try:
+            import torch
+            from transformers import pipeline
+            
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
             logger.info(f"Loading classifier on device: {self.device}")
             
+            model_name = self.model_name
+            model, tokenizer = model_name, None
+            self.quantization = mode_for_device(self.quantization, self.device)
+            if self.quantization != "none":
+                from transformers import AutoModelForSequenceClassification, AutoTokenizer
+                tokenizer = AutoTokenizer.from_pretrained(model_name)
+                model = load_model(
+                    model_name,
+                    lambda: AutoModelForSequenceClassification.from_pretrained(model_name),
+                    self.quantization,
+                    self.quantized_cache_dir
+                )
+            
             # For zero-shot classification (more flexible)
-            self.zero_shot_classifier = pipeline(
-                "zero-shot-classification",
-                model="facebook/bart-large-mnli",
+            zero_shot_classifier = pipeline(
+                self.TASK,
+                model=model,
+                tokenizer=tokenizer,
                 device=0 if self.device == "cuda" else -1
             )
             
             logger.info("Classification models loaded successfully")
+            return instrument_model(zero_shot_classifier, "classifier")
         except Exception as e:
             logger.error(f"Failed to load models: {str(e)}")
             raise
@@ -56,53 +132,241 @@ class ClassificationService:
         Returns:
             Dictionary with classification results
         """
+        if self.student:
+            return self.classify_many([{'text': text, 'title': title, 'language': language}])[0]
+        
         try:
             # Combine title and text for better classification
-            combined_text = f"{title}. {text}" if title else text
-            
-            if not self.zero_shot_classifier:
-                self.load_models()
+            combined_text = self._combine(text, title)
             
             # Use zero-shot classification for flexibility
-            result = self.zero_shot_classifier(
-                combined_text,
-                self.CATEGORIES,
-                multi_class=False
-            )
-            
-            # Extract results
-            primary_category = result['labels'][0]
-            confidence = float(result['scores'][0])
-            
-            # Get secondary categories
-            secondary_categories = [
-                label for label, score in zip(result['labels'][1:4], result['scores'][1:4])
-                if score > 0.1
-            ]
-            
-            # Generate reasoning
-            reasoning = self._generate_reasoning(
-                combined_text,
-                primary_category,
-                confidence
-            )
+            with self._zero_shot() as zero_shot_classifier, stage("classifier", "model_call"):
+                observe_batch("classifier", 1)
+                result = zero_shot_classifier(
+                    combined_text,
+                    self.CATEGORIES,
+                    multi_class=False
+                )
             
-            return {
-                'primary_category': primary_category,
-                'confidence': confidence,
-                'secondary_categories': secondary_categories,
-                'reasoning': reasoning
-            }
+            with stage("classifier", "format"):
+                return self._format_result(combined_text, result)
             
         except Exception as e:
             logger.error(f"Classification error: {str(e)}")
-            # Fallback to "Others" if classification fails
-            return {
-                'primary_category': 'Others',
-                'confidence': 0.0,
-                'secondary_categories': [],
-                'reasoning': f"Classification failed: {str(e)}"
-            }
+            return self._fallback_result(e)
+    
+    def classify_many(self, items: list, batch_size: int = None) -> list:
+        """
+        Classify several issues with batched zero-shot pipeline calls
+        
+        Inputs are sorted by length and split into buckets of ``batch_size``
+        so each forward pass pads to a similar length. Results are returned
+        in the original order. When a cascade is enabled the student head
+        answers first and only low-confidence texts reach the pipeline.
+        
+        Args:
+            items: List of dicts with 'text' and optional 'title', 'language'
+            batch_size: Texts per forward pass (defaults to self.batch_size)
+            
+        Returns:
+            List of classification results in the same order as items
+        """
+        if not items:
+            return []
+        
+        batch_size = max(1, batch_size or self.batch_size)
+        combined_texts = [
+            self._combine(item.get('text', ''), item.get('title', ''))
+            for item in items
+        ]
+        
+        if self.student:
+            return self._classify_cascade(combined_texts, batch_size)
+        return self._zero_shot_many(combined_texts, batch_size)
+    
+    def _zero_shot_many(self, combined_texts: list, batch_size: int) -> list:
+        """Length-bucketed zero-shot classification of prepared texts"""
+        results = [None] * len(combined_texts)
+        try:
+            with self._zero_shot() as zero_shot_classifier:
+                for bucket in self._length_buckets(combined_texts, batch_size):
+                    bucket_texts = [combined_texts[idx] for idx in bucket]
+                    try:
+                        observe_batch("classifier", len(bucket))
+                        with stage("classifier", "model_call"):
+                            outputs = zero_shot_classifier(
+                                bucket_texts,
+                                self.CATEGORIES,
+                                multi_class=False,
+                                batch_size=batch_size
+                            )
+                        # The pipeline unwraps single-element lists
+                        if isinstance(outputs, dict):
+                            outputs = [outputs]
+                        
+                        with stage("classifier", "format"):
+                            for idx, text, output in zip(bucket, bucket_texts, outputs):
+                                results[idx] = self._format_result(text, output)
+                    except Exception as e:
+                        # A failing bucket only degrades its own members
+                        logger.error(f"Batch classification error: {str(e)}")
+                        for idx in bucket:
+                            results[idx] = self._fallback_result(e)
+        except Exception as e:
+            # The model could not be loaded
+            logger.error(f"Batch classification error: {str(e)}")
+            return [self._fallback_result(e) for _ in combined_texts]
+        
+        return results
+    
+    def enable_cascade(self, student, embed_fn, threshold: float = 0.8):
+        """
+        Answer from a distilled student head, escalating to BART-MNLI when unsure
+        
+        Args:
+            student: Trained StudentHead
+            embed_fn: Function mapping a list of texts to embeddings from
+                the encoder the student was trained on
+            threshold: Student confidence below which BART is consulted
+        """
+        self.student = student
+        self.embed_fn = embed_fn
+        self.cascade_threshold = threshold
+        logger.info(f"Cascade classification enabled (threshold={threshold})")
+    
+    def classify_embedded(self, text: str, title: str, embedding) -> Optional[dict]:
+        """
+        Student head's answer from an embedding the caller already has
+        
+        Skips the encoder call of the cascade. Returns None when the cascade
+        is off or the student is unsure; classify the item as usual then,
+        which escalates it (and counts it) as the cascade would.
+        
+        Args:
+            text: Issue description
+            title: Issue title
+            embedding: Embedding of the combined title and text
+        
+        Returns:
+            Classification result, or None
+        """
+        if not self.student:
+            return None
+        try:
+            with stage("classifier", "student"):
+                output = self.student.predict([embedding])[0]
+        except Exception as e:
+            logger.error(f"Student classification error: {str(e)}")
+            return None
+        if output['scores'][0] < self.cascade_threshold:
+            return None
+        
+        with self._cascade_lock:
+            self._cascade_stats['total'] += 1
+        return self._format_result(self._combine(text, title), output, source='student')
+    
+    def _classify_cascade(self, combined_texts: list, batch_size: int) -> list:
+        """Student head first, zero-shot only for low-confidence texts"""
+        try:
+            with stage("classifier", "student"):
+                outputs = self.student.predict(self.embed_fn(combined_texts))
+        except Exception as e:
+            logger.error(f"Student classification error: {str(e)}")
+            return self._zero_shot_many(combined_texts, batch_size)
+        
+        results = [None] * len(combined_texts)
+        escalate = []
+        for idx, (text, output) in enumerate(zip(combined_texts, outputs)):
+            if output['scores'][0] >= self.cascade_threshold:
+                results[idx] = self._format_result(text, output, source='student')
+            else:
+                escalate.append(idx)
+        
+        compared = agreed = 0
+        if escalate:
+            teacher_results = self._zero_shot_many(
+                [combined_texts[idx] for idx in escalate],
+                batch_size
+            )
+            for idx, result in zip(escalate, teacher_results):
+                result['source'] = 'zero_shot'
+                results[idx] = result
+                # Failed teacher calls carry no label to compare against
+                if result['confidence'] > 0:
+                    compared += 1
+                    agreed += outputs[idx]['labels'][0] == result['primary_category']
+        
+        with self._cascade_lock:
+            self._cascade_stats['total'] += len(combined_texts)
+            self._cascade_stats['escalated'] += len(escalate)
+            self._cascade_stats['compared'] += compared
+            self._cascade_stats['agreed'] += agreed
+        
+        return results
+    
+    def get_cascade_stats(self) -> dict:
+        """Escalation rate and student/BART agreement on escalated texts"""
+        with self._cascade_lock:
+            stats = dict(self._cascade_stats)
+        
+        return {
+            'enabled': self.student is not None,
+            'threshold': self.cascade_threshold,
+            'total': stats['total'],
+            'escalated': stats['escalated'],
+            'escalation_rate': round(stats['escalated'] / stats['total'], 4) if stats['total'] else 0.0,
+            'escalated_agreement': round(stats['agreed'] / stats['compared'], 4) if stats['compared'] else 0.0
+        }
+    
+    @staticmethod
+    def _length_buckets(texts: list, batch_size: int) -> list:
+        """Group text indices into batches of similar length"""
+        order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
+        return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+    
+    @staticmethod
+    def _combine(text: str, title: str = "") -> str:
+        """Combine title and text for better classification"""
+        return f"{title}. {text}" if title else text
+    
+    def _format_result(self, combined_text: str, result: dict, source: str = None) -> dict:
+        """Turn ranked labels/scores (zero-shot or student) into a classification result"""
+        # Extract results
+        primary_category = result['labels'][0]
+        confidence = float(result['scores'][0])
+        
+        # Get secondary categories
+        secondary_categories = [
+            label for label, score in zip(result['labels'][1:4], result['scores'][1:4])
+            if score > 0.1
+        ]
+        
+        # Generate reasoning
+        reasoning = self._generate_reasoning(
+            combined_text,
+            primary_category,
+            confidence
+        )
+        
+        formatted = {
+            'primary_category': primary_category,
+            'confidence': confidence,
+            'secondary_categories': secondary_categories,
+            'reasoning': reasoning
+        }
+        if source:
+            formatted['source'] = source
+        return formatted
+    
+    @staticmethod
+    def _fallback_result(error: Exception) -> dict:
+        """Fallback to "Others" if classification fails"""
+        return {
+            'primary_category': 'Others',
+            'confidence': 0.0,
+            'secondary_categories': [],
+            'reasoning': f"Classification failed: {str(error)}"
+        }
     
     def _generate_reasoning(self, text: str, category: str, confidence: float) -> str:
         """Generate human-readable reasoning for classification"""
@@ -136,10 +400,23 @@ class ClassificationService:
         
         return f"Classified as '{category}' with {confidence_pct}% confidence{keyword_text}."
     
-    def batch_classify(self, texts: list) -> list:
-        """Classify multiple texts at once"""
-        results = []
-        for text in texts:
-            result = self.classify(text)
-            results.append(result)
-        return results
+    def batch_classify(self, texts: list, titles: list = None, batch_size: int = None) -> list:
+        """
+        Classify multiple texts at once
+        
+        Args:
+            texts: Issue descriptions
+            titles: Optional issue titles, parallel to texts
+            batch_size: Texts per forward pass (defaults to self.batch_size)
+            
+        Returns:
+            List of classification results in the same order as texts
+        """
+        titles = titles or [""] * len(texts)
+        if len(titles) != len(texts):
+            raise ValueError("titles must be the same length as texts")
+        
+        return self.classify_many(
+            [{'text': text, 'title': title} for text, title in zip(texts, titles)],
+            batch_size=batch_size
+        )
@@ -0,0 +1,154 @@
+"""
+Cluster Quality - Sampled silhouette, cohesion and separation with confidence intervals
+"""
+
+import logging
+import time
+from statistics import NormalDist
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Lower bounds of the cluster-size strata: 2, 3-5, 6-20, 21+
+SIZE_STRATA = (2, 3, 6, 21)
+
+
+def _allocate(stratum_sizes: np.ndarray, sample_size: int) -> np.ndarray:
+    """Proportional allocation by largest remainder, at least 2 per stratum where possible"""
+    share = sample_size * stratum_sizes / stratum_sizes.sum()
+    allocation = np.floor(share).astype(np.int64)
+    remainder = sample_size - allocation.sum()
+    allocation[np.argsort(allocation - share)[:remainder]] += 1
+    # Two draws give a stratum a variance estimate; take them from the largest strata
+    floor = np.minimum(stratum_sizes, 2)
+    while (allocation < floor).any() and allocation.sum() > floor.sum():
+        needy = np.argmax(floor - allocation)
+        allocation[np.argmax(allocation - floor)] -= 1
+        allocation[needy] += 1
+    return np.minimum(allocation, stratum_sizes)
+
+
+def _stratified_estimate(values: np.ndarray, strata: np.ndarray, stratum_sizes: np.ndarray, z: float) -> Dict:
+    """Stratified mean with a normal-approximation confidence interval"""
+    weights = stratum_sizes / stratum_sizes.sum()
+    mean = variance = 0.0
+    for h, (weight, population) in enumerate(zip(weights, stratum_sizes)):
+        sample = values[strata == h]
+        if not len(sample):
+            continue
+        mean += weight * sample.mean()
+        if len(sample) > 1:
+            # Finite population correction: a fully sampled stratum adds no variance
+            variance += weight ** 2 * (1 - len(sample) / population) * sample.var(ddof=1) / len(sample)
+    half_width = z * np.sqrt(variance)
+    return {
+        'mean': round(float(mean), 4),
+        'ci_low': round(float(mean - half_width), 4),
+        'ci_high': round(float(mean + half_width), 4)
+    }
+
+
+def sampled_cluster_quality(
+    embeddings,
+    labels,
+    budget: int = 20_000_000,
+    max_sample: int = 2000,
+    confidence: float = 0.95,
+    seed: int = 0,
+    memory_budget_mb: float = 64
+) -> Optional[Dict]:
+    """
+    Silhouette, cohesion and separation of merged issues on a stratified sample
+
+    With unit vectors the mean cosine similarity of a point to a cluster is
+    its dot product with the cluster's vector sum divided by the cluster
+    size, so each sampled point is compared with k cluster sums instead of
+    all n points and its silhouette is exact. The sample is drawn from
+    issues in clusters of two or more (singletons have no cohesion),
+    stratified by cluster size so a few large clusters cannot dominate.
+
+    Metrics, per sampled issue i with own cluster A:
+        cohesion: mean cosine similarity to the other members of A
+        separation: mean cosine distance to the nearest other cluster
+        silhouette: (b - a) / max(a, b) with a = 1 - cohesion, b = separation
+
+    Args:
+        embeddings: (n, dim) embedding matrix
+        labels: Contiguous cluster label per issue (0..k-1)
+        budget: Point-to-cluster comparisons allowed; the sample holds at
+            most budget // k issues
+        max_sample: Upper bound on sampled issues
+        confidence: Confidence level of the intervals
+        seed: Sampling seed
+        memory_budget_mb: Peak size of one block of similarities
+
+    Returns:
+        Estimates with confidence intervals plus sample bookkeeping, or
+        None when there is nothing to assess (no merged cluster, one
+        cluster, or a budget too small for two samples)
+    """
+    started = time.perf_counter()
+    labels = np.asarray(labels, dtype=np.int64)
+    sizes = np.bincount(labels)
+    k = len(sizes)
+    member_sizes = sizes[labels]
+    population = np.nonzero(member_sizes > 1)[0]
+    sample_size = int(min(max_sample, budget // max(k, 1), len(population)))
+    if k < 2 or sample_size < 2:
+        return None
+
+    X = np.asarray(embeddings, dtype=np.float32)
+    X = X / (np.linalg.norm(X, axis=1, keepdims=True) + 1e-10)
+
+    # Stratified sample of merged issues
+    strata = np.searchsorted(SIZE_STRATA, member_sizes[population], side='right') - 1
+    stratum_sizes = np.bincount(strata, minlength=len(SIZE_STRATA))
+    present = np.nonzero(stratum_sizes)[0]
+    allocation = np.zeros(len(SIZE_STRATA), dtype=np.int64)
+    allocation[present] = _allocate(stratum_sizes[present], sample_size)
+    rng = np.random.default_rng(seed)
+    sample = np.concatenate([
+        rng.choice(population[strata == h], allocation[h], replace=False)
+        for h in present
+    ])
+    sample_strata = np.searchsorted(SIZE_STRATA, member_sizes[sample], side='right') - 1
+
+    # Vector sum of every cluster; labels are contiguous so reduceat applies
+    order = np.argsort(labels, kind='stable')
+    sums = np.add.reduceat(X[order], np.cumsum(sizes) - sizes, axis=0)
+
+    cohesion = np.empty(len(sample), dtype=np.float64)
+    separation = np.empty(len(sample), dtype=np.float64)
+    block = max(1, int(memory_budget_mb * 1024 * 1024 // (4 * k)))
+    for start in range(0, len(sample), block):
+        rows = sample[start:start + block]
+        own = labels[rows]
+        local = np.arange(len(rows))
+        mean_similarity = (X[rows] @ sums.T) / sizes
+        self_similarity = np.einsum('ij,ij->i', X[rows], X[rows])
+        cohesion[start:start + len(rows)] = (
+            mean_similarity[local, own] * sizes[own] - self_similarity
+        ) / (sizes[own] - 1)
+        mean_similarity[local, own] = -np.inf
+        separation[start:start + len(rows)] = 1 - mean_similarity.max(axis=1)
+
+    intra = 1 - cohesion
+    silhouette = (separation - intra) / np.maximum(np.maximum(intra, separation), 1e-10)
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    return {
+        'silhouette': _stratified_estimate(silhouette, sample_strata, stratum_sizes, z),
+        'cohesion': _stratified_estimate(cohesion, sample_strata, stratum_sizes, z),
+        'separation': _stratified_estimate(separation, sample_strata, stratum_sizes, z),
+        'confidence': confidence,
+        'sample_size': int(len(sample)),
+        'population': int(len(population)),
+        'strata': [
+            {'min_cluster_size': int(SIZE_STRATA[h]), 'issues': int(stratum_sizes[h]), 'sampled': int(allocation[h])}
+            for h in present
+        ],
+        'comparisons': int(len(sample) * k),
+        'seconds': round(time.perf_counter() - started, 4)
+    }
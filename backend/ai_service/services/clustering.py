@@ -3,29 +3,73 @@ Semantic Clustering Service - Identify and merge duplicate issues
 """
 
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 import numpy as np
-from sklearn.cluster import DBSCAN
-from sklearn.metrics import silhouette_score
 import logging
 
+from .embedding_cache import EmbeddingCache
+from .vector_index import VectorIndex
+from .graph_clustering import threshold_components
+from .metrics import instrument_model, observe_batch, stage
+from .model_registry import ModelRegistry, default_registry
+from .quantization import load_model, mode_for_device, resolve_mode
+
 logger = logging.getLogger(__name__)
 
 class ClusteringService:
     """Service for clustering similar issues to identify duplicates"""
     
-    def __init__(self):
+    TASK = "sentence-embedding"
+    
+    def __init__(
+        self,
+        cache: Optional[EmbeddingCache] = None,
+        index: Optional[VectorIndex] = None,
+        memory_budget_mb: float = 256,
+        quantization: str = "none",
+        quantized_cache_dir: Optional[str] = None,
+        registry: Optional[ModelRegistry] = None
+    ):
         self.model_name = "sentence-transformers/all-MiniLM-L6-v2"
-        self.embedder = None
         self.embedding_dim = 384
+        self.cache = cache
+        self.index = index
+        self.memory_budget_mb = memory_budget_mb
+        self.quantization = resolve_mode(quantization)
+        self.quantized_cache_dir = quantized_cache_dir
+        self.registry = registry or default_registry
+        self._variant = self.quantization
         
     def load_models(self):
-        """Load sentence transformer model"""
+        """Load sentence transformer model through the shared registry"""
+        self.registry.get(self.model_name, self.TASK, self._load_models, self._variant, owner="clustering")
+    
+    @property
+    def embedder(self):
+        """The sentence transformer if it is resident, else None"""
+        return self.registry.peek(self.model_name, self.TASK, self._variant)
+    
+    @property
+    def model_version(self) -> str:
+        """Identifies what produces embeddings: model and quantization"""
+        return f"{self.model_name}@{self._variant}"
+    
+    def _load_models(self):
         try:
             from sentence_transformers import SentenceTransformer
             logger.info(f"Loading embedding model: {self.model_name}")
-            self.embedder = SentenceTransformer(self.model_name)
+            
+            if self.quantization != "none":
+                import torch
+                self.quantization = mode_for_device(self.quantization, "cuda" if torch.cuda.is_available() else "cpu")
+            embedder = load_model(
+                self.model_name,
+                lambda: SentenceTransformer(self.model_name, device="cpu" if self.quantization != "none" else None),
+                self.quantization,
+                self.quantized_cache_dir
+            )
             logger.info("Embedding model loaded successfully")
+            return instrument_model(embedder, "clustering")
         except Exception as e:
             logger.error(f"Failed to load embedding model: {str(e)}")
             raise
@@ -40,17 +84,59 @@ class ClusteringService:
         Returns:
             List of embeddings
         """
+        return self.get_embedding_matrix(texts).tolist()
+    
+    def get_embedding_matrix(self, texts: List[str]) -> np.ndarray:
+        """
+        Get semantic embeddings for texts as one float32 matrix
+        
+        With a cache configured, only texts whose vectors are not cached
+        are encoded (each distinct text once).
+        
+        Args:
+            texts: List of text strings
+            
+        Returns:
+            (len(texts), embedding_dim) float32 array
+        """
         try:
-            if not self.embedder:
-                self.load_models()
+            if self.cache is None:
+                return np.asarray(self._encode(texts), dtype=np.float32)
             
-            embeddings = self.embedder.encode(texts, show_progress_bar=False)
-            return embeddings.tolist()
+            with stage("clustering", "cache_lookup"):
+                keys = [self.cache.make_key(self.model_version, text) for text in texts]
+                vectors = [self.cache.get(key) for key in keys]
+            
+            # One encode per distinct key, using the first text that maps to it
+            missing = {}
+            for key, text, vector in zip(keys, texts, vectors):
+                if vector is None and key not in missing:
+                    missing[key] = text
+            
+            if missing:
+                encoded = self._encode(list(missing.values()))
+                fresh = dict(zip(missing.keys(), encoded))
+                for key, vector in fresh.items():
+                    self.cache.put(key, vector)
+                vectors = [
+                    fresh[key] if vector is None else vector
+                    for key, vector in zip(keys, vectors)
+                ]
+            
+            if not vectors:
+                return np.zeros((0, self.embedding_dim), dtype=np.float32)
+            return np.asarray(np.stack(vectors), dtype=np.float32)
             
         except Exception as e:
             logger.error(f"Embedding error: {str(e)}")
             raise
     
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        with self.registry.use(self.model_name, self.TASK, self._load_models, self._variant, owner="clustering") as embedder:
+            observe_batch("clustering", len(texts))
+            with stage("clustering", "model_call"):
+                return embedder.encode(texts, show_progress_bar=False)
+    
     def cluster_issues(
         self,
         embeddings: List[List[float]],
@@ -69,40 +155,52 @@ class ClusteringService:
             List of clusters with member IDs
         """
         try:
-            embeddings_array = np.array(embeddings)
-            
-            # Convert similarity threshold to epsilon for DBSCAN
-            # similarity = 1 - distance
-            eps = 1 - similarity_threshold
+            # Issues are linked when cosine similarity >= threshold; clusters
+            # are the connected components of that graph, built in tiles
+            with stage("clustering", "cluster"):
+                labels = threshold_components(
+                    embeddings,
+                    similarity_threshold,
+                    memory_budget_mb=self.memory_budget_mb
+                )
             
-            # Use DBSCAN for clustering
-            clusterer = DBSCAN(eps=eps, min_samples=1)
-            labels = clusterer.fit_predict(embeddings_array)
+            clusters = self.labels_to_clusters(labels)
             
-            # Organize results
-            clusters = {}
-            for idx, label in enumerate(labels):
-                if label not in clusters:
-                    clusters[label] = {
-                        'cluster_id': int(label),
-                        'members': [],
-                        'size': 0,
-                        'quality': 0
-                    }
-                clusters[label]['members'].append(idx)
-                clusters[label]['size'] += 1
+            logger.info(f"Created {len(clusters)} clusters from {len(embeddings)} issues")
             
-            # Convert to list
-            cluster_list = list(clusters.values())
-            
-            logger.info(f"Created {len(cluster_list)} clusters from {len(embeddings)} issues")
-            
-            return cluster_list
+            return clusters
             
         except Exception as e:
             logger.error(f"Clustering error: {str(e)}")
             raise
     
+    @staticmethod
+    def labels_to_clusters(labels) -> List[Dict]:
+        """Group per-issue cluster labels into cluster dicts"""
+        labels = np.asarray(labels)
+        if not len(labels):
+            return []
+        
+        order = np.argsort(labels, kind='stable')
+        boundaries = np.cumsum(np.bincount(labels))[:-1]
+        return [
+            {
+                'cluster_id': label,
+                'members': members.tolist(),
+                'size': len(members),
+                'quality': 0
+            }
+            for label, members in enumerate(np.split(order, boundaries))
+        ]
+    
+    @staticmethod
+    def clusters_to_labels(clusters: List[Dict]) -> np.ndarray:
+        """Per-issue cluster labels from cluster dicts (inverse of labels_to_clusters)"""
+        labels = np.empty(sum(cluster['size'] for cluster in clusters), dtype=np.int64)
+        for cluster in clusters:
+            labels[cluster['members']] = cluster['cluster_id']
+        return labels
+    
     def get_cluster_quality(self, clusters: List[Dict]) -> Dict:
         """
         Calculate clustering quality metrics
@@ -134,7 +232,7 @@ class ClusteringService:
     def find_similar_issues(
         self,
         query_embedding: List[float],
-        issue_embeddings: List[List[float]],
+        issue_embeddings: Optional[List[List[float]]] = None,
         top_k: int = 5,
         min_similarity: float = 0.6
     ) -> List[Dict]:
@@ -143,13 +241,23 @@ class ClusteringService:
         
         Args:
             query_embedding: Embedding of query issue
-            issue_embeddings: List of all issue embeddings
+            issue_embeddings: List of all issue embeddings; if omitted the
+                server-side vector index is searched instead
             top_k: Number of similar issues to return
             min_similarity: Minimum similarity threshold
             
         Returns:
-            List of similar issue indices with scores
+            List of similar issue indices (or IDs, from the index) with scores
+            
+        Raises:
+            ValueError: No index is configured, or the query does not fit it
         """
+        # Index errors (e.g. a wrong-dimension query) reach the caller as 400s
+        if issue_embeddings is None:
+            if self.index is None:
+                raise ValueError("No issue embeddings given and no vector index configured")
+            return self.index.search(query_embedding, top_k=top_k, min_similarity=min_similarity)
+        
         try:
             query_array = np.array(query_embedding)
             embeddings_array = np.array(issue_embeddings)
@@ -178,3 +286,22 @@ class ClusteringService:
         except Exception as e:
             logger.error(f"Similarity search error: {str(e)}")
             return []
+
+
+def cluster_embeddings(
+    embeddings: List[List[float]],
+    similarity_threshold: float = 0.75,
+    min_cluster_size: int = 2,
+    memory_budget_mb: float = 256
+) -> List[Dict]:
+    """
+    Picklable entry point for running clustering on a process pool
+
+    Clustering needs no model, so a bare service instance is enough and the
+    embedder is never shipped to the worker process.
+    """
+    return ClusteringService(memory_budget_mb=memory_budget_mb).cluster_issues(
+        embeddings=embeddings,
+        similarity_threshold=similarity_threshold,
+        min_cluster_size=min_cluster_size
+    )
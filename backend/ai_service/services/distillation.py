@@ -0,0 +1,150 @@
+"""
+Classifier Distillation - Lightweight student head on MiniLM embeddings
+"""
+
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class StudentHead:
+    """
+    Softmax (multinomial logistic regression) head over sentence embeddings
+
+    Trained offline on BART-MNLI zero-shot labels, so one MiniLM encode plus
+    a 384 x |CATEGORIES| matrix product replaces seven NLI passes. Weights
+    are stored as a plain ``.npz`` file and inference is pure NumPy.
+    """
+
+    def __init__(self, labels: List[str], weights: np.ndarray, bias: np.ndarray, embedding_model: str = ""):
+        self.labels = list(labels)
+        self.weights = np.asarray(weights, dtype=np.float32)  # (n_labels, dim)
+        self.bias = np.asarray(bias, dtype=np.float32)        # (n_labels,)
+        self.embedding_model = embedding_model
+
+    @classmethod
+    def fit(
+        cls,
+        embeddings,
+        labels: List[str],
+        embedding_model: str = "",
+        regularization: float = 1.0
+    ) -> "StudentHead":
+        """
+        Train the head on teacher-labelled embeddings
+
+        Args:
+            embeddings: (n, dim) embedding matrix
+            labels: Teacher category for each row
+            embedding_model: Name of the encoder the embeddings came from
+            regularization: Inverse L2 strength (sklearn ``C``)
+
+        Returns:
+            Trained StudentHead
+        """
+        from sklearn.linear_model import LogisticRegression
+
+        X = cls._normalize(np.asarray(embeddings, dtype=np.float32))
+        model = LogisticRegression(C=regularization, max_iter=1000)
+        model.fit(X, labels)
+
+        weights = model.coef_
+        bias = model.intercept_
+        if len(model.classes_) == 2:
+            # sklearn collapses binary problems to a single row
+            weights = np.vstack([-weights[0], weights[0]])
+            bias = np.array([-bias[0], bias[0]])
+
+        return cls(list(model.classes_), weights, bias, embedding_model)
+
+    @staticmethod
+    def _normalize(X: np.ndarray) -> np.ndarray:
+        return X / (np.linalg.norm(X, axis=1, keepdims=True) + 1e-10)
+
+    def predict_proba(self, embeddings) -> np.ndarray:
+        """
+        Returns:
+            (n, n_labels) probability matrix, columns ordered as self.labels
+        """
+        X = self._normalize(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+        logits = X @ self.weights.T + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def predict(self, embeddings) -> List[Dict]:
+        """
+        Returns:
+            List of dicts with ranked 'labels' and 'scores', the same shape
+            as zero-shot pipeline output
+        """
+        probs = self.predict_proba(embeddings)
+        order = np.argsort(-probs, axis=1)
+        return [
+            {
+                'labels': [self.labels[j] for j in row_order],
+                'scores': [float(row[j]) for j in row_order]
+            }
+            for row, row_order in zip(probs, order)
+        ]
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            labels=np.array(self.labels),
+            weights=self.weights,
+            bias=self.bias,
+            embedding_model=np.array(self.embedding_model)
+        )
+        logger.info(f"Saved student head to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "StudentHead":
+        data = np.load(path, allow_pickle=False)
+        return cls(
+            labels=[str(label) for label in data['labels']],
+            weights=data['weights'],
+            bias=data['bias'],
+            embedding_model=str(data['embedding_model'])
+        )
+
+
+def evaluate_cascade(
+    head: StudentHead,
+    embeddings,
+    teacher_labels: List[str],
+    threshold: float
+) -> Dict:
+    """
+    Compare the student against teacher labels at a confidence threshold
+
+    Args:
+        head: Trained student head
+        embeddings: Held-out embeddings
+        teacher_labels: Teacher category for each row
+        threshold: Student confidence below which the cascade escalates
+
+    Returns:
+        Agreement and escalation-rate report
+    """
+    probs = head.predict_proba(embeddings)
+    predicted = [head.labels[j] for j in probs.argmax(axis=1)]
+    confidence = probs.max(axis=1)
+    agree = np.array([p == t for p, t in zip(predicted, teacher_labels)])
+    accepted = confidence >= threshold
+    total = len(teacher_labels)
+
+    # Escalated items get the teacher's answer, so they always agree
+    cascade_agree = np.where(accepted, agree, True)
+
+    return {
+        'samples': total,
+        'threshold': threshold,
+        'student_agreement': round(float(agree.mean()), 4) if total else 0.0,
+        'escalation_rate': round(float(1 - accepted.mean()), 4) if total else 0.0,
+        'accepted_agreement': round(float(agree[accepted].mean()), 4) if accepted.any() else 0.0,
+        'cascade_agreement': round(float(cascade_agree.mean()), 4) if total else 0.0
+    }
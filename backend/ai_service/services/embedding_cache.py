@@ -0,0 +1,129 @@
+"""
+Embedding Cache - Content-addressed LRU + on-disk store for sentence embeddings
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache of embeddings keyed by model name + hash of normalized text
+
+    The memory tier is an LRU bounded by a byte budget. The optional disk
+    tier stores one ``.npy`` file per key under ``disk_dir`` (sharded by the
+    first two hex characters) so vectors survive restarts.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None):
+        """
+        Args:
+            max_bytes: Memory budget for cached vectors
+            disk_dir: Directory for the persistent tier (disabled if None)
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize text so trivially different inputs share a key"""
+        return " ".join(unicodedata.normalize("NFKC", text or "").lower().split())
+
+    @classmethod
+    def make_key(cls, model_name: str, text: str) -> str:
+        digest = hashlib.sha256(cls.normalize(text).encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{model_name}\0{digest}".encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                try:
+                    vector = np.load(path)
+                    self._put_memory(key, vector)
+                    with self._lock:
+                        self.disk_hits += 1
+                    return vector
+                except Exception as e:
+                    logger.warning(f"Corrupt embedding cache entry {path}: {str(e)}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, vector: np.ndarray):
+        vector = np.asarray(vector, dtype=np.float32)
+        self._put_memory(key, vector)
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Write-then-rename so readers never see a partial file
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, vector)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.warning(f"Could not persist embedding cache entry: {str(e)}")
+
+    def _put_memory(self, key: str, vector: np.ndarray):
+        if vector.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = vector
+            self._bytes += vector.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'disk_dir': self.disk_dir,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_ratio': round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+            }
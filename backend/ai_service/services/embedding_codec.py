@@ -0,0 +1,112 @@
+"""
+Embedding Codec - Packed little-endian float matrices for binary transport
+"""
+
+import base64
+import logging
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+OCTET_STREAM = "application/octet-stream"
+SHAPE_HEADER = "X-Embedding-Shape"
+DTYPE_HEADER = "X-Embedding-Dtype"
+
+# Wire formats are always little-endian, whatever the host byte order
+DTYPES = {
+    "float32": np.dtype("<f4"),
+    "float16": np.dtype("<f2"),
+}
+
+
+def resolve_dtype(name: Optional[str]) -> np.dtype:
+    """Wire dtype for a name ("float32" when not given)"""
+    name = (name or "float32").strip().lower()
+    if name not in DTYPES:
+        raise ValueError(f"Unsupported embedding dtype '{name}', expected one of {sorted(DTYPES)}")
+    return DTYPES[name]
+
+
+def parse_shape(value) -> Tuple[int, int]:
+    """
+    Parse a matrix shape given as "n,dim", "nxdim" or a two-item sequence
+    """
+    if isinstance(value, str):
+        value = value.lower().replace("x", ",").split(",")
+    try:
+        n, dim = (int(part) for part in value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid embedding shape {value!r}, expected 'n,dim'")
+    if n < 0 or dim <= 0:
+        raise ValueError(f"Invalid embedding shape ({n}, {dim})")
+    return n, dim
+
+
+def decode_matrix(buffer, dtype: Optional[str] = None, shape=None, dim: Optional[int] = None) -> np.ndarray:
+    """
+    View a packed matrix as a NumPy array without copying
+
+    Args:
+        buffer: bytes-like payload
+        dtype: "float32" or "float16"
+        shape: "n,dim" (or a pair); when omitted, ``dim`` must be given
+        dim: Row length used to infer n when no shape is sent
+
+    Returns:
+        (n, dim) read-only array backed by ``buffer``
+    """
+    wire = resolve_dtype(dtype)
+    if shape is not None:
+        n, dim = parse_shape(shape)
+    elif dim:
+        n = None
+    else:
+        raise ValueError(f"{SHAPE_HEADER} is required for binary embeddings")
+
+    nbytes = memoryview(buffer).nbytes
+    if nbytes % (wire.itemsize * dim):
+        raise ValueError(f"Payload of {nbytes} bytes is not a whole number of {dim}-dim {wire.name} rows")
+    if n is None:
+        n = nbytes // (wire.itemsize * dim)
+    if nbytes != n * dim * wire.itemsize:
+        raise ValueError(f"Payload of {nbytes} bytes does not match shape ({n}, {dim}) of {wire.name}")
+
+    return np.frombuffer(buffer, dtype=wire).reshape(n, dim)
+
+
+def encode_matrix(matrix, dtype: Optional[str] = None) -> bytes:
+    """Pack an (n, dim) matrix as row-major little-endian floats"""
+    wire = resolve_dtype(dtype)
+    X = np.asarray(matrix)
+    if X.ndim != 2:
+        raise ValueError(f"Expected a 2-D embedding matrix, got shape {X.shape}")
+    return np.ascontiguousarray(X, dtype=wire).tobytes()
+
+
+def decode_base64(data: str, dtype: Optional[str] = None, shape=None, dim: Optional[int] = None) -> np.ndarray:
+    """Decode a base64 packed matrix (see ``decode_matrix``)"""
+    try:
+        raw = base64.b64decode(data, validate=True)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid base64 embeddings: {str(e)}")
+    return decode_matrix(raw, dtype, shape, dim)
+
+
+def encode_base64(matrix, dtype: Optional[str] = None) -> str:
+    """Pack a matrix and base64-encode it for embedding in JSON"""
+    return base64.b64encode(encode_matrix(matrix, dtype)).decode("ascii")
+
+
+def matrix_headers(shape: Sequence[int], dtype: Optional[str] = None) -> Dict[str, str]:
+    """Response headers describing a packed matrix"""
+    return {
+        SHAPE_HEADER: f"{shape[0]},{shape[1]}",
+        DTYPE_HEADER: resolve_dtype(dtype).name,
+    }
+
+
+def accepts_binary(accept: Optional[str]) -> bool:
+    """Whether an Accept header asks for application/octet-stream"""
+    return bool(accept) and OCTET_STREAM in accept.lower()
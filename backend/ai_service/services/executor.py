@@ -0,0 +1,166 @@
+"""
+Execution Layer - Run blocking model and clustering work off the event loop
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class InferencePool:
+    """
+    A bounded executor with its own concurrency limit
+
+    ``kind`` is "thread" for model inference (PyTorch releases the GIL and
+    the loaded weights must be shared) or "process" for pure CPU work such
+    as clustering. Functions sent to a process pool must be picklable,
+    i.e. module-level functions rather than bound methods of services
+    holding models.
+    """
+
+    KINDS = ("thread", "process")
+
+    def __init__(
+        self,
+        name: str,
+        kind: str = "thread",
+        max_workers: int = 1,
+        max_concurrency: Optional[int] = None
+    ):
+        """
+        Args:
+            name: Pool label, usually the model or stage it serves
+            kind: "thread" or "process"
+            max_workers: Executor size
+            max_concurrency: Calls allowed in flight at once; further callers
+                wait on the event loop (defaults to max_workers)
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown pool kind '{kind}', expected one of {self.KINDS}")
+
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_concurrency = max(1, max_concurrency or self.max_workers)
+
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self._active = 0
+        self._waiting = 0
+        self._completed = 0
+        self._failed = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=f"{self.name}-pool"
+                )
+        return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """
+        Run ``fn(*args, **kwargs)`` on this pool without blocking the event loop
+
+        Returns:
+            Whatever ``fn`` returns
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._active += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+            self._completed += 1
+            return result
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict:
+        return {
+            'kind': self.kind,
+            'max_workers': self.max_workers,
+            'max_concurrency': self.max_concurrency,
+            'active': self._active,
+            'waiting': self._waiting,
+            'completed': self._completed,
+            'failed': self._failed
+        }
+
+
+class InferencePools:
+    """Registry of per-model pools, configured from environment variables"""
+
+    def __init__(self):
+        self.pools: Dict[str, InferencePool] = {}
+
+    def configure(
+        self,
+        name: str,
+        kind: str = "thread",
+        max_workers: int = 1,
+        max_concurrency: Optional[int] = None
+    ) -> InferencePool:
+        """
+        Register a pool, letting ``<NAME>_POOL_KIND``, ``<NAME>_POOL_WORKERS``
+        and ``<NAME>_POOL_CONCURRENCY`` override the given defaults
+
+        Returns:
+            The configured pool
+        """
+        prefix = name.upper()
+        kind = os.getenv(f"{prefix}_POOL_KIND", kind)
+        max_workers = int(os.getenv(f"{prefix}_POOL_WORKERS", max_workers))
+        concurrency = os.getenv(f"{prefix}_POOL_CONCURRENCY")
+        if concurrency:
+            max_concurrency = int(concurrency)
+
+        pool = InferencePool(name, kind, max_workers, max_concurrency)
+        self.pools[name] = pool
+        logger.info(
+            f"Configured {kind} pool '{name}' "
+            f"(workers={pool.max_workers}, concurrency={pool.max_concurrency})"
+        )
+        return pool
+
+    def get(self, name: str) -> InferencePool:
+        if name not in self.pools:
+            raise KeyError(f"No pool configured for '{name}'")
+        return self.pools[name]
+
+    async def run(self, name: str, fn: Callable, *args, **kwargs):
+        """Run ``fn`` on the named pool"""
+        return await self.get(name).run(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True):
+        for pool in self.pools.values():
+            pool.shutdown(wait=wait)
+
+    def get_stats(self) -> Dict:
+        return {name: pool.get_stats() for name, pool in self.pools.items()}
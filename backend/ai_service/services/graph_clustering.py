@@ -0,0 +1,175 @@
+"""
+Graph Clustering Engine - Memory-bounded cosine-threshold connected components
+"""
+
+import logging
+import math
+from typing import Optional
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+logger = logging.getLogger(__name__)
+
+
+class UnionFind:
+    """Vectorized union-find over integer node IDs (hooking + pointer jumping)"""
+
+    def __init__(self, n: int):
+        self.parent = np.arange(n, dtype=np.int64)
+
+    def find(self, nodes: np.ndarray) -> np.ndarray:
+        roots = self.parent[nodes]
+        while True:
+            next_roots = self.parent[roots]
+            if np.array_equal(next_roots, roots):
+                break
+            roots = next_roots
+        # Path compression for the nodes we touched
+        self.parent[nodes] = roots
+        return roots
+
+    def union(self, a: np.ndarray, b: np.ndarray):
+        """Union each a[i] with b[i]"""
+        a = np.asarray(a, dtype=np.int64)
+        b = np.asarray(b, dtype=np.int64)
+        while len(a):
+            ra, rb = self.find(a), self.find(b)
+            pending = ra != rb
+            if not pending.any():
+                break
+            ra, rb = ra[pending], rb[pending]
+            # Hook the larger root under the smaller; conflicting hooks on
+            # the same root are resolved by re-checking on the next pass
+            np.minimum.at(self.parent, np.maximum(ra, rb), np.minimum(ra, rb))
+            a, b = a[pending], b[pending]
+
+    def labels(self) -> np.ndarray:
+        """Root of every node, fully compressed"""
+        return self.find(np.arange(len(self.parent), dtype=np.int64))
+
+
+def normalize_embeddings(embeddings) -> np.ndarray:
+    """float32, L2-normalized rows, so inner product is cosine similarity"""
+    X = np.asarray(embeddings, dtype=np.float32)
+    if X.ndim != 2:
+        raise ValueError(f"Expected a 2-D embedding matrix, got shape {X.shape}")
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    np.maximum(norms, 1e-10, out=norms)
+    return X / norms
+
+
+# Bytes held per edge while a tile is reduced: the nonzero row/column
+# indices, the COO and CSR copies connected_components builds, and the
+# touched-node arrays
+EDGE_BYTES = 64
+
+
+def tile_size_for_budget(memory_budget_mb: float, n: int) -> int:
+    """
+    Largest square tile whose similarity block and edge mask fit the budget
+
+    A b x b tile costs a float32 similarity block plus a boolean mask,
+    i.e. 5 bytes per cell.
+    """
+    budget = max(1.0, memory_budget_mb) * 1024 * 1024
+    return max(1, min(n, int(math.sqrt(budget / 5))))
+
+
+def _union_tile_edges(uf: UnionFind, r: np.ndarray, c: np.ndarray, rb: int, cb: int, i: int, j: int):
+    """
+    Merge one block of edges (rows i.., columns j..) into ``uf``
+
+    The edges are first collapsed to one per node through their local
+    components, so the union-find sees at most rb + cb pairs.
+    """
+    local = coo_matrix(
+        (np.ones(len(r), dtype=np.int8), (r, c + rb)),
+        shape=(rb + cb, rb + cb)
+    )
+    _, local_labels = connected_components(local, directed=False)
+    del local
+
+    touched = np.unique(np.concatenate([r, c + rb]))
+    global_ids = np.where(touched < rb, touched + i, touched - rb + j)
+    # Representative = first touched node of each local component
+    labels = local_labels[touched]
+    _, first = np.unique(labels, return_index=True)
+    representative = np.empty(labels.max() + 1, dtype=np.int64)
+    representative[labels[first]] = global_ids[first]
+    uf.union(global_ids, representative[labels])
+
+
+def threshold_components(
+    embeddings,
+    similarity_threshold: float,
+    memory_budget_mb: float = 256,
+    tile_size: Optional[int] = None,
+    home: Optional[int] = None
+) -> np.ndarray:
+    """
+    Label connected components of the graph linking issues with cosine
+    similarity >= ``similarity_threshold``
+
+    This is exactly DBSCAN with ``min_samples=1`` under cosine distance, but
+    the radius-neighbour graph is built tile by tile over the upper triangle
+    so peak memory is bounded by ``memory_budget_mb`` rather than n^2. Half
+    of the budget holds the similarity tile and its mask, the other half
+    the edges extracted from it: a dense tile is reduced in row slabs of
+    at most that many edges. Each slab's edges are collapsed to one edge
+    per node (via its local components) before being merged into a global
+    union-find.
+
+    Args:
+        embeddings: (n, dim) embedding matrix
+        similarity_threshold: Minimum cosine similarity for an edge
+        memory_budget_mb: Budget for one similarity tile and its edges
+        tile_size: Explicit tile size (overrides the budget)
+        home: Only link pairs involving one of the first ``home`` rows
+            (rows after it are a shard's halo; None links all pairs)
+
+    Returns:
+        (n,) component labels numbered 0.. in order of first appearance
+    """
+    X = normalize_embeddings(embeddings)
+    n = len(X)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    b = tile_size or tile_size_for_budget(memory_budget_mb / 2, n)
+    # Slabs are cut every max_edges / 2 edges, so one holds at most that
+    # plus a row (<= b edges)
+    max_edges = max(2 * b, int(max(1.0, memory_budget_mb / 2) * 1024 * 1024 // EDGE_BYTES))
+    uf = UnionFind(n)
+
+    # Row tiles stop at the home rows; column tiles still span the halo
+    home = n if home is None else min(home, n)
+    for i in range(0, home, b):
+        rows = X[i:min(i + b, home)]
+        for j in range(i, n, b):
+            block = rows @ X[j:j + b].T
+            mask = block >= similarity_threshold
+            del block
+            rb, cb = mask.shape
+            row_edges = np.count_nonzero(mask, axis=1)
+            edges = int(row_edges.sum())
+            if not edges:
+                continue
+
+            if edges <= max_edges:
+                bounds = [0, rb]
+            else:
+                cuts = np.searchsorted(np.cumsum(row_edges), np.arange(max_edges // 2, edges, max_edges // 2))
+                bounds = np.unique(np.concatenate([[0], cuts, [rb]]))
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                r, c = np.nonzero(mask[start:stop])
+                if len(r):
+                    _union_tile_edges(uf, r, c, stop - start, cb, i + start, j)
+                del r, c
+
+    roots = uf.labels()
+    _, first_seen, inverse = np.unique(roots, return_index=True, return_inverse=True)
+    # Renumber so cluster IDs follow the order issues were given in
+    order = np.argsort(np.argsort(first_seen))
+    return order[inverse]
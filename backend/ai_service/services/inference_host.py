@@ -0,0 +1,542 @@
+"""
+Inference Host - One model-hosting process shared by several HTTP workers
+"""
+
+import atexit
+import logging
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from multiprocessing.connection import Client, Listener
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+# Arrays at least this large travel through shared memory, not the socket
+SHM_MIN_BYTES = 64 * 1024
+
+
+# ============================================
+# SHARED-MEMORY TRANSPORT
+# ============================================
+
+def _create_shared_memory(size: int) -> SharedMemory:
+    """Shared memory block whose lifetime is handed to the receiving process"""
+    try:
+        return SharedMemory(create=True, size=size, track=False)
+    except TypeError:
+        # Before Python 3.13 the creator's resource tracker would unlink
+        # the block at exit; the receiver unlinks it instead
+        from multiprocessing import resource_tracker
+        shm = SharedMemory(create=True, size=size)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def pack(value):
+    """
+    Replace large numpy arrays in value with shared-memory descriptors
+
+    Lists, tuples and dicts are walked; the receiver owns each block and
+    must ``unpack`` it exactly once.
+    """
+    if isinstance(value, np.ndarray) and value.nbytes >= SHM_MIN_BYTES:
+        array = np.ascontiguousarray(value)
+        shm = _create_shared_memory(array.nbytes)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        descriptor = ('__shm__', shm.name, array.shape, array.dtype.str)
+        shm.close()
+        return descriptor
+    if isinstance(value, list):
+        return [pack(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(pack(item) for item in value)
+    if isinstance(value, dict):
+        return {key: pack(item) for key, item in value.items()}
+    return value
+
+
+def unpack(value):
+    """Inverse of ``pack``: copy arrays out of shared memory and free it"""
+    if isinstance(value, tuple) and len(value) == 4 and value[0] == '__shm__':
+        _, name, shape, dtype = value
+        shm = SharedMemory(name=name)
+        try:
+            return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+    if isinstance(value, list):
+        return [unpack(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(unpack(item) for item in value)
+    if isinstance(value, dict):
+        return {key: unpack(item) for key, item in value.items()}
+    return value
+
+
+# ============================================
+# HOST
+# ============================================
+
+class _Coalescer:
+    """
+    Runs one model's calls on a dedicated thread, merging concurrent calls
+
+    Calls with a list as first argument and otherwise identical arguments
+    that arrive within ``max_wait_ms`` of each other (from any worker) are
+    concatenated into one model call and the outputs split back.
+    """
+
+    def __init__(self, key: str, run_fn, max_items: int = 64, max_wait_ms: float = 5.0):
+        self.key = key
+        self.run_fn = run_fn
+        self.max_items = max_items
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: queue.Queue = queue.Queue()
+        self._deferred: deque = deque()
+        self._calls = 0
+        self._model_calls = 0
+        self._thread = threading.Thread(target=self._run, name=f"host-{key}", daemon=True)
+        self._thread.start()
+
+    def submit(self, method: str, args: tuple, kwargs: dict):
+        future = Future()
+        self._queue.put((method, args, kwargs, future))
+        return future.result()
+
+    @staticmethod
+    def _batchable(call) -> bool:
+        _, args, _, _ = call
+        return bool(args) and isinstance(args[0], list) and len(args[0]) > 0
+
+    @staticmethod
+    def _compatible(a, b) -> bool:
+        return a[0] == b[0] and a[1][1:] == b[1][1:] and a[2] == b[2]
+
+    def _next(self):
+        # Calls that could not join the previous batch go first
+        if self._deferred:
+            return self._deferred.popleft()
+        return self._queue.get()
+
+    def _collect(self) -> list:
+        first = self._next()
+        batch = [first]
+        if not self._batchable(first):
+            return batch
+
+        items = len(first[1][0])
+        deadline = time.monotonic() + self.max_wait
+        skipped = []
+        while items < self.max_items:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                call = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if self._batchable(call) and self._compatible(call, first):
+                batch.append(call)
+                items += len(call[1][0])
+            else:
+                skipped.append(call)
+        self._deferred.extend(skipped)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self._calls += len(batch)
+            self._model_calls += 1
+            method, args, kwargs, _ = batch[0]
+            futures = [call[3] for call in batch]
+            try:
+                if len(batch) == 1:
+                    futures[0].set_result(self.run_fn(method, args, kwargs))
+                    continue
+
+                sizes = [len(call[1][0]) for call in batch]
+                merged = [text for call in batch for text in call[1][0]]
+                outputs = self.run_fn(method, (merged,) + tuple(args[1:]), kwargs)
+                if isinstance(outputs, dict):
+                    outputs = [outputs]
+                offsets = np.cumsum([0] + sizes)
+                for future, start, end in zip(futures, offsets[:-1], offsets[1:]):
+                    future.set_result(outputs[start:end])
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def get_stats(self) -> Dict:
+        return {
+            'calls': self._calls,
+            'model_calls': self._model_calls,
+            'calls_per_model_call': round(self._calls / self._model_calls, 2) if self._model_calls else 0,
+            'queue_depth': self._queue.qsize() + len(self._deferred)
+        }
+
+
+class InferenceHost:
+    """
+    Owns the models and serves forward passes to HTTP workers over IPC
+
+    Workers connect with ``InferenceClient`` and reach the models through
+    ``RemoteRegistry``: all request handling, keyword analysis, caching and
+    clustering stay in the workers, only model calls cross the socket.
+    Large arrays (embeddings) travel through shared memory.
+    """
+
+    def __init__(self, address, authkey: bytes, loaders: Dict[str, tuple], registry: ModelRegistry):
+        """
+        Args:
+            address: Unix socket path (or (host, port)) to listen on
+            authkey: Shared secret workers must present
+            loaders: Registry key -> (name, task, variant, load_fn)
+            registry: Registry holding this host's models
+        """
+        self.address = address
+        self.authkey = authkey
+        self.loaders = loaders
+        self.registry = registry
+        self._coalescers: Dict[str, _Coalescer] = {}
+        self._lock = threading.Lock()
+        self._connections = 0
+
+    def _spec(self, key: str) -> tuple:
+        if key not in self.loaders:
+            raise KeyError(f"Inference host does not serve model '{key}'")
+        return self.loaders[key]
+
+    def _coalescer(self, key: str) -> _Coalescer:
+        with self._lock:
+            if key not in self._coalescers:
+                name, task, variant, load_fn = self._spec(key)
+
+                def run(method, args, kwargs):
+                    with self.registry.use(name, task, load_fn, variant, owner="host") as model:
+                        return getattr(model, method)(*args, **kwargs)
+
+                self._coalescers[key] = _Coalescer(key, run)
+            return self._coalescers[key]
+
+    def handle(self, message: Dict):
+        op = message['op']
+        if op == 'ping':
+            return 'pong'
+        if op == 'load':
+            name, task, variant, load_fn = self._spec(message['key'])
+            self.registry.get(name, task, load_fn, variant, owner=message.get('owner'))
+            return True
+        if op == 'peek':
+            name, task, variant, _ = self._spec(message['key'])
+            return self.registry.peek(name, task, variant) is not None
+        if op == 'call':
+            return self._coalescer(message['key']).submit(
+                message['method'], unpack(message['args']), unpack(message['kwargs'])
+            )
+        if op == 'evict':
+            name, task, variant, _ = self._spec(message['key'])
+            return self.registry.evict(name, task, variant)
+        if op == 'status':
+            return self.get_status()
+        raise ValueError(f"Unknown inference host op '{op}'")
+
+    def _serve_connection(self, connection):
+        with connection:
+            while True:
+                try:
+                    message = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    response = {'ok': True, 'result': pack(self.handle(message))}
+                except Exception as e:
+                    logger.error(f"Inference host error: {str(e)}")
+                    response = {'ok': False, 'error': f"{type(e).__name__}: {str(e)}"}
+                try:
+                    connection.send(response)
+                except (EOFError, OSError):
+                    return
+
+    def serve_forever(self):
+        """Accept worker connections, one thread per connection"""
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+        with Listener(self.address, authkey=self.authkey) as listener:
+            logger.info(f"Inference host listening on {self.address}")
+            while True:
+                try:
+                    connection = listener.accept()
+                except Exception as e:
+                    logger.error(f"Rejected inference host connection: {str(e)}")
+                    continue
+                self._connections += 1
+                threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+
+    def get_status(self) -> Dict:
+        status = self.registry.get_status()
+        with self._lock:
+            coalescers = dict(self._coalescers)
+        status['host'] = {
+            'pid': os.getpid(),
+            'address': str(self.address),
+            'cores': sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None,
+            'connections': self._connections,
+            'models': {key: coalescer.get_stats() for key, coalescer in coalescers.items()}
+        }
+        return status
+
+
+def build_loaders(registry: ModelRegistry) -> Dict[str, tuple]:
+    """
+    Construct the services as the HTTP workers do and collect their loaders
+
+    Model settings come from the same environment variables as main.py, so
+    host and workers agree on registry keys.
+    """
+    from .classifier import ClassificationService
+    from .clustering import ClusteringService
+    from .sentiment import SentimentService
+
+    quantization = os.getenv("INFERENCE_QUANTIZATION", "none")
+    quantized_dir = os.getenv("QUANTIZED_MODEL_DIR", "models/quantized")
+    classifier = ClassificationService(quantization=quantization, quantized_cache_dir=quantized_dir, registry=registry)
+    clustering = ClusteringService(quantization=quantization, quantized_cache_dir=quantized_dir, registry=registry)
+    sentiment = SentimentService(quantization=quantization, quantized_cache_dir=quantized_dir, registry=registry)
+
+    specs = (
+        (classifier.model_name, classifier.TASK, classifier._variant, classifier._load_models),
+        (clustering.model_name, clustering.TASK, clustering._variant, clustering._load_models),
+        (sentiment.MODEL_NAME, sentiment.TASK, sentiment._variant, sentiment._load_models)
+    )
+    return {registry.make_key(name, task, variant): (name, task, variant, load_fn) for name, task, variant, load_fn in specs}
+
+
+def run_host(address, authkey: bytes, cores: Optional[Sequence[int]] = None):
+    """Process entry point: pin to a core group, preload the models and serve"""
+    logging.basicConfig(level=logging.INFO)
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+        try:
+            import torch
+            torch.set_num_threads(len(cores))
+        except ImportError:
+            pass
+
+    registry = ModelRegistry(
+        memory_budget_mb=float(os.getenv("MODEL_MEMORY_BUDGET_MB", 0)) or None,
+        idle_seconds=float(os.getenv("MODEL_IDLE_SECONDS", 300))
+    )
+    loaders = build_loaders(registry)
+    host = InferenceHost(address, authkey, loaders, registry)
+
+    # Preload in the background; workers asking for a model wait for it
+    for name, task, variant, load_fn in loaders.values():
+        threading.Thread(
+            target=_preload,
+            args=(registry, name, task, variant, load_fn),
+            daemon=True
+        ).start()
+    host.serve_forever()
+
+
+def _preload(registry: ModelRegistry, name, task, variant, load_fn):
+    try:
+        registry.get(name, task, load_fn, variant, owner="host")
+    except Exception as e:
+        logger.error(f"Inference host could not preload {name}: {str(e)}")
+
+
+def core_groups(n_groups: int) -> List[List[int]]:
+    """Split the CPUs this process may use into n_groups contiguous groups"""
+    if hasattr(os, "sched_getaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    n_groups = max(1, min(n_groups, len(cores)))
+    return [group.tolist() for group in np.array_split(np.asarray(cores), n_groups)]
+
+
+def host_address(base: str, index: int) -> str:
+    return f"{base}-{index}.sock"
+
+
+def start_hosts(n_hosts: int, base: str, authkey: bytes, ready_timeout: float = 60.0) -> list:
+    """
+    Start one inference host process per core group
+
+    Hosts run ``services.inference_host_main`` in their own interpreter,
+    so they never import the launching script (a spawned
+    multiprocessing child would re-run main.py as ``__mp_main__``). They
+    are terminated when this process exits.
+
+    Returns:
+        The started processes, once each one accepts connections
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, INFERENCE_HOST_AUTHKEY=authkey.decode("utf-8"))
+    processes = []
+    for index, cores in enumerate(core_groups(n_hosts)):
+        processes.append(subprocess.Popen(
+            [
+                sys.executable, "-m", "services.inference_host_main",
+                host_address(base, index), "--cores", *(str(core) for core in cores)
+            ],
+            cwd=root,
+            env=env
+        ))
+    atexit.register(_stop_hosts, processes)
+
+    for index, process in enumerate(processes):
+        try:
+            InferenceClient(host_address(base, index), authkey, connect_timeout=ready_timeout).request({'op': 'ping'})
+        except Exception:
+            if process.poll() is not None:
+                raise RuntimeError(f"Inference host {index} exited with status {process.returncode}")
+            raise
+    return processes
+
+
+def _stop_hosts(processes: list):
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def new_authkey() -> str:
+    return secrets.token_hex(16)
+
+
+# ============================================
+# WORKER SIDE
+# ============================================
+
+class InferenceClient:
+    """
+    Thread-safe connection pool to one inference host
+
+    Each request borrows a connection, so concurrent inference threads in
+    a worker never interleave messages on a socket.
+    """
+
+    def __init__(self, address, authkey: bytes, connect_timeout: float = 60.0):
+        self.address = address
+        self.authkey = authkey
+        self.connect_timeout = connect_timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+
+    def _connect(self):
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return Client(self.address, authkey=self.authkey)
+            except (FileNotFoundError, ConnectionRefusedError):
+                # Host still starting
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+
+    def request(self, message: Dict):
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        try:
+            connection.send(message)
+            response = connection.recv()
+        except Exception:
+            connection.close()
+            raise
+        self._idle.put(connection)
+
+        if not response['ok']:
+            raise RuntimeError(f"Inference host error: {response['error']}")
+        return unpack(response['result'])
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+class RemoteModel:
+    """Stand-in for a pipeline or encoder that runs on the inference host"""
+
+    def __init__(self, client: InferenceClient, key: str):
+        self.client = client
+        self.key = key
+
+    def _call(self, method: str, args: tuple, kwargs: dict):
+        return self.client.request({
+            'op': 'call',
+            'key': self.key,
+            'method': method,
+            'args': pack(args),
+            'kwargs': pack(kwargs)
+        })
+
+    def __call__(self, *args, **kwargs):
+        return self._call('__call__', args, kwargs)
+
+    def encode(self, *args, **kwargs):
+        return self._call('encode', args, kwargs)
+
+
+class RemoteRegistry:
+    """
+    ModelRegistry interface backed by an inference host
+
+    Services built with it in an HTTP worker keep all of their own logic;
+    the models they lease are ``RemoteModel`` proxies. Loads, eviction and
+    memory accounting happen on the host.
+    """
+
+    make_key = staticmethod(ModelRegistry.make_key)
+
+    def __init__(self, client: InferenceClient):
+        self.client = client
+
+    def get(self, name: str, task: str, load_fn=None, variant: str = "none", owner: Optional[str] = None):
+        key = self.make_key(name, task, variant)
+        self.client.request({'op': 'load', 'key': key, 'owner': owner})
+        return RemoteModel(self.client, key)
+
+    @contextmanager
+    def use(self, name: str, task: str, load_fn=None, variant: str = "none", owner: Optional[str] = None):
+        # The host leases (and if needed loads) the model per call
+        yield RemoteModel(self.client, self.make_key(name, task, variant))
+
+    def peek(self, name: str, task: str, variant: str = "none"):
+        key = self.make_key(name, task, variant)
+        return RemoteModel(self.client, key) if self.client.request({'op': 'peek', 'key': key}) else None
+
+    def evict(self, name: str, task: str, variant: str = "none") -> bool:
+        return self.client.request({'op': 'evict', 'key': self.make_key(name, task, variant)})
+
+    def enforce_budget(self, exclude: Optional[str] = None) -> list:
+        return []
+
+    def get_status(self) -> Dict:
+        try:
+            return self.client.request({'op': 'status'})
+        except Exception as e:
+            return {'error': str(e), 'address': str(self.client.address)}
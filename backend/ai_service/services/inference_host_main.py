@@ -0,0 +1,28 @@
+"""
+Inference Host entry point - Process started by ``start_hosts``
+
+Runs as ``python -m services.inference_host_main`` in a fresh interpreter
+that imports only the inference host and the services it loads models
+for. Starting hosts through main.py instead would rebuild the HTTP
+worker's vector index, job manager, pools and metrics in every host.
+"""
+
+import argparse
+import os
+
+from .inference_host import run_host
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve model forward passes to HTTP workers")
+    parser.add_argument("address", help="Unix socket path to listen on")
+    parser.add_argument("--cores", type=int, nargs="*", help="CPUs to pin the host to")
+    args = parser.parse_args()
+
+    # Passed through the environment so it does not show in the process list
+    authkey = os.environ["INFERENCE_HOST_AUTHKEY"].encode("utf-8")
+    run_host(args.address, authkey, args.cores or None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""
+Job Manager - Background jobs with progress, partial results, cancellation and persistence
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by submit when the bounded job queue has no room"""
+
+
+class JobContext:
+    """Handed to a job handler to report progress and emit partial results"""
+
+    def __init__(self, manager: "JobManager", job: Dict):
+        self._manager = manager
+        self._job = job
+
+    @property
+    def job_id(self) -> str:
+        return self._job['job_id']
+
+    def progress(self, done: int, total: Optional[int] = None, phase: Optional[str] = None):
+        """Record progress without emitting results"""
+        progress = self._job['progress']
+        progress['done'] = done
+        if total is not None:
+            progress['total'] = total
+        if phase is not None:
+            progress['phase'] = phase
+        self._manager._changed(self._job, persist=True)
+
+    async def emit(self, records: List[Any], done: Optional[int] = None, total: Optional[int] = None, phase: Optional[str] = None):
+        """
+        Append result records (one NDJSON line each) and update progress
+
+        Records are on disk, and visible to result streams, when this returns.
+        """
+        if records:
+            lines = "".join(json.dumps(record) + "\n" for record in records)
+            path = self._manager._results_path(self.job_id)
+            await asyncio.get_running_loop().run_in_executor(None, _append, path, lines)
+            self._job['result_count'] += len(records)
+        if done is not None:
+            self.progress(done, total, phase)
+        else:
+            self._manager._changed(self._job)
+
+
+def _append(path: str, text: str):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobManager:
+    """
+    Runs long clustering / embedding / classification work outside requests
+
+    Jobs wait in a bounded queue and run on ``workers`` asyncio tasks; the
+    blocking work inside a handler still goes to the inference pools.
+    Handlers report progress and append partial results through a
+    ``JobContext``. Each job's state is kept in ``<directory>/<id>.json``
+    and its results in ``<directory>/<id>.ndjson``, so finished jobs are
+    still available after a restart; jobs that were queued or running when
+    their process died are reported as failed. Other workers sharing the
+    directory can read (but not cancel) each other's jobs.
+    """
+
+    def __init__(self, directory: str, workers: int = 1, max_queue: int = 32, retention_seconds: float = 7 * 86400):
+        """
+        Args:
+            directory: Where job state and results are persisted
+            workers: Jobs run concurrently
+            max_queue: Jobs allowed to wait; submit raises JobQueueFull beyond it
+            retention_seconds: Finished jobs older than this are deleted (at
+                startup, on submit and whenever a job finishes)
+        """
+        self.directory = directory
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.retention_seconds = retention_seconds
+        self._handlers: Dict[str, Callable[[Any, JobContext], Awaitable[Any]]] = {}
+        self._jobs: Dict[str, Dict] = {}
+        self._payloads: Dict[str, Any] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._signals: Dict[str, asyncio.Event] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def register(self, kind: str, handler: Callable[[Any, JobContext], Awaitable[Any]]):
+        """
+        Register the coroutine function that runs jobs of ``kind``
+
+        ``handler(payload, context)`` may return a JSON-serializable summary,
+        stored with the job.
+        """
+        self._handlers[kind] = handler
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _state_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _results_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.ndjson")
+
+    def _persist(self, job: Dict):
+        path = self._state_path(job['job_id'])
+        try:
+            # Write-then-rename so readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(job, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not persist job {job['job_id']}: {str(e)}")
+
+    def _read_state(self, job_id: str) -> Optional[Dict]:
+        try:
+            with open(self._state_path(job_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load(self):
+        """Adopt persisted jobs; those orphaned by a dead process become failed"""
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            job = self._read_state(name[:-5])
+            if job is None:
+                continue
+            if job['status'] not in TERMINAL_STATUSES:
+                if _process_alive(job.get('pid')) and job.get('pid') != os.getpid():
+                    continue  # Owned by another live worker
+                job.update({
+                    'status': 'failed',
+                    'error': "Interrupted by a restart before finishing",
+                    'finished_at': now
+                })
+                self._persist(job)
+            if self._expired(job, now):
+                self._remove_files(job['job_id'])
+                continue
+            self._jobs[job['job_id']] = job
+        if self._jobs:
+            logger.info(f"Loaded {len(self._jobs)} persisted jobs from {self.directory}")
+
+    def _expired(self, job: Dict, now: float) -> bool:
+        return job['status'] in TERMINAL_STATUSES and now - (job.get('finished_at') or now) > self.retention_seconds
+
+    def _sweep(self):
+        """Forget finished jobs past retention and delete their files"""
+        now = time.time()
+        for job_id in [job_id for job_id, job in self._jobs.items() if self._expired(job, now)]:
+            del self._jobs[job_id]
+            self._remove_files(job_id)
+
+    def _remove_files(self, job_id: str):
+        for path in (self._state_path(job_id), self._results_path(job_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _changed(self, job: Dict, persist: bool = False):
+        job['updated_at'] = time.time()
+        if persist:
+            self._persist(job)
+        # Wake result streams following this job
+        signal = self._signals.pop(job['job_id'], None)
+        if signal is not None:
+            signal.set()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the workers on the running event loop"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        loop = asyncio.get_running_loop()
+        self._workers = [loop.create_task(self._work()) for _ in range(self.workers)]
+        logger.info(f"Job manager started ({self.workers} workers, queue of {self.max_queue})")
+
+    async def stop(self):
+        """Stop the workers; running and queued jobs are marked failed"""
+        for task in list(self._tasks.values()) + self._workers:
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), *self._workers, return_exceptions=True)
+        self._workers = []
+        for job in self._jobs.values():
+            if job['status'] not in TERMINAL_STATUSES:
+                job.update({'status': 'failed', 'error': "Service stopped before the job finished", 'finished_at': time.time()})
+                self._changed(job, persist=True)
+
+    def submit(self, kind: str, payload: Any) -> Dict:
+        """
+        Queue a job
+
+        Args:
+            kind: A registered job kind
+            payload: Input passed to the handler
+
+        Returns:
+            Public view of the new job
+
+        Raises:
+            ValueError: Unknown kind
+            JobQueueFull: The queue is at max_queue
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        if self._queue is None:
+            raise RuntimeError("Job manager is not started")
+
+        # Retention is enforced as jobs come and go, not only at startup
+        self._sweep()
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'kind': kind,
+            'status': 'queued',
+            'progress': {'done': 0, 'total': None, 'phase': None},
+            'result_count': 0,
+            'summary': None,
+            'error': None,
+            'created_at': now,
+            'started_at': None,
+            'finished_at': None,
+            'updated_at': now,
+            'pid': os.getpid()
+        }
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"Job queue is full ({self.max_queue} waiting)")
+        self._jobs[job_id] = job
+        self._payloads[job_id] = payload
+        self._persist(job)
+        return self._view(job)
+
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            payload = self._payloads.pop(job_id, None)
+            if job is None or job['status'] != 'queued':
+                continue  # Cancelled or deleted while waiting
+
+            job.update({'status': 'running', 'started_at': time.time()})
+            self._changed(job, persist=True)
+            task = asyncio.get_running_loop().create_task(self._handlers[job['kind']](payload, JobContext(self, job)))
+            self._tasks[job_id] = task
+            try:
+                # wait() does not raise when the job task is cancelled,
+                # so a job cancellation never stops this worker
+                await asyncio.wait([task])
+            finally:
+                self._tasks.pop(job_id, None)
+
+            if task.cancelled():
+                job['status'] = 'cancelled'
+            elif task.exception() is not None:
+                logger.error(f"Job {job_id} ({job['kind']}) failed: {str(task.exception())}")
+                job.update({'status': 'failed', 'error': str(task.exception())})
+            else:
+                job.update({'status': 'completed', 'summary': task.result()})
+            job['finished_at'] = time.time()
+            self._changed(job, persist=True)
+            logger.info(f"Job {job_id} ({job['kind']}) {job['status']} in {job['finished_at'] - job['started_at']:.1f}s")
+            self._sweep()
+
+    # ------------------------------------------------------------------
+    # Queries and control
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _view(job: Dict) -> Dict:
+        return {key: value for key, value in job.items() if key != 'pid'}
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Job state, from this process or from another worker's state file"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = self._read_state(job_id) if _is_job_id(job_id) else None
+        return self._view(job) if job else None
+
+    def list(self, status: Optional[str] = None) -> List[Dict]:
+        jobs = [self._view(job) for job in self._jobs.values() if status is None or job['status'] == status]
+        return sorted(jobs, key=lambda job: job['created_at'], reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Cancel a queued or running job of this process
+
+        Returns:
+            The job's state, or None if this process does not own it
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if job['status'] == 'queued':
+            self._payloads.pop(job_id, None)
+            job.update({'status': 'cancelled', 'finished_at': time.time()})
+            self._changed(job, persist=True)
+        elif job['status'] == 'running':
+            # The worker records the cancellation once the task unwinds
+            self._tasks[job_id].cancel()
+        return self._view(job)
+
+    def delete(self, job_id: str) -> bool:
+        """Forget a finished job and delete its files"""
+        job = self._jobs.get(job_id)
+        if job is None or job['status'] not in TERMINAL_STATUSES:
+            return False
+        del self._jobs[job_id]
+        self._remove_files(job_id)
+        return True
+
+    async def stream_results(self, job_id: str, offset: int = 0, follow: bool = True, poll_seconds: float = 0.5) -> AsyncIterator[bytes]:
+        """
+        Yield result lines from ``offset`` on, as they are emitted
+
+        With ``follow`` the stream stays open until the job finishes;
+        otherwise it ends at the results written so far.
+        """
+        path = self._results_path(job_id)
+        position = 0
+        with open(path, "a+b") as f:
+            f.seek(0)
+            while True:
+                finished = (self.get(job_id) or {}).get('status') in TERMINAL_STATUSES
+                signal = self._signals.setdefault(job_id, asyncio.Event())
+                while True:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        # Incomplete line: re-read it once the writer is done
+                        f.seek(-len(line), os.SEEK_CUR)
+                        break
+                    if position >= offset:
+                        yield line
+                    position += 1
+                if finished or not follow:
+                    return
+                try:
+                    await asyncio.wait_for(signal.wait(), timeout=poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    def get_stats(self) -> Dict:
+        counts = {}
+        for job in self._jobs.values():
+            counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'running': len(self._tasks),
+            'jobs': counts,
+            'directory': self.directory
+        }
+
+
+def _is_job_id(job_id: str) -> bool:
+    """Job ids are uuid4 hex; anything else must not reach the filesystem"""
+    return len(job_id) == 32 and all(c in "0123456789abcdef" for c in job_id)
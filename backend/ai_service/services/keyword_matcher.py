@@ -0,0 +1,134 @@
+"""
+Keyword Matcher - Single-pass whole-word matching of several keyword lists
+"""
+
+import logging
+import re
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordMatcher:
+    """
+    Find keywords from several labelled lists in one scan of the text
+
+    All keywords are compiled into a single regular expression, factored
+    into a prefix trie so the engine tests one character per branch instead
+    of every keyword at every position, and anchored on word boundaries, so
+    "bad" matches "bad" and "badly" but not "badminton". Every occurrence is
+    reported with its position, which gives exact per-label counts.
+    """
+
+    # Inflections accepted after a keyword ("fail" -> "failed", "slow" -> "slowly")
+    SUFFIXES = ("s", "es", "d", "ed", "ing", "ly")
+
+    def __init__(self, lexicon: Dict[str, Sequence[str]], suffixes: Sequence[str] = SUFFIXES):
+        """
+        Args:
+            lexicon: Label -> keywords (lowercase, single words). A keyword
+                listed under several labels counts for the first one.
+            suffixes: Inflections allowed after a keyword
+        """
+        self.labels = list(lexicon)
+        # Keyword -> label code
+        self.codes: Dict[str, int] = {}
+        for code, label in enumerate(self.labels):
+            for keyword in lexicon[label]:
+                self.codes.setdefault(keyword.lower(), code)
+
+        suffix = "(?:" + "|".join(map(re.escape, suffixes)) + ")?" if suffixes else ""
+        keywords = self._trie_pattern(self.codes) if self.codes else "(?!)"
+        self.pattern = re.compile(r"\b(" + keywords + ")" + suffix + r"\b")
+
+    @staticmethod
+    def _trie_pattern(keywords) -> str:
+        """Alternation of ``keywords`` with shared prefixes factored out"""
+        trie: Dict = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def build(node) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            if "" in node:
+                # A keyword ends here; the longer continuations are tried first
+                return "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+            return body
+
+        return build(trie)
+
+    def find(self, text: str) -> List[Tuple[int, str, str]]:
+        """
+        All keyword occurrences in one text
+
+        Returns:
+            (position, label, keyword) in order of position; positions index
+            into ``text.lower()``
+        """
+        if not text:
+            return []
+        return [
+            (match.start(), self.labels[self.codes[match.group(1)]], match.group(1))
+            for match in self.pattern.finditer(text.lower())
+        ]
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Occurrences per label in one text"""
+        counts = dict.fromkeys(self.labels, 0)
+        for _, label, _ in self.find(text):
+            counts[label] += 1
+        return counts
+
+    def match_batch(self, texts: Sequence[str]) -> Dict:
+        """
+        Match many texts in a single pass
+
+        Texts are lowercased and joined on newlines (a non-word separator,
+        so no match can span two texts) and scanned once; hit positions are
+        mapped back to texts with a binary search over the text offsets.
+
+        Returns:
+            Dictionary with
+                text_index: (hits,) index of the text of each hit
+                position: (hits,) offset of the hit within its text
+                label: (hits,) label code (index into ``labels``)
+                keyword: list of matched keywords
+                counts: (len(texts), len(labels)) occurrences per text and label
+        """
+        n = len(texts)
+        lowered = [text.lower() if text else "" for text in texts]
+        lengths = np.fromiter(map(len, lowered), dtype=np.int64, count=n)
+        offsets = np.zeros(n, dtype=np.int64)
+        if n > 1:
+            np.cumsum(lengths[:-1] + 1, out=offsets[1:])
+
+        hits = [(match.start(), match.group(1)) for match in self.pattern.finditer("\n".join(lowered))]
+
+        if hits:
+            starts, keywords = zip(*hits)
+            starts = np.array(starts, dtype=np.int64)
+            keywords = list(keywords)
+            label = np.fromiter(map(self.codes.__getitem__, keywords), dtype=np.int64, count=len(keywords))
+        else:
+            starts = label = np.zeros(0, dtype=np.int64)
+            keywords = []
+
+        text_index = np.searchsorted(offsets, starts, side='right') - 1
+        n_labels = len(self.labels)
+        counts = np.bincount(text_index * n_labels + label, minlength=n * n_labels).reshape(n, n_labels)
+
+        return {
+            'text_index': text_index,
+            'position': starts - offsets[text_index],
+            'label': label,
+            'keyword': keywords,
+            'counts': counts
+        }
@@ -0,0 +1,269 @@
+"""
+Metrics - Prometheus text-format histograms, counters and gauges
+"""
+
+import bisect
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; from sub-millisecond keyword matching to multi-second BART batches
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        name + '="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with fixed label names
+
+    ``observe`` is a bisect and three additions under a lock, cheap enough
+    to call per model call or per request.
+    """
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                # counts per bucket (+Inf last), sum
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labelvalues):
+        """Observe the seconds spent in the with-block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(series[0]), series[1]) for labels, series in self._series.items()]
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(float(bound)) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {total}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with fixed label names"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            snapshot = list(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in snapshot]
+        return lines
+
+
+class CallbackMetric:
+    """
+    Gauge or counter whose samples are read from existing stats at scrape time
+
+    ``fn`` returns an iterable of (label values, value) pairs, so the
+    services' own ``get_stats`` methods stay the single source of truth.
+    """
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str], fn: Callable[[], Iterable], kind: str = "gauge"):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+        self.kind = kind
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            for labels, value in self.fn():
+                if value is None:
+                    continue
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        except Exception as e:
+            logger.error(f"Metric {self.name} failed: {str(e)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered as {type(existing).__name__}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help_text, labelnames))
+
+    def callback(self, name: str, help_text: str, labelnames: Sequence[str], fn: Callable[[], Iterable], kind: str = "gauge") -> CallbackMetric:
+        """Register (or replace) a metric read from ``fn`` at scrape time"""
+        metric = CallbackMetric(name, help_text, labelnames, fn, kind)
+        with self._lock:
+            self._metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry and the metrics shared by every service
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "awaaz_stage_seconds",
+    "Time spent per service stage",
+    ("service", "stage")
+)
+MODEL_BATCH_SIZE = metrics.histogram(
+    "awaaz_model_batch_size",
+    "Texts per model call",
+    ("service",),
+    BATCH_SIZE_BUCKETS
+)
+
+
+def stage(service: str, name: str):
+    """
+    Time a stage of a service call, e.g. ``with stage("classifier", "forward"):``
+
+    Stages used across services: deserialize, tokenize, forward,
+    postprocess, serialize, plus service-specific ones (keywords, cluster,
+    score, cache_lookup, model_call).
+    """
+    return STAGE_SECONDS.time(service, name)
+
+
+def timed(service: str, name: str):
+    """Decorator form of ``stage`` for methods that are one stage end to end"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - started, service, name)
+        return wrapper
+    return decorator
+
+
+def observe_batch(service: str, size: int):
+    MODEL_BATCH_SIZE.observe(size, service)
+
+
+def _timed_generator(generator, service: str, name: str):
+    """Attribute the time spent producing each item of a generator to a stage"""
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(generator)
+        except StopIteration:
+            return
+        STAGE_SECONDS.observe(time.perf_counter() - started, service, name)
+        yield item
+
+
+def _timed_method(fn, service: str, name: str):
+    def timed_method(*args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        if hasattr(result, "__next__") and hasattr(result, "send"):
+            # Chunked pipelines (zero-shot) preprocess lazily, per item
+            return _timed_generator(result, service, name)
+        STAGE_SECONDS.observe(time.perf_counter() - started, service, name)
+        return result
+    return timed_method
+
+
+def instrument_model(model, service: str):
+    """
+    Time the tokenize / forward / postprocess steps inside a loaded model
+
+    Wraps a transformers pipeline's ``preprocess``, ``forward`` and
+    ``postprocess``, or a sentence transformer's ``tokenize`` and
+    ``forward``, on the instance. Other objects are returned unchanged.
+
+    Returns:
+        The same model object
+    """
+    hooks = (
+        (("preprocess", "tokenize"), ("forward", "forward"), ("postprocess", "postprocess"))
+        if hasattr(model, "preprocess") and hasattr(model, "postprocess")
+        else (("tokenize", "tokenize"), ("forward", "forward"))
+        if hasattr(model, "encode") and hasattr(model, "tokenize")
+        else ()
+    )
+    for attribute, name in hooks:
+        method = getattr(model, attribute, None)
+        if callable(method):
+            # Instance attribute; set through object to skip nn.Module hooks
+            object.__setattr__(model, attribute, _timed_method(method, service, name))
+    return model
@@ -0,0 +1,114 @@
+"""
+Model Loader - Load models concurrently in the background and track readiness
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ModelLoader:
+    """
+    Runs registered model loaders concurrently on background threads
+
+    Loading starts without blocking the event loop, so the service can answer
+    liveness checks and keyword-only requests while the transformers are
+    still being read from disk. Each model's status (pending, loading, ready,
+    failed) and load time is recorded for readiness reporting.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_workers: Models loaded at the same time (defaults to all)
+        """
+        self.max_workers = max_workers
+        self._loaders: Dict[str, Callable[[], None]] = {}
+        self._status: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._created = time.perf_counter()
+
+    def register(self, name: str, load_fn: Callable[[], None], required: bool = True):
+        """
+        Add a model to load
+
+        Args:
+            name: Model name reported by get_status
+            load_fn: Callable that loads the model (raises on failure)
+            required: Whether the service is only ready once it has loaded
+        """
+        self._loaders[name] = load_fn
+        self._status[name] = {
+            'status': 'pending',
+            'required': required,
+            'seconds': None,
+            'ready_after_seconds': None,
+            'error': None
+        }
+
+    def start(self):
+        """Begin loading every registered model; returns immediately"""
+        if self._executor is not None:
+            return
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers or max(1, len(self._loaders)),
+            thread_name_prefix="model-loader"
+        )
+        for name in self._loaders:
+            self._executor.submit(self._load, name)
+        # Threads exit once their loads finish; nothing else is queued
+        self._executor.shutdown(wait=False)
+
+    def _load(self, name: str):
+        with self._lock:
+            self._status[name]['status'] = 'loading'
+        started = time.perf_counter()
+        try:
+            self._loaders[name]()
+            status, error = 'ready', None
+        except Exception as e:
+            logger.error(f"Model '{name}' failed to load: {str(e)}")
+            status, error = 'failed', str(e)
+        finished = time.perf_counter()
+
+        with self._lock:
+            self._status[name].update({
+                'status': status,
+                'seconds': round(finished - started, 3),
+                'ready_after_seconds': round(finished - self._created, 3),
+                'error': error
+            })
+        logger.info(f"Model '{name}' {status} in {finished - started:.1f}s")
+
+    def is_ready(self, name: Optional[str] = None) -> bool:
+        """Whether one model, or every required model, has loaded"""
+        with self._lock:
+            if name is not None:
+                return self._status.get(name, {}).get('status') == 'ready'
+            return all(
+                state['status'] == 'ready'
+                for state in self._status.values()
+                if state['required']
+            )
+
+    def pending(self) -> List[str]:
+        """Required models that are not loaded yet"""
+        with self._lock:
+            return [
+                name for name, state in self._status.items()
+                if state['required'] and state['status'] != 'ready'
+            ]
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            models = {name: dict(state) for name, state in self._status.items()}
+        return {
+            'ready': all(state['status'] == 'ready' for state in models.values() if state['required']),
+            'uptime_seconds': round(time.perf_counter() - self._created, 3),
+            'models': models
+        }
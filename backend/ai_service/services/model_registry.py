@@ -0,0 +1,334 @@
+"""
+Model Registry - Process-wide store of loaded models shared across services
+"""
+
+import gc
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pipeline tasks that load identical weights
+TASK_ALIASES = {
+    'sentiment-analysis': 'text-classification'
+}
+
+
+def model_memory_bytes(model) -> int:
+    """
+    Bytes held by a model's tensors (parameters, buffers, packed int8 weights)
+
+    Pipelines are measured through their ``model``; tied weights are counted
+    once. Returns 0 for objects without a state dict.
+    """
+    module = getattr(model, "model", model)
+    state_dict = getattr(module, "state_dict", None)
+    if not callable(state_dict):
+        return 0
+
+    seen = set()
+    total = 0
+    pending = list(state_dict().values())
+    while pending:
+        value = pending.pop()
+        if isinstance(value, (tuple, list)):
+            pending.extend(value)
+            continue
+        if not (hasattr(value, "numel") and hasattr(value, "element_size")):
+            continue
+        try:
+            pointer = value.data_ptr()
+        except Exception:
+            pointer = id(value)
+        if pointer in seen:
+            continue
+        seen.add(pointer)
+        total += value.numel() * value.element_size()
+    return total
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, where /proc is available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ModelRegistry:
+    """
+    Loads each model once per process and shares it between services
+
+    Services ask for a model by name and task (plus a variant such as the
+    quantization mode) and pass a loader that builds it. Concurrent requests
+    for the same model wait for a single load. Inference holds a lease via
+    ``use``; when resident weights exceed the memory budget, the least
+    recently used models that are not leased and have been idle for
+    ``idle_seconds`` are evicted and reload on their next use. The budget
+    is checked after every load and lease release, and by a background
+    sweep so models go idle and get evicted without further traffic.
+    """
+
+    def __init__(self, memory_budget_mb: Optional[float] = None, idle_seconds: float = 300.0):
+        """
+        Args:
+            memory_budget_mb: Resident model memory allowed before idle
+                models are evicted (None for no limit)
+            idle_seconds: Minimum time since last use before a model may
+                be evicted
+        """
+        self.memory_budget_mb = memory_budget_mb
+        self.idle_seconds = idle_seconds
+        self._entries: Dict[str, Dict] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._sweeper: Optional[threading.Thread] = None
+        self._over_budget = False
+
+    @staticmethod
+    def make_key(name: str, task: str, variant: str = "none") -> str:
+        """Registry key of a model; aliased tasks share one key"""
+        task = TASK_ALIASES.get(task, task)
+        key = f"{task}:{name}"
+        return key if variant in (None, "none") else f"{key}@{variant}"
+
+    def get(self, name: str, task: str, load_fn: Callable, variant: str = "none", owner: Optional[str] = None):
+        """
+        Return the shared model, loading it on first request
+
+        Args:
+            name: Model name (e.g. a Hugging Face model id)
+            task: Task the model is loaded for
+            load_fn: Callable returning the loaded model (raises on failure)
+            variant: Distinguishes differently built copies, e.g. "int8"
+            owner: Service asking for the model, reported by get_status
+
+        Returns:
+            The loaded model
+        """
+        return self._acquire(name, task, load_fn, variant, owner, lease=False)
+
+    @contextmanager
+    def use(self, name: str, task: str, load_fn: Callable, variant: str = "none", owner: Optional[str] = None):
+        """
+        Lease the shared model for the duration of an inference call
+
+        The model is loaded if needed and cannot be evicted while leased.
+        """
+        key = self.make_key(name, task, variant)
+        model = self._acquire(name, task, load_fn, variant, owner, lease=True)
+        try:
+            yield model
+        finally:
+            with self._lock:
+                entry = self._entries[key]
+                entry['in_use'] -= 1
+                entry['last_used'] = time.monotonic()
+            self.enforce_budget()
+
+    def peek(self, name: str, task: str, variant: str = "none"):
+        """The model if it is resident, else None (never loads)"""
+        with self._lock:
+            entry = self._entries.get(self.make_key(name, task, variant))
+            return entry['model'] if entry else None
+
+    def _acquire(self, name, task, load_fn, variant, owner, lease: bool):
+        key = self.make_key(name, task, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {
+                    'name': name,
+                    'task': TASK_ALIASES.get(task, task),
+                    'variant': variant or "none",
+                    'model': None,
+                    'status': 'pending',
+                    'owners': set(),
+                    'loads': 0,
+                    'load_seconds': None,
+                    'memory_bytes': 0,
+                    'last_used': time.monotonic(),
+                    'in_use': 0,
+                    'error': None
+                }
+                self._load_locks[key] = threading.Lock()
+            if owner:
+                entry['owners'].add(owner)
+            if entry['model'] is not None:
+                return self._checkout(entry, lease)
+            load_lock = self._load_locks[key]
+
+        # One load per key; other callers wait here and then find it resident
+        with load_lock:
+            with self._lock:
+                if entry['model'] is not None:
+                    return self._checkout(entry, lease)
+                entry['status'] = 'loading'
+
+            started = time.perf_counter()
+            try:
+                model = load_fn()
+            except Exception as e:
+                with self._lock:
+                    entry.update({'status': 'failed', 'error': str(e)})
+                raise
+            seconds = time.perf_counter() - started
+            memory = model_memory_bytes(model)
+
+            with self._lock:
+                entry.update({
+                    'model': model,
+                    'status': 'ready',
+                    'loads': entry['loads'] + 1,
+                    'load_seconds': round(seconds, 3),
+                    'memory_bytes': memory,
+                    'error': None
+                })
+                checked_out = self._checkout(entry, lease)
+            logger.info(f"Registry loaded {key} in {seconds:.1f}s ({memory / 1e6:.0f} MB)")
+
+        self.enforce_budget(exclude=key)
+        self._start_sweeper()
+        return checked_out
+
+    def _start_sweeper(self):
+        """Start the background budget check once a model is resident"""
+        if not self.memory_budget_mb:
+            return
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(target=self._sweep, name="model-registry-sweep", daemon=True)
+        self._sweeper.start()
+
+    def _sweep(self):
+        # A model becomes evictable idle_seconds after its last use; checking
+        # a few times per idle period bounds how long it outstays that
+        interval = min(max(self.idle_seconds / 4, 1.0), 60.0)
+        while True:
+            time.sleep(interval)
+            try:
+                self.enforce_budget()
+            except Exception as e:
+                logger.error(f"Registry budget sweep failed: {str(e)}")
+
+    @staticmethod
+    def _checkout(entry: Dict, lease: bool):
+        entry['last_used'] = time.monotonic()
+        if lease:
+            entry['in_use'] += 1
+        return entry['model']
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return self._resident_bytes()
+
+    def _resident_bytes(self) -> int:
+        return sum(entry['memory_bytes'] for entry in self._entries.values() if entry['model'] is not None)
+
+    def enforce_budget(self, exclude: Optional[str] = None) -> List[str]:
+        """
+        Evict idle models, least recently used first, until within budget
+
+        Args:
+            exclude: Key that must stay resident (the model just loaded)
+
+        Returns:
+            Keys of the evicted models
+        """
+        if not self.memory_budget_mb:
+            return []
+
+        budget = self.memory_budget_mb * 1024 * 1024
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            resident = self._resident_bytes()
+            candidates = sorted(
+                (
+                    (entry['last_used'], key) for key, entry in self._entries.items()
+                    if key != exclude
+                    and entry['model'] is not None
+                    and entry['in_use'] == 0
+                    and now - entry['last_used'] >= self.idle_seconds
+                )
+            )
+            for _, key in candidates:
+                if resident <= budget:
+                    break
+                resident -= self._entries[key]['memory_bytes']
+                self._release(key)
+                evicted.append(key)
+            over_budget = resident > budget
+            # Checked on every lease release; warn once per overrun, not per call
+            warn = over_budget and not self._over_budget
+            self._over_budget = over_budget
+
+        if evicted:
+            gc.collect()
+            logger.info(f"Registry evicted idle models: {', '.join(evicted)}")
+        if warn:
+            logger.warning(
+                f"Resident models use {resident / 1e6:.0f} MB, over the {self.memory_budget_mb:.0f} MB budget, "
+                "and no idle model can be evicted"
+            )
+        return evicted
+
+    def evict(self, name: str, task: str, variant: str = "none") -> bool:
+        """Drop a model now unless it is leased; returns whether it was evicted"""
+        key = self.make_key(name, task, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['model'] is None or entry['in_use']:
+                return False
+            self._release(key)
+        gc.collect()
+        return True
+
+    def _release(self, key: str):
+        entry = self._entries[key]
+        entry['model'] = None
+        entry['status'] = 'evicted'
+        self._evictions += 1
+
+    def get_status(self) -> Dict:
+        now = time.monotonic()
+        rss = process_rss_bytes()
+        with self._lock:
+            models = {
+                key: {
+                    'name': entry['name'],
+                    'task': entry['task'],
+                    'variant': entry['variant'],
+                    'status': entry['status'],
+                    'owners': sorted(entry['owners']),
+                    'memory_mb': round(entry['memory_bytes'] / (1024 * 1024), 1),
+                    'load_seconds': entry['load_seconds'],
+                    'loads': entry['loads'],
+                    'in_use': entry['in_use'],
+                    'idle_seconds': round(now - entry['last_used'], 1),
+                    'error': entry['error']
+                }
+                for key, entry in self._entries.items()
+            }
+            resident = self._resident_bytes()
+            evictions = self._evictions
+        return {
+            'models': models,
+            'resident_mb': round(resident / (1024 * 1024), 1),
+            'memory_budget_mb': self.memory_budget_mb,
+            'idle_seconds': self.idle_seconds,
+            'evictions': evictions,
+            'process_rss_mb': round(rss / (1024 * 1024), 1) if rss is not None else None
+        }
+
+
+# Used by services constructed without an explicit registry, so models are
+# still shared within the process
+default_registry = ModelRegistry()
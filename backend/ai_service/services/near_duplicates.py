@@ -0,0 +1,235 @@
+"""
+Near-Duplicate Filter - MinHash-LSH grouping of copy-pasted complaints
+"""
+
+import logging
+import re
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from .embedding_cache import EmbeddingCache
+from .graph_clustering import UnionFind
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+")
+SHINGLE_HASH_BASE = 1_000_003
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer; uint64 arithmetic wraps"""
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def shingle_hashes(texts: Sequence[str], size: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    64-bit hashes of the character ``size``-grams of normalized texts
+
+    Punctuation is dropped and words are joined by single spaces first, so
+    shingles survive small edits, reordered sentences and formatting noise.
+    Texts shorter than ``size`` yield one zero-padded shingle.
+
+    Returns:
+        (hashes, owners): hash of every shingle and the index of the text
+        it came from; repeated shingles of a text are not deduplicated
+    """
+    encoded = [
+        " ".join(WORD_PATTERN.findall(EmbeddingCache.normalize(text))).encode("utf-32-le")
+        for text in texts
+    ]
+    lengths = np.array([len(data) // 4 for data in encoded], dtype=np.int64)
+    padded = np.maximum(lengths, size)
+    offsets = np.cumsum(padded) - padded
+
+    # All texts back to back, each zero-padded to at least ``size`` code points
+    codepoints = np.zeros(int(padded.sum()), dtype=np.uint64)
+    codepoints[_ranges(offsets, lengths)] = np.frombuffer(b"".join(encoded), dtype=np.uint32)
+
+    # Polynomial hash of every window that lies inside one text
+    counts = padded - size + 1
+    starts = _ranges(offsets, counts)
+    hashes = np.zeros(len(starts), dtype=np.uint64)
+    for position in range(size):
+        hashes = hashes * np.uint64(SHINGLE_HASH_BASE) + codepoints[starts + position]
+    return hashes, np.repeat(np.arange(len(texts)), counts)
+
+
+def _ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(start, start + length) for every pair"""
+    run_starts = np.cumsum(lengths) - lengths
+    return np.repeat(starts - run_starts, lengths) + np.arange(int(lengths.sum()))
+
+
+def minhash_signatures(
+    texts: Sequence[str],
+    num_perm: int = 128,
+    shingle_size: int = 5,
+    seed: int = 0,
+    max_chunk_chars: int = 1 << 20
+) -> np.ndarray:
+    """
+    MinHash signature of every text, by one-permutation hashing
+
+    Every shingle is hashed once; the top bits of the hash pick one of
+    ``num_perm`` bins and each bin keeps its minimum, which costs one hash
+    per shingle instead of one per shingle and permutation. Bins no
+    shingle fell into borrow the next non-empty bin (rotation
+    densification), offset by the distance so borrowed values rarely
+    match real ones. Texts are processed in chunks of about
+    ``max_chunk_chars`` characters to bound memory.
+
+    Args:
+        texts: Texts to sign
+        num_perm: Signature length; a power of two
+        shingle_size: Characters per shingle
+        seed: Seed of the hash function
+        max_chunk_chars: Characters per chunk
+
+    Returns:
+        (len(texts), num_perm) uint32 array; the share of equal columns of
+        two rows estimates the Jaccard similarity of their shingle sets
+    """
+    bits = int(num_perm).bit_length() - 1
+    if num_perm < 2 or num_perm != 1 << bits:
+        raise ValueError(f"num_perm must be a power of two, got {num_perm}")
+    rng = np.random.default_rng(seed)
+    key = rng.integers(0, np.iinfo(np.int64).max, dtype=np.uint64)
+    rotation = np.uint64(rng.integers(1, 1 << 31) | 1)
+
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    lengths = np.cumsum([len(text) for text in texts])
+    start = 0
+    while start < len(texts):
+        base = lengths[start - 1] if start else 0
+        end = max(start + 1, int(np.searchsorted(lengths, base + max_chunk_chars, side="right")))
+        hashes, owners = shingle_hashes(texts[start:end], shingle_size)
+
+        mixed = _mix64(hashes ^ key)
+        slots = owners * num_perm + (mixed >> np.uint64(64 - bits)).astype(np.int64)
+        block = np.full((end - start) * num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        np.minimum.at(block, slots, (mixed & np.uint64(0xFFFFFFFF)).astype(np.uint32))
+        block = block.reshape(end - start, num_perm)
+
+        # Each empty bin takes the next non-empty bin to its right (circularly)
+        empty = (np.bincount(slots, minlength=block.size) == 0).reshape(block.shape)
+        if empty.any():
+            positions = np.where(empty, 2 * num_perm, np.arange(num_perm))
+            doubled = np.concatenate([positions, positions + num_perm], axis=1)
+            source = np.minimum.accumulate(doubled[:, ::-1], axis=1)[:, ::-1][:, :num_perm]
+            distance = (source - np.arange(num_perm)).astype(np.uint64)
+            borrowed = np.take_along_axis(block, source % num_perm, axis=1).astype(np.uint64)
+            block = np.where(empty, (borrowed + distance * rotation) & np.uint64(0xFFFFFFFF), block).astype(np.uint32)
+
+        signatures[start:end] = block
+        start = end
+    return signatures
+
+
+def near_duplicate_groups(
+    texts: Sequence[Optional[str]],
+    threshold: float = 0.8,
+    partitions: Optional[Sequence[int]] = None,
+    num_perm: int = 128,
+    bands: int = 16,
+    shingle_size: int = 5,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    Group exact and near-exact duplicate texts
+
+    Texts equal after normalization are grouped directly. The remaining
+    distinct texts are bucketed by MinHash-LSH (``bands`` bands of
+    ``num_perm // bands`` rows); texts sharing a bucket are linked when
+    their estimated Jaccard similarity reaches ``threshold``, and groups
+    are the connected components of those links. Texts that are None are
+    never grouped, and texts in different ``partitions`` (e.g. category
+    and location cell) are never grouped together.
+
+    Args:
+        texts: Texts to group (None for items without text)
+        threshold: Minimum estimated Jaccard similarity of character shingles
+        partitions: Optional integer key per text
+        num_perm: Signature length; a power of two
+        bands: LSH bands; more bands find lower similarities
+        shingle_size: Characters per shingle
+        seed: Seed of the hash function
+
+    Returns:
+        Index of each text's group representative (the lowest index in
+        its group); representatives map to themselves
+    """
+    n = len(texts)
+    representatives = np.arange(n, dtype=np.int64)
+    if n < 2:
+        return representatives
+    partitions = np.zeros(n, dtype=np.int64) if partitions is None else np.asarray(partitions, dtype=np.int64)
+
+    # Exact duplicates after normalization
+    first_seen = {}
+    distinct = []
+    for idx, text in enumerate(texts):
+        if text is None:
+            continue
+        key = (int(partitions[idx]), EmbeddingCache.normalize(text))
+        first = first_seen.setdefault(key, idx)
+        representatives[idx] = first
+        if first == idx:
+            distinct.append(idx)
+    distinct = np.asarray(distinct, dtype=np.int64)
+    if len(distinct) < 2:
+        return representatives
+
+    # Near duplicates among the distinct texts
+    signatures = minhash_signatures([texts[idx] for idx in distinct], num_perm, shingle_size, seed)
+    _, partition_codes = np.unique(partitions[distinct], return_inverse=True)
+    rows = max(1, num_perm // bands)
+    union_find = UnionFind(len(distinct))
+    for band in range(num_perm // rows):
+        block = np.column_stack([partition_codes.astype(np.uint32), signatures[:, band * rows:(band + 1) * rows]])
+        block = np.ascontiguousarray(block)
+        bucket_keys = block.view(np.dtype((np.void, block.dtype.itemsize * block.shape[1]))).ravel()
+        _, buckets = np.unique(bucket_keys, return_inverse=True)
+
+        # Link every bucket member to the bucket's first member, if similar enough
+        order = np.argsort(buckets, kind="stable")
+        sorted_buckets = buckets[order]
+        heads = order[np.searchsorted(sorted_buckets, sorted_buckets)]
+        candidates = heads != order
+        a, b = order[candidates], heads[candidates]
+        if not len(a):
+            continue
+        similar = (signatures[a] == signatures[b]).mean(axis=1) >= threshold
+        union_find.union(a[similar], b[similar])
+
+    # Roots are the smallest member, i.e. the lowest original index
+    roots = distinct[union_find.labels()]
+    has_text = np.array([text is not None for text in texts])
+    representatives[has_text] = roots[np.searchsorted(distinct, representatives[has_text])]
+    return representatives
+
+
+def expand_labels(representative_labels: np.ndarray, groups: np.ndarray, representatives: np.ndarray) -> np.ndarray:
+    """
+    Cluster label of every item from the labels of the group representatives
+
+    Args:
+        representative_labels: Label per entry of ``representatives``
+        groups: Representative index per item (from near_duplicate_groups)
+        representatives: Sorted unique representative indices
+
+    Returns:
+        Label per item
+    """
+    return np.asarray(representative_labels)[np.searchsorted(representatives, groups)]
+
+
+def group_stats(groups: np.ndarray) -> dict:
+    representatives = np.unique(groups)
+    return {
+        'items': int(len(groups)),
+        'groups': int(len(representatives)),
+        'collapsed': int(len(groups) - len(representatives))
+    }
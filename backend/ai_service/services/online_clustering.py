@@ -0,0 +1,335 @@
+"""
+Online Clustering Service - Incrementally assign new issues to duplicate clusters
+"""
+
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class _Cluster:
+    def __init__(self, cluster_id: int, dim: int):
+        self.cluster_id = cluster_id
+        self.members: Dict[str, np.ndarray] = {}
+        self.total = np.zeros(dim, dtype=np.float32)
+
+    @property
+    def centroid(self) -> np.ndarray:
+        return self.total / (np.linalg.norm(self.total) + 1e-10)
+
+    def add(self, issue_id: str, vector: np.ndarray):
+        self.members[issue_id] = vector
+        self.total += vector
+
+    def remove(self, issue_id: str):
+        self.total -= self.members.pop(issue_id)
+
+    def rebuild(self):
+        """Recompute the sum from the members, dropping float32 rounding drift"""
+        if self.members:
+            self.total = np.sum(list(self.members.values()), axis=0, dtype=np.float64).astype(np.float32)
+        else:
+            self.total[:] = 0
+
+
+class OnlineClusteringService:
+    """
+    Stateful clustering of open issues
+
+    Each cluster keeps its members and the running sum of their normalized
+    embeddings. A new issue is compared against all centroids in one matrix
+    product (O(clusters)) and joins the best cluster if the cosine similarity
+    reaches ``similarity_threshold``, otherwise it opens a new cluster.
+    ``consolidate()`` periodically merges clusters whose centroids have
+    drifted together and splits off members that no longer fit.
+    """
+
+    def __init__(
+        self,
+        dim: int = 384,
+        similarity_threshold: float = 0.75,
+        merge_threshold: Optional[float] = None,
+        split_threshold: Optional[float] = None
+    ):
+        """
+        Args:
+            dim: Embedding dimension
+            similarity_threshold: Minimum member-to-centroid similarity to join
+            merge_threshold: Centroid similarity at which clusters merge
+                (defaults to similarity_threshold)
+            split_threshold: Member-to-centroid similarity below which a
+                member is split off during consolidation (defaults to
+                similarity_threshold - 0.1)
+        """
+        self.dim = dim
+        self.similarity_threshold = similarity_threshold
+        self.merge_threshold = merge_threshold if merge_threshold is not None else similarity_threshold
+        self.split_threshold = split_threshold if split_threshold is not None else similarity_threshold - 0.1
+
+        self.clusters: Dict[int, _Cluster] = {}
+        self.issue_cluster: Dict[str, int] = {}
+        self._next_id = itertools.count()
+        self._lock = threading.RLock()
+
+        # Centroid matrix rows, kept in step with self.clusters
+        self._centroids = np.empty((0, dim), dtype=np.float32)
+        self._row_ids: List[int] = []
+        self._rows: Dict[int, int] = {}
+
+        self.last_consolidation: Optional[Dict] = None
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32).reshape(-1)
+        return v / (np.linalg.norm(v) + 1e-10)
+
+    # ------------------------------------------------------------------
+    # Centroid matrix bookkeeping
+    # ------------------------------------------------------------------
+
+    def _set_row(self, cluster: _Cluster):
+        row = self._rows.get(cluster.cluster_id)
+        if row is None:
+            if len(self._row_ids) == len(self._centroids):
+                grown = np.empty((max(64, 2 * len(self._centroids)), self.dim), dtype=np.float32)
+                grown[:len(self._row_ids)] = self._centroids[:len(self._row_ids)]
+                self._centroids = grown
+            row = len(self._row_ids)
+            self._row_ids.append(cluster.cluster_id)
+            self._rows[cluster.cluster_id] = row
+        self._centroids[row] = cluster.centroid
+
+    def _drop_cluster(self, cluster_id: int):
+        self.clusters.pop(cluster_id)
+        row = self._rows.pop(cluster_id)
+        last = len(self._row_ids) - 1
+        if row != last:
+            moved = self._row_ids[last]
+            self._centroids[row] = self._centroids[last]
+            self._row_ids[row] = moved
+            self._rows[moved] = row
+        self._row_ids.pop()
+
+    def _new_cluster(self) -> _Cluster:
+        cluster = _Cluster(next(self._next_id), self.dim)
+        self.clusters[cluster.cluster_id] = cluster
+        return cluster
+
+    # ------------------------------------------------------------------
+    # Incremental operations
+    # ------------------------------------------------------------------
+
+    def assign(self, issue_id: str, embedding) -> Dict:
+        """
+        Place one issue in the best matching cluster or open a new one
+
+        Args:
+            issue_id: Issue identifier (re-assigning an ID moves it)
+            embedding: Issue embedding
+
+        Returns:
+            Dictionary with cluster_id, similarity, new_cluster and size
+        """
+        vector = self._normalize(embedding)
+        if vector.shape[0] != self.dim:
+            raise ValueError(f"Expected embedding of dimension {self.dim}, got {vector.shape[0]}")
+
+        with self._lock:
+            if issue_id in self.issue_cluster:
+                self._remove_locked(issue_id)
+
+            best_similarity = -1.0
+            cluster = None
+            if self._row_ids:
+                similarities = self._centroids[:len(self._row_ids)] @ vector
+                best = int(np.argmax(similarities))
+                best_similarity = float(similarities[best])
+                if best_similarity >= self.similarity_threshold:
+                    cluster = self.clusters[self._row_ids[best]]
+
+            new_cluster = cluster is None
+            if new_cluster:
+                cluster = self._new_cluster()
+                best_similarity = 1.0
+
+            cluster.add(issue_id, vector)
+            self.issue_cluster[issue_id] = cluster.cluster_id
+            self._set_row(cluster)
+
+            return {
+                'issue_id': issue_id,
+                'cluster_id': cluster.cluster_id,
+                'similarity': round(best_similarity, 4),
+                'new_cluster': new_cluster,
+                'size': len(cluster.members)
+            }
+
+    def remove(self, issue_id: str) -> bool:
+        """Remove a resolved issue; empty clusters are dropped"""
+        with self._lock:
+            if issue_id not in self.issue_cluster:
+                return False
+            self._remove_locked(issue_id)
+            return True
+
+    def _remove_locked(self, issue_id: str):
+        cluster = self.clusters[self.issue_cluster.pop(issue_id)]
+        cluster.remove(issue_id)
+        if cluster.members:
+            self._set_row(cluster)
+        else:
+            self._drop_cluster(cluster.cluster_id)
+
+    # ------------------------------------------------------------------
+    # Consolidation
+    # ------------------------------------------------------------------
+
+    def consolidate(self) -> Dict:
+        """
+        Merge clusters whose centroids are within ``merge_threshold`` and
+        split off members below ``split_threshold`` of their centroid
+
+        Similarities are computed on snapshots outside the lock; the lock is
+        held only to take the snapshots and apply the merges and splits, so
+        concurrent ``assign`` calls wait for bookkeeping, not matrix products.
+        Issues assigned in the meantime are considered on the next run.
+
+        Returns:
+            Summary of merges and splits performed
+        """
+        started = time.perf_counter()
+        with self._lock:
+            n = len(self._row_ids)
+            centroids = self._centroids[:n].copy()
+            row_ids = list(self._row_ids)
+
+        groups = self._merge_groups(centroids, row_ids)
+        with self._lock:
+            merged = self._merge_locked(groups)
+            # Running sums drift with every incremental add and remove;
+            # rebuild them from the members and refresh every row
+            for cluster in self.clusters.values():
+                cluster.rebuild()
+                self._set_row(cluster)
+            members = [
+                (cluster.cluster_id, list(cluster.members.items()), cluster.centroid)
+                for cluster in self.clusters.values()
+                if len(cluster.members) >= 2
+            ]
+
+        outliers = self._find_outliers(members)
+        with self._lock:
+            split = self._split_locked(outliers)
+            for cluster in self.clusters.values():
+                self._set_row(cluster)
+
+            self.last_consolidation = {
+                'merged_clusters': merged,
+                'split_issues': split,
+                'clusters': len(self.clusters),
+                'seconds': round(time.perf_counter() - started, 4)
+            }
+            logger.info(f"Online clustering consolidated: {self.last_consolidation}")
+            return self.last_consolidation
+
+    def _merge_groups(self, centroids: np.ndarray, row_ids: List[int], block: int = 2048) -> List[List[int]]:
+        """Cluster IDs whose centroids are connected at ``merge_threshold``, groups of two or more"""
+        n = len(row_ids)
+        if n < 2:
+            return []
+
+        parent = list(range(n))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for start in range(0, n, block):
+            sims = centroids[start:start + block] @ centroids.T
+            rows, cols = np.nonzero(sims >= self.merge_threshold)
+            for i, j in zip(rows + start, cols):
+                if i < j:
+                    ri, rj = find(i), find(j)
+                    if ri != rj:
+                        parent[rj] = ri
+
+        groups: Dict[int, List[int]] = {}
+        for row in range(n):
+            groups.setdefault(find(row), []).append(row_ids[row])
+        return [cluster_ids for cluster_ids in groups.values() if len(cluster_ids) > 1]
+
+    def _merge_locked(self, groups: List[List[int]]) -> int:
+        merged = 0
+        for cluster_ids in groups:
+            # Clusters emptied since the snapshot are gone
+            cluster_ids = [cid for cid in cluster_ids if cid in self.clusters]
+            if len(cluster_ids) < 2:
+                continue
+            # Fold smaller clusters into the largest one
+            cluster_ids.sort(key=lambda cid: -len(self.clusters[cid].members))
+            target = self.clusters[cluster_ids[0]]
+            for cid in cluster_ids[1:]:
+                for issue_id, vector in self.clusters[cid].members.items():
+                    target.add(issue_id, vector)
+                    self.issue_cluster[issue_id] = target.cluster_id
+                self._drop_cluster(cid)
+                merged += 1
+        return merged
+
+    def _find_outliers(self, members: List) -> List:
+        """(cluster_id, issue_id, vector) of members below ``split_threshold`` of their centroid"""
+        outliers = []
+        for cluster_id, items, centroid in members:
+            similarities = np.stack([vector for _, vector in items]) @ centroid
+            for (issue_id, vector), similarity in zip(items, similarities):
+                if similarity < self.split_threshold:
+                    outliers.append((cluster_id, issue_id, vector))
+        return outliers
+
+    def _split_locked(self, outliers: List) -> int:
+        # Skip issues removed or moved since the snapshot
+        outliers = [
+            (issue_id, vector) for cluster_id, issue_id, vector in outliers
+            if self.issue_cluster.get(issue_id) == cluster_id
+        ]
+        for issue_id, vector in outliers:
+            self._remove_locked(issue_id)
+        for issue_id, vector in outliers:
+            self.assign(issue_id, vector)
+        return len(outliers)
+
+    # ------------------------------------------------------------------
+    # Read access
+    # ------------------------------------------------------------------
+
+    def get_clusters(self, min_size: int = 1) -> List[Dict]:
+        with self._lock:
+            return [
+                {
+                    'cluster_id': cluster.cluster_id,
+                    'members': list(cluster.members.keys()),
+                    'size': len(cluster.members)
+                }
+                for cluster in self.clusters.values()
+                if len(cluster.members) >= min_size
+            ]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            sizes = [len(cluster.members) for cluster in self.clusters.values()]
+            return {
+                'issues': len(self.issue_cluster),
+                'clusters': len(self.clusters),
+                'merged_clusters': sum(1 for size in sizes if size > 1),
+                'largest_cluster': max(sizes) if sizes else 0,
+                'similarity_threshold': self.similarity_threshold,
+                'last_consolidation': self.last_consolidation
+            }
@@ -3,7 +3,10 @@ Priority Calculation Service - Determine issue priority and urgency
 """
 
 import logging
-from typing import Dict
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+from .metrics import observe_batch, timed
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +31,28 @@ class PriorityService:
         "Low": 168
     }
     
+    # Weighted factor blend, same order as FACTOR_NAMES
+    FACTOR_NAMES = [
+        'category_risk',
+        'location_density',
+        'citizen_engagement',
+        'age_factor',
+        'safety_rating'
+    ]
+    FACTOR_WEIGHTS = [0.35, 0.25, 0.20, 0.10, 0.10]
+    
+    PRIORITY_LEVELS = np.array(["Low", "Medium", "High"])
+    
     def __init__(self):
-        pass
+        # Category name -> risk lookup table for the vectorized path
+        self._risk_categories = list(self.CATEGORY_RISK_MAP.keys())
+        self._risk_codes = {category: code for code, category in enumerate(self._risk_categories)}
+        self._risk_table = np.array(
+            list(self.CATEGORY_RISK_MAP.values()) + [30],  # Unknown categories
+            dtype=np.float64
+        )
     
+    @timed("priority", "score")
     def calculate_priority(
         self,
         issue_id: str,
@@ -130,6 +152,97 @@ class PriorityService:
                 'reasoning': f'Error in priority calculation: {str(e)}'
             }
     
+    @timed("priority", "score_batch")
+    def calculate_priority_batch(
+        self,
+        categories: Sequence[str],
+        location_density: Sequence[float],
+        citizen_upvotes: Sequence[int],
+        age_hours: Sequence[int],
+        safety_rating: Sequence[float],
+        issue_ids: Optional[Sequence[str]] = None
+    ) -> Dict:
+        """
+        Vectorized priority calculation over parallel (columnar) arrays
+        
+        Applies the same factors, weights and thresholds as
+        calculate_priority, but as NumPy array operations.
+        
+        Args:
+            categories: Issue category per issue
+            location_density: Complaint density per issue (0-100)
+            citizen_upvotes: Upvotes per issue
+            age_hours: Issue age in hours per issue
+            safety_rating: Safety concern level per issue (0-100)
+            issue_ids: Optional issue identifiers, passed through
+            
+        Returns:
+            Dictionary of parallel arrays: priority_score, priority_level
+            and one array per factor
+        """
+        n = len(categories)
+        observe_batch("priority", n)
+        columns = [location_density, citizen_upvotes, age_hours, safety_rating]
+        if any(len(column) != n for column in columns) or (issue_ids is not None and len(issue_ids) != n):
+            raise ValueError("All priority columns must have the same length")
+        
+        # 1. Category Risk - lookup via category codes
+        codes = self._category_codes(categories)
+        category_risk = self._risk_table[codes]
+        
+        # 2-5. Density, engagement, age and safety factors
+        location_factor = np.minimum(100, np.asarray(location_density, dtype=np.float64) * 1.2)
+        engagement_factor = np.minimum(100, np.asarray(citizen_upvotes, dtype=np.float64) * 10)
+        age_factor = np.minimum(100, (np.asarray(age_hours, dtype=np.float64) / 24) * 5)
+        safety_factor = np.asarray(safety_rating, dtype=np.float64)
+        
+        factors = np.stack([category_risk, location_factor, engagement_factor, age_factor, safety_factor])
+        
+        # Weighted score, summed left to right and truncated like int() in
+        # calculate_priority; a dot product may reorder the additions and
+        # round differently at integer boundaries
+        weighted = factors[0] * self.FACTOR_WEIGHTS[0]
+        for weight, factor in zip(self.FACTOR_WEIGHTS[1:], factors[1:]):
+            weighted = weighted + factor * weight
+        priority_score = np.trunc(weighted).astype(np.int64)
+        level_codes = (priority_score >= 40).astype(np.int8) + (priority_score >= 70)
+        
+        result = {
+            'priority_score': priority_score,
+            'priority_level': self.PRIORITY_LEVELS[level_codes],
+            'factors': dict(zip(self.FACTOR_NAMES, factors))
+        }
+        if issue_ids is not None:
+            result['issue_id'] = list(issue_ids)
+        return result
+    
+    def _category_codes(self, categories: Sequence[str]) -> np.ndarray:
+        """Map category names to rows of the risk table (last row = unknown)"""
+        unknown = len(self._risk_categories)
+        return np.fromiter(
+            (self._risk_codes.get(category, unknown) for category in categories),
+            dtype=np.int64,
+            count=len(categories)
+        )
+    
+    @timed("priority", "reasoning")
+    def batch_reasoning(self, batch: Dict, categories: Sequence[str], indices: Optional[Sequence[int]] = None) -> List[str]:
+        """
+        Generate reasoning text for selected rows of a calculate_priority_batch
+        result (all rows if indices is None)
+        """
+        if indices is None:
+            indices = range(len(batch['priority_score']))
+        return [
+            self._generate_reasoning(
+                str(batch['priority_level'][i]),
+                int(batch['priority_score'][i]),
+                {name: float(values[i]) for name, values in batch['factors'].items()},
+                categories[i]
+            )
+            for i in indices
+        ]
+    
     def _generate_reasoning(
         self,
         priority_level: str,
@@ -0,0 +1,109 @@
+"""
+Quantization - Opt-in int8 dynamic quantization of transformer models for CPU
+"""
+
+import hashlib
+import logging
+import os
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+MODES = ("none", "int8")
+
+
+def resolve_mode(mode: Optional[str]) -> str:
+    """Normalize a quantization mode ("none" when not given)"""
+    mode = (mode or "none").strip().lower()
+    if mode in ("", "0", "false", "off", "fp32"):
+        return "none"
+    if mode not in MODES:
+        raise ValueError(f"Unsupported quantization mode '{mode}', expected one of {MODES}")
+    return mode
+
+
+def mode_for_device(mode: Optional[str], device: str) -> str:
+    """Quantization mode to actually use; dynamic int8 kernels exist for CPU only"""
+    mode = resolve_mode(mode)
+    if mode != "none" and device != "cpu":
+        logger.warning(f"int8 dynamic quantization is CPU-only, loading fp32 on {device}")
+        return "none"
+    return mode
+
+
+def quantize_int8(model):
+    """
+    Replace every nn.Linear with a dynamically quantized int8 linear layer
+
+    Weights are stored as int8; activations are quantized on the fly per
+    batch, so no calibration data is needed. CPU only.
+    """
+    import torch
+
+    model.eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def cache_path(cache_dir: str, name: str) -> str:
+    """
+    File for a quantized model, keyed on model name and library versions
+
+    A pickled module is only valid for the torch/transformers versions that
+    wrote it, so an upgrade simply misses the cache.
+    """
+    import torch
+
+    try:
+        import transformers
+        transformers_version = transformers.__version__
+    except ImportError:
+        transformers_version = "none"
+
+    key = hashlib.sha256(f"{name}|{torch.__version__}|{transformers_version}".encode("utf-8")).hexdigest()[:16]
+    safe_name = name.replace("/", "--")
+    return os.path.join(cache_dir, f"{safe_name}.int8.{key}.pt")
+
+
+def load_model(name: str, build_fp32: Callable, mode: str = "none", cache_dir: Optional[str] = None):
+    """
+    Build a model, quantized if requested, reusing a cached quantized copy
+
+    Args:
+        name: Model name (part of the cache key)
+        build_fp32: Callable returning the fp32 model
+        mode: "none" or "int8"
+        cache_dir: Directory for quantized weights (no caching when None)
+
+    Returns:
+        The fp32 model, or its int8 dynamically quantized version
+    """
+    if resolve_mode(mode) == "none":
+        return build_fp32()
+
+    import torch
+
+    path = cache_path(cache_dir, name) if cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            # Written by this service below; a full module pickle avoids
+            # reloading and re-quantizing the fp32 weights
+            model = torch.load(path, weights_only=False)
+            logger.info(f"Loaded int8 {name} from {path}")
+            return model
+        except Exception as e:
+            logger.error(f"Ignoring unreadable quantized cache {path}: {str(e)}")
+
+    model = quantize_int8(build_fp32())
+    logger.info(f"Quantized {name} to int8")
+
+    if path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp.{os.getpid()}"
+            torch.save(model, tmp_path)
+            os.replace(tmp_path, path)
+            logger.info(f"Cached int8 {name} at {path}")
+        except Exception as e:
+            logger.error(f"Could not cache quantized {name}: {str(e)}")
+
+    return model
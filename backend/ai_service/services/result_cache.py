@@ -0,0 +1,288 @@
+"""
+Result Cache - TTL + LRU cache of model results with in-flight request coalescing
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .embedding_cache import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+
+class _ComputationAbandoned(Exception):
+    """Set on a shared future whose computing request was cancelled"""
+
+
+class LocalRedis:
+    """
+    In-process stand-in for the subset of the redis client the cache uses
+
+    ``get``, ``mget`` and ``set`` with ``ex`` behave like redis-py with
+    ``decode_responses=False``, so the Redis path can be exercised without
+    a server.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value, ex: Optional[int] = None):
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+
+class ResultCache:
+    """
+    Cache of per-item model results with single-flight computation
+
+    The memory tier is an LRU of at most ``max_entries`` results, each
+    valid for ``ttl_seconds``. An optional Redis client is a second tier
+    shared by every worker; it is read only on a memory miss and its
+    failures are logged and treated as misses. Identical items requested
+    while a computation for them is running wait for that computation
+    instead of starting another; if the request running it is cancelled,
+    the waiters compute the items themselves. Lookups are counted per
+    endpoint.
+    """
+
+    def __init__(
+        self,
+        key_fn: Callable[[Any], str],
+        max_entries: int = 10000,
+        ttl_seconds: float = 3600,
+        redis_client=None,
+        namespace: str = "awaaz:result",
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ):
+        """
+        Args:
+            key_fn: Maps an item to its cache key (see ``make_key``)
+            max_entries: Results kept in memory
+            ttl_seconds: Lifetime of a cached result, in both tiers
+            redis_client: Optional redis client (or ``LocalRedis``)
+            namespace: Prefix of the Redis keys
+            cacheable: Predicate on results; False keeps a result out of
+                the cache (e.g. error fallbacks)
+        """
+        self.key_fn = key_fn
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis_client
+        self.namespace = namespace
+        self.cacheable = cacheable or (lambda result: True)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> future of the running computation; touched on the event loop only
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._evictions = 0
+        self._redis_errors = 0
+
+    @staticmethod
+    def make_key(version: str, *fields) -> str:
+        """Key of a result: model version plus the normalized input fields"""
+        normalized = "\0".join(EmbeddingCache.normalize(str(field or "")) for field in fields)
+        return hashlib.sha256(f"{version}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """Result from the memory tier, or None if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _redis_get_many(self, keys: List[str]) -> List:
+        try:
+            raw = self.redis.mget([f"{self.namespace}:{key}" for key in keys])
+            return [json.loads(value) if value is not None else None for value in raw]
+        except Exception as e:
+            self._redis_errors += 1
+            logger.warning(f"Result cache read from Redis failed: {str(e)}")
+            return [None] * len(keys)
+
+    def _redis_put_many(self, entries: Dict[str, Any]):
+        try:
+            for key, value in entries.items():
+                self.redis.set(f"{self.namespace}:{key}", json.dumps(value), ex=max(1, int(self.ttl_seconds)))
+        except Exception as e:
+            self._redis_errors += 1
+            logger.warning(f"Result cache write to Redis failed: {str(e)}")
+
+    def _count(self, endpoint: str, result: str, amount: int = 1):
+        if amount:
+            stats = self._stats.setdefault(endpoint, {'hits': 0, 'coalesced': 0, 'misses': 0})
+            stats[result] += amount
+
+    async def get_or_compute_many(
+        self,
+        items: List[Any],
+        compute_many: Callable[[List[Any]], Awaitable[List[Any]]],
+        endpoint: str = "default"
+    ) -> List[Any]:
+        """
+        Results for ``items``, computing only those not cached or in flight
+
+        Args:
+            items: Inputs, mapped to keys by ``key_fn``
+            compute_many: Coroutine function returning results for a list
+                of items, in order
+            endpoint: Label the lookups are counted under
+
+        Returns:
+            Results in the order of ``items``
+        """
+        keys = [self.key_fn(item) for item in items]
+        results: List[Any] = [None] * len(items)
+        found = [False] * len(items)
+        for idx, key in enumerate(keys):
+            value = self.get(key)
+            if value is not None:
+                results[idx], found[idx] = value, True
+
+        if self.redis is not None:
+            pending = sorted({key for key, hit in zip(keys, found) if not hit and key not in self._in_flight})
+            if pending:
+                loop = asyncio.get_running_loop()
+                remote = dict(zip(pending, await loop.run_in_executor(None, self._redis_get_many, pending)))
+                for idx, key in enumerate(keys):
+                    if not found[idx] and remote.get(key) is not None:
+                        results[idx], found[idx] = remote[key], True
+                        self.put(key, remote[key])
+        self._count(endpoint, 'hits', sum(found))
+
+        # Join computations already running; start one per remaining key
+        waiting: Dict[int, asyncio.Future] = {}
+        owned: Dict[str, asyncio.Future] = {}
+        to_compute: List[int] = []
+        for idx, key in enumerate(keys):
+            if found[idx]:
+                continue
+            future = self._in_flight.get(key) or owned.get(key)
+            if future is None:
+                future = owned[key] = self._in_flight[key] = asyncio.get_running_loop().create_future()
+                to_compute.append(idx)
+            else:
+                self._count(endpoint, 'coalesced')
+            waiting[idx] = future
+        self._count(endpoint, 'misses', len(to_compute))
+
+        if to_compute:
+            error: Optional[BaseException] = None
+            try:
+                computed = await compute_many([items[idx] for idx in to_compute])
+                if len(computed) != len(to_compute):
+                    raise ValueError(f"compute_many returned {len(computed)} results for {len(to_compute)} items")
+
+                fresh = {}
+                for idx, value in zip(to_compute, computed):
+                    key = keys[idx]
+                    if self.cacheable(value):
+                        self.put(key, value)
+                        fresh[key] = value
+                    self._in_flight.pop(key, None)
+                    owned[key].set_result(value)
+                if fresh and self.redis is not None:
+                    asyncio.get_running_loop().run_in_executor(None, self._redis_put_many, fresh)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                # No owned future may stay unresolved or in flight. A failed
+                # computation fails its waiters too; a cancelled one (or any
+                # non-Exception) only ends this request, so waiters are told
+                # to compute for themselves
+                shared = error if isinstance(error, Exception) else _ComputationAbandoned()
+                for key, future in owned.items():
+                    if self._in_flight.get(key) is future:
+                        del self._in_flight[key]
+                    if not future.done():
+                        future.set_exception(shared)
+                        # Retrieved here so an unjoined future does not warn
+                        future.exception()
+
+        abandoned = []
+        for idx, future in waiting.items():
+            try:
+                results[idx] = await asyncio.shield(future)
+            except _ComputationAbandoned:
+                abandoned.append(idx)
+        if abandoned:
+            # Their in-flight entries are gone; lead (or join) a new computation
+            recomputed = await self.get_or_compute_many([items[idx] for idx in abandoned], compute_many, endpoint)
+            for idx, value in zip(abandoned, recomputed):
+                results[idx] = value
+        return results
+
+    async def get_or_compute(self, item: Any, compute_one: Callable[[Any], Awaitable[Any]], endpoint: str = "default"):
+        """Single-item form of ``get_or_compute_many``"""
+        async def compute_many(items):
+            return [await compute_one(items[0])]
+
+        return (await self.get_or_compute_many([item], compute_many, endpoint))[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            entries = len(self._entries)
+        endpoints = {}
+        for endpoint, stats in list(self._stats.items()):
+            lookups = stats['hits'] + stats['coalesced'] + stats['misses']
+            endpoints[endpoint] = dict(
+                stats,
+                hit_ratio=round((stats['hits'] + stats['coalesced']) / lookups, 4) if lookups else 0.0
+            )
+        hits = sum(stats['hits'] + stats['coalesced'] for stats in endpoints.values())
+        lookups = hits + sum(stats['misses'] for stats in endpoints.values())
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'backend': "redis" if self.redis is not None else "memory",
+            'evictions': self._evictions,
+            'redis_errors': self._redis_errors,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+            'endpoints': endpoints
+        }
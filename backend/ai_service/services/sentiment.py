@@ -3,7 +3,14 @@ Sentiment Analysis Service - Analyze citizen sentiment in feedback
 """
 
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from .keyword_matcher import KeywordMatcher
+from .metrics import instrument_model, observe_batch, stage
+from .model_registry import ModelRegistry, default_registry
+from .quantization import load_model, mode_for_device, resolve_mode
 
 logger = logging.getLogger(__name__)
 
@@ -26,19 +33,80 @@ class SentimentService:
         'okay', 'normal', 'average', 'standard', 'adequate', 'acceptable'
     ]
     
-    def __init__(self):
-        self.sentiment_classifier = None
+    MODEL_NAME = "distilbert-base-uncased-finetuned-sst-2-english"
+    TASK = "sentiment-analysis"
+    
+    def __init__(
+        self,
+        batch_size: int = 16,
+        max_length: int = 512,
+        quantization: str = "none",
+        quantized_cache_dir: str = None,
+        registry: Optional[ModelRegistry] = None
+    ):
+        """
+        Args:
+            batch_size: Default number of texts per transformer forward pass
+            max_length: Token budget per text; longer texts are truncated
+                by the tokenizer
+            quantization: "int8" for dynamic int8 linear layers on CPU
+            quantized_cache_dir: Where quantized weights are cached
+            registry: Shared model registry (the process default when None)
+        """
+        self.quantization = resolve_mode(quantization)
+        self.quantized_cache_dir = quantized_cache_dir
+        self.registry = registry or default_registry
+        self._variant = self.quantization
+        # Keyword-only until the transformer has loaded once; after that an
+        # evicted model is reloaded on demand
+        self.use_transformer = False
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.matcher = KeywordMatcher({
+            'positive': self.POSITIVE_KEYWORDS,
+            'negative': self.NEGATIVE_KEYWORDS,
+            'neutral': self.NEUTRAL_KEYWORDS
+        })
     
     def load_models(self):
-        """Load sentiment analysis model"""
+        """Load sentiment analysis model through the shared registry"""
+        self.registry.get(self.MODEL_NAME, self.TASK, self._load_models, self._variant, owner="sentiment")
+        self.use_transformer = True
+    
+    @property
+    def sentiment_classifier(self):
+        """The sentiment pipeline if it is resident, else None"""
+        return self.registry.peek(self.MODEL_NAME, self.TASK, self._variant)
+    
+    def _transformer(self):
+        """Lease the sentiment pipeline from the registry, reloading it if evicted"""
+        return self.registry.use(self.MODEL_NAME, self.TASK, self._load_models, self._variant, owner="sentiment")
+    
+    def _load_models(self):
         try:
             from transformers import pipeline
             logger.info("Loading sentiment classifier")
-            self.sentiment_classifier = pipeline(
-                "sentiment-analysis",
-                model="distilbert-base-uncased-finetuned-sst-2-english"
+            
+            model, tokenizer = self.MODEL_NAME, None
+            # The pipeline runs on CPU (no device argument)
+            self.quantization = mode_for_device(self.quantization, "cpu")
+            if self.quantization != "none":
+                from transformers import AutoModelForSequenceClassification, AutoTokenizer
+                tokenizer = AutoTokenizer.from_pretrained(model)
+                model = load_model(
+                    model,
+                    lambda: AutoModelForSequenceClassification.from_pretrained(self.MODEL_NAME),
+                    self.quantization,
+                    self.quantized_cache_dir
+                )
+            
+            sentiment_classifier = pipeline(
+                self.TASK,
+                model=model,
+                tokenizer=tokenizer
             )
             logger.info("Sentiment classifier loaded successfully")
+            return instrument_model(sentiment_classifier, "sentiment")
         except Exception as e:
             logger.error(f"Failed to load sentiment model: {str(e)}")
             raise
@@ -62,32 +130,14 @@ class SentimentService:
                     'keywords': []
                 }
             
-            # Method 1: Simple keyword-based analysis (fallback)
-            sentiment, score = self._analyze_keywords(text)
+            # Method 1: Simple keyword-based analysis (fallback); one scan
+            # yields both the counts and the keywords
+            with stage("sentiment", "keywords"):
+                hits = self.matcher.find(text)
+                sentiment, score = self._score_hits(hits)
+                keywords = self._format_keywords(hits)
             
-            # Try to use transformer if available
-            if self.sentiment_classifier:
-                try:
-                    result = self.sentiment_classifier(text[:512])[0]  # Truncate for model
-                    # POSITIVE = positive sentiment, NEGATIVE = negative sentiment
-                    if result['label'] == 'POSITIVE':
-                        transformer_sentiment = 'Positive'
-                    else:
-                        transformer_sentiment = 'Negative'
-                    transformer_score = result['score']
-                    
-                    # Combine both approaches
-                    final_score = (score + transformer_score) / 2
-                    final_sentiment = self._determine_overall_sentiment(final_score)
-                except:
-                    final_sentiment = sentiment
-                    final_score = score
-            else:
-                final_sentiment = sentiment
-                final_score = score
-            
-            # Extract keywords
-            keywords = self._extract_keywords(text)
+            final_sentiment, final_score = self._with_transformer(text, sentiment, score)
             
             return {
                 'sentiment': final_sentiment,
@@ -105,14 +155,140 @@ class SentimentService:
                 'keywords': []
             }
     
-    def analyze_batch(self, texts: List[str]) -> List[Dict]:
-        """Analyze sentiment for multiple texts"""
+    def analyze_batch(self, texts: List[str], batch_size: int = None) -> List[Dict]:
+        """
+        Analyze sentiment for multiple texts
+        
+        Keywords are matched for the whole batch in one pass; the transformer,
+        if loaded, runs over length buckets of ``batch_size`` texts so padding
+        stays small. Each result equals what ``analyze`` returns for the text.
+        
+        Args:
+            texts: Texts to analyze
+            batch_size: Texts per transformer forward pass (defaults to the
+                service's batch_size)
+            
+        Returns:
+            List of sentiment dictionaries in input order
+        """
+        try:
+            with stage("sentiment", "keywords"):
+                sentiments, scores, keywords = self._keyword_batch(texts)
+        except Exception as e:
+            logger.error(f"Batch keyword analysis error: {str(e)}")
+            return [self.analyze(text) for text in texts]
+        
+        present = [idx for idx, text in enumerate(texts) if text and not text.isspace()]
+        transformer_scores = {}
+        if self.use_transformer and present:
+            transformer_scores = dict(zip(
+                present,
+                self._transformer_scores([texts[idx] for idx in present], batch_size or self.batch_size)
+            ))
+        
         results = []
-        for text in texts:
-            result = self.analyze(text)
-            results.append(result)
+        for idx, (text, sentiment, score, text_keywords) in enumerate(zip(texts, sentiments, scores, keywords)):
+            if not text or text.isspace():
+                results.append({'sentiment': 'Neutral', 'score': 0.0, 'confidence': 0.0, 'keywords': []})
+                continue
+            if transformer_scores.get(idx) is not None:
+                sentiment, score = self._combine(score, transformer_scores[idx])
+            results.append({
+                'sentiment': sentiment,
+                'score': round(score, 3),
+                'confidence': 0.7,  # Placeholder
+                'keywords': text_keywords
+            })
         return results
     
+    def _keyword_batch(self, texts: List[str]) -> tuple:
+        """
+        Keyword-only sentiment for many texts in one matcher pass
+        
+        Scores for all texts are computed at once from the per-text keyword
+        counts, with the same thresholds as ``_analyze_keywords``.
+        
+        Returns:
+            Tuple of (sentiments, scores, keywords) lists in input order
+        """
+        batch = self.matcher.match_batch(texts)
+        counts = batch['counts']
+        positive, negative = counts[:, 0], counts[:, 1]
+        total = counts.sum(axis=1)
+        
+        # Calculate weighted score (-1 to 1); texts without keywords score 0
+        scores = (positive - negative) / np.maximum(total, 1)
+        sentiments = np.where(scores > 0.3, 'Positive', np.where(scores < -0.3, 'Negative', 'Neutral'))
+        
+        # Hits come out in text order, so each text's hits are one slice
+        keywords = [[] for _ in texts]
+        boundaries = np.searchsorted(batch['text_index'], np.arange(len(texts) + 1)).tolist()
+        labels = self.matcher.labels
+        hit_labels = batch['label'].tolist()
+        for i in np.nonzero(np.diff(boundaries))[0].tolist():
+            start, end = boundaries[i], boundaries[i + 1]
+            keywords[i] = self._format_keywords(
+                (0, labels[code], keyword)
+                for code, keyword in zip(hit_labels[start:end], batch['keyword'][start:end])
+            )
+        
+        return sentiments.tolist(), scores.tolist(), keywords
+    
+    def _with_transformer(self, text: str, sentiment: str, score: float) -> tuple:
+        """Combine the keyword result with the transformer, if one is loaded"""
+        if not self.use_transformer:
+            return sentiment, score
+        try:
+            # Truncate to the model's token budget, not a character count
+            with self._transformer() as sentiment_classifier, stage("sentiment", "model_call"):
+                observe_batch("sentiment", 1)
+                result = sentiment_classifier(text, truncation=True, max_length=self.max_length)[0]
+            return self._combine(score, result['score'])
+        except:
+            return sentiment, score
+    
+    def _transformer_scores(self, texts: List[str], batch_size: int) -> List:
+        """
+        Transformer scores for non-empty texts, batched by similar length
+        
+        Returns:
+            Score per text, or None where its bucket failed (those texts keep
+            the keyword result)
+        """
+        scores = [None] * len(texts)
+        try:
+            with self._transformer() as sentiment_classifier:
+                for bucket in self._length_buckets(texts, batch_size):
+                    try:
+                        observe_batch("sentiment", len(bucket))
+                        with stage("sentiment", "model_call"):
+                            outputs = sentiment_classifier(
+                                [texts[idx] for idx in bucket],
+                                batch_size=batch_size,
+                                truncation=True,
+                                max_length=self.max_length
+                            )
+                        for idx, output in zip(bucket, outputs):
+                            scores[idx] = output['score']
+                    except Exception as e:
+                        logger.error(f"Batch sentiment model error: {str(e)}")
+        except Exception as e:
+            logger.error(f"Sentiment model unavailable: {str(e)}")
+        return scores
+    
+    def _combine(self, score: float, transformer_score: float) -> tuple:
+        """Average the keyword score with the transformer's label score"""
+        # The pipeline reports the probability of its predicted label
+        # (POSITIVE or NEGATIVE), which is averaged in as is
+        final_score = (score + transformer_score) / 2
+        return self._determine_overall_sentiment(final_score), final_score
+    
+    @staticmethod
+    def _length_buckets(texts: list, batch_size: int) -> list:
+        """Group text indices into batches of similar length"""
+        order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
+        return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+    
     def _analyze_keywords(self, text: str) -> tuple:
         """
         Simple keyword-based sentiment analysis
@@ -120,28 +296,23 @@ class SentimentService:
         Returns:
             Tuple of (sentiment, score)
         """
-        text_lower = text.lower()
-        
-        positive_count = sum(1 for word in self.POSITIVE_KEYWORDS if word in text_lower)
-        negative_count = sum(1 for word in self.NEGATIVE_KEYWORDS if word in text_lower)
-        neutral_count = sum(1 for word in self.NEUTRAL_KEYWORDS if word in text_lower)
+        return self._score_hits(self.matcher.find(text))
+    
+    def _score_hits(self, hits) -> tuple:
+        """(sentiment, score) from keyword occurrences"""
+        counts = {'positive': 0, 'negative': 0, 'neutral': 0}
+        for _, label, _ in hits:
+            counts[label] += 1
         
-        total = positive_count + negative_count + neutral_count
+        total = sum(counts.values())
         
         if total == 0:
             return 'Neutral', 0.0
         
         # Calculate weighted score (-1 to 1)
-        score = (positive_count - negative_count) / total
+        score = (counts['positive'] - counts['negative']) / total
         
-        if score > 0.3:
-            sentiment = 'Positive'
-        elif score < -0.3:
-            sentiment = 'Negative'
-        else:
-            sentiment = 'Neutral'
-        
-        return sentiment, score
+        return self._determine_overall_sentiment(score), score
     
     def _determine_overall_sentiment(self, score: float) -> str:
         """Determine sentiment from score (-1 to 1)"""
@@ -154,15 +325,16 @@ class SentimentService:
     
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract sentiment-bearing keywords from text"""
-        text_lower = text.lower()
-        found_keywords = []
-        
-        for word in self.POSITIVE_KEYWORDS:
-            if word in text_lower:
-                found_keywords.append(f"+{word}")
-        
-        for word in self.NEGATIVE_KEYWORDS:
-            if word in text_lower:
-                found_keywords.append(f"-{word}")
+        return self._format_keywords(self.matcher.find(text))
+    
+    @staticmethod
+    def _format_keywords(hits) -> List[str]:
+        """Distinct positive then negative keywords, in order of appearance"""
+        positive, negative = {}, {}
+        for _, label, keyword in hits:
+            if label == 'positive':
+                positive[f"+{keyword}"] = None
+            elif label == 'negative':
+                negative[f"-{keyword}"] = None
         
-        return found_keywords[:5]  # Return top 5
+        return (list(positive) + list(negative))[:5]  # Return top 5
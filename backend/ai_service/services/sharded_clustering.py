@@ -0,0 +1,307 @@
+"""
+Sharded Clustering - Split clustering by geohash cell and category
+"""
+
+import logging
+from collections import deque
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .graph_clustering import UnionFind, threshold_components
+
+logger = logging.getLogger(__name__)
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """(lat, lng) extent in degrees of a geohash cell"""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def geohash_grid(lats: np.ndarray, lngs: np.ndarray, precision: int = 6) -> Tuple[np.ndarray, np.ndarray, int, int]:
+    """
+    Integer (row, column) of each point on the geohash grid
+
+    A geohash of a given precision is just the bit-interleaving of these two
+    indices, so grouping by them groups by geohash cell without building
+    strings.
+
+    Returns:
+        (rows, cols, n_rows, n_cols)
+    """
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    n_rows, n_cols = 1 << lat_bits, 1 << lng_bits
+    dlat, dlng = geohash_cell_size(precision)
+    rows = np.clip(np.floor((lats + 90.0) / dlat), 0, n_rows - 1).astype(np.int64)
+    cols = np.floor((lngs + 180.0) / dlng).astype(np.int64) % n_cols
+    return rows, cols, n_rows, n_cols
+
+
+def parse_location(issue: Dict) -> Optional[Tuple[float, float]]:
+    """
+    Read (lat, lng) from an issue dict
+
+    Accepts GeoJSON ``{"coordinates": [lng, lat]}`` as stored by the backend,
+    ``{"lat": .., "lng": ..}`` or top-level ``latitude``/``longitude``.
+    """
+    location = issue.get('location')
+    try:
+        if isinstance(location, dict):
+            if location.get('coordinates'):
+                lng, lat = location['coordinates'][:2]
+                return float(lat), float(lng)
+            if 'lat' in location:
+                return float(location['lat']), float(location.get('lng', location.get('lon')))
+        if issue.get('latitude') is not None and issue.get('longitude') is not None:
+            return float(issue['latitude']), float(issue['longitude'])
+    except (TypeError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _grid_cells(
+    locations: Sequence[Optional[Tuple[float, float]]],
+    categories: Sequence[Optional[str]],
+    precision: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int, int]:
+    """
+    Category code and geohash (row, column) of each issue
+
+    Issues without a location get the extra row ``n_rows`` and column 0,
+    so they shard by category only.
+
+    Returns:
+        (category_codes, rows, cols, has_location, n_rows, n_cols)
+    """
+    _, category_codes = np.unique(
+        np.array(["" if c is None else str(c) for c in categories]),
+        return_inverse=True
+    )
+    has_location = np.array([location is not None for location in locations], dtype=bool)
+    lats = np.array([location[0] if location else 0.0 for location in locations])
+    lngs = np.array([location[1] if location else 0.0 for location in locations])
+
+    rows, cols, n_rows, n_cols = geohash_grid(lats, lngs, precision)
+    rows = np.where(has_location, rows, n_rows)
+    cols = np.where(has_location, cols, 0)
+    return category_codes.astype(np.int64), rows, cols, has_location, n_rows, n_cols
+
+
+def _cell_ids(codes: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Dense integer id of each (category, row, column) triple
+
+    Ids come from np.unique over the stacked triples rather than packing
+    them into one int64, which would overflow at high precision.
+    """
+    _, ids = np.unique(np.stack([codes, rows, cols], axis=1), axis=0, return_inverse=True)
+    return ids.reshape(-1)
+
+
+def shard_keys(
+    locations: Sequence[Optional[Tuple[float, float]]],
+    categories: Sequence[Optional[str]],
+    precision: int = 6
+) -> np.ndarray:
+    """
+    Integer (category, geohash cell) key of each issue, without halo
+
+    Issues without a location get a key per category alone.
+    """
+    codes, rows, cols, _, _, _ = _grid_cells(locations, categories, precision)
+    return _cell_ids(codes, rows, cols)
+
+
+def plan_shards(
+    locations: Sequence[Optional[Tuple[float, float]]],
+    categories: Sequence[Optional[str]],
+    precision: int = 6
+) -> Tuple[List[np.ndarray], List[int]]:
+    """
+    Partition issues into (category, geohash cell) shards with halo overlap
+
+    A shard holds the issues of its home cell followed by a halo of those
+    in the forward half of its neighbours (east, north-east, north,
+    north-west), and compares only pairs involving a home issue. Every
+    pair of adjacent cells is the home/forward pair of exactly one shard,
+    so any two issues in the same or adjacent cells are compared once,
+    and each located issue is copied into at most 4 other shards (instead
+    of 8). Issues without a location are sharded by category alone.
+
+    Returns:
+        (shards, homes): index arrays, home issues first, one per
+        non-trivial shard, and the number of home issues in each
+    """
+    n = len(locations)
+    if n == 0:
+        return [], []
+
+    category_codes, rows, cols, has_location, _, n_cols = _grid_cells(locations, categories, precision)
+
+    # A located issue is the E / NE / N / NW neighbour of the cells at
+    # W / SW / S / SE of it, so it is copied into those shards
+    member_idx = [np.arange(n)]
+    member_rows, member_cols = [rows], [cols]
+    member_halo = [np.zeros(n, dtype=bool)]
+    located = np.nonzero(has_location)[0]
+    for di, dj in ((0, -1), (-1, -1), (-1, 0), (-1, 1)):
+        r = rows[located] + di
+        valid = r >= 0
+        neighbours = located[valid]
+        member_idx.append(neighbours)
+        member_rows.append(r[valid])
+        member_cols.append((cols[neighbours] + dj) % n_cols)
+        member_halo.append(np.ones(len(neighbours), dtype=bool))
+
+    member_idx = np.concatenate(member_idx)
+    member_halo = np.concatenate(member_halo)
+    member_keys = _cell_ids(
+        category_codes[member_idx],
+        np.concatenate(member_rows),
+        np.concatenate(member_cols)
+    )
+
+    # Only cells that are somebody's home become shards
+    keep = np.isin(member_keys, np.unique(member_keys[:n]))
+    member_idx, member_keys, member_halo = member_idx[keep], member_keys[keep], member_halo[keep]
+
+    order = np.lexsort((member_idx, member_halo, member_keys))
+    member_idx, member_keys, member_halo = member_idx[order], member_keys[order], member_halo[order]
+    boundaries = np.nonzero(np.diff(member_keys))[0] + 1
+    home_counts = np.add.reduceat(~member_halo, np.concatenate([[0], boundaries]))
+
+    shards, homes = [], []
+    for indices, home in zip(np.split(member_idx, boundaries), home_counts):
+        if len(indices) > 1:
+            shards.append(indices)
+            homes.append(int(home))
+    return shards, homes
+
+
+def cluster_shard(
+    embeddings,
+    similarity_threshold: float,
+    memory_budget_mb: float = 256,
+    home: Optional[int] = None
+) -> np.ndarray:
+    """Picklable per-shard clustering task for a process pool"""
+    return threshold_components(embeddings, similarity_threshold, memory_budget_mb=memory_budget_mb, home=home)
+
+
+def cluster_shard_group(
+    shards: List[Tuple[np.ndarray, int]],
+    similarity_threshold: float,
+    memory_budget_mb: float = 256
+) -> List[np.ndarray]:
+    """Picklable task clustering several small (embeddings, home) shards in one process pool call"""
+    return [cluster_shard(X, similarity_threshold, memory_budget_mb, home) for X, home in shards]
+
+
+def pack_shards(shards: List[np.ndarray], max_rows: int) -> List[Tuple[int, int]]:
+    """
+    Group consecutive shards into tasks of at most ``max_rows`` rows
+
+    Each task costs a process pool round trip (pickling, scheduling), which
+    dominates for the many tiny shards a city produces. A shard larger than
+    ``max_rows`` gets a task of its own.
+
+    Returns:
+        (start, stop) ranges over ``shards``, in order
+    """
+    groups = []
+    start = rows = 0
+    for idx, indices in enumerate(shards):
+        if idx > start and rows + len(indices) > max_rows:
+            groups.append((start, idx))
+            start, rows = idx, 0
+        rows += len(indices)
+    if start < len(shards):
+        groups.append((start, len(shards)))
+    return groups
+
+
+def iter_shard_groups(X: np.ndarray, shards: List[np.ndarray], homes: List[int], groups: List[Tuple[int, int]]):
+    """(embeddings, home) slices of each packed task, built only when the task is submitted"""
+    for start, stop in groups:
+        yield [(X[shards[idx]], homes[idx]) for idx in range(start, stop)]
+
+
+def _map_bounded(executor, fn: Callable, inputs, max_in_flight: int) -> List:
+    """Ordered ``executor.map`` that submits at most ``max_in_flight`` calls ahead"""
+    results = []
+    pending: deque = deque()
+    for item in inputs:
+        if len(pending) >= max_in_flight:
+            results.append(pending.popleft().result())
+        pending.append(executor.submit(fn, item))
+    results.extend(future.result() for future in pending)
+    return results
+
+
+def merge_shard_labels(n: int, shards: List[np.ndarray], shard_labels: List[np.ndarray]) -> np.ndarray:
+    """
+    Merge per-shard components into global cluster labels
+
+    An issue that appears in several shards (through halo overlap) joins
+    every component it belongs to, which stitches clusters across borders.
+
+    Returns:
+        (n,) labels numbered 0.. in order of first appearance
+    """
+    uf = UnionFind(n)
+    for indices, labels in zip(shards, shard_labels):
+        labels = np.asarray(labels)
+        _, first = np.unique(labels, return_index=True)
+        representative = np.empty(labels.max() + 1, dtype=np.int64)
+        representative[labels[first]] = indices[first]
+        uf.union(indices, representative[labels])
+
+    roots = uf.labels()
+    _, first_seen, inverse = np.unique(roots, return_index=True, return_inverse=True)
+    return np.argsort(np.argsort(first_seen))[inverse]
+
+
+def cluster_sharded(
+    embeddings,
+    locations: Sequence[Optional[Tuple[float, float]]],
+    categories: Sequence[Optional[str]],
+    similarity_threshold: float = 0.75,
+    precision: int = 6,
+    memory_budget_mb: float = 256,
+    executor=None,
+    task_rows: int = 4096,
+    max_in_flight: int = 8
+) -> np.ndarray:
+    """
+    Cluster issues shard by shard, optionally in parallel
+
+    Args:
+        embeddings: (n, dim) embedding matrix
+        locations: (lat, lng) or None per issue
+        categories: Category (or None) per issue
+        similarity_threshold: Minimum cosine similarity for a link
+        precision: Geohash precision (6 ~ 1.2 km x 0.6 km cells)
+        memory_budget_mb: Per-shard tile budget
+        executor: Optional concurrent.futures executor to map shards over
+        task_rows: Rows of small shards packed into one executor task
+        max_in_flight: Tasks submitted to the executor ahead of their
+            results, which bounds the embedding slices held at once
+
+    Returns:
+        (n,) cluster labels
+    """
+    X = np.asarray(embeddings, dtype=np.float32)
+    shards, homes = plan_shards(locations, categories, precision)
+    groups = pack_shards(shards, task_rows)
+    task = partial(cluster_shard_group, similarity_threshold=similarity_threshold, memory_budget_mb=memory_budget_mb)
+    inputs = iter_shard_groups(X, shards, homes, groups)
+    if executor is None:
+        group_labels = [task(group) for group in inputs]
+    else:
+        group_labels = _map_bounded(executor, task, inputs, max_in_flight)
+    shard_labels = [labels for group in group_labels for labels in group]
+    logger.info(f"Clustered {len(X)} issues in {len(shards)} shards ({len(groups)} tasks)")
+    return merge_shard_labels(len(X), shards, shard_labels)
@@ -0,0 +1,145 @@
+"""
+NDJSON Streaming - Process newline-delimited JSON in bounded micro-batches
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes], max_line_bytes: int = 1024 * 1024) -> AsyncIterator[Tuple[int, Any, Optional[str]]]:
+    """
+    Split a byte stream into JSON records
+
+    A line longer than ``max_line_bytes`` is not buffered: it yields an
+    error record as soon as it crosses the limit and the rest of it is
+    discarded up to the next newline, so one oversized record does not
+    end the stream.
+
+    Yields:
+        (index, value, error) per non-blank line; value is None when the
+        line could not be parsed or was too long, and error says why
+    """
+    buffer = b""
+    index = 0
+    skipping = False
+    too_long = f"Line exceeds {max_line_bytes} bytes"
+
+    async for chunk in chunks:
+        if skipping:
+            end = chunk.find(b"\n")
+            if end < 0:
+                continue
+            chunk = chunk[end + 1:]
+            skipping = False
+
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if len(line) > max_line_bytes:
+                yield index, None, too_long
+                index += 1
+            elif line.strip():
+                yield (index, *_parse_line(line))
+                index += 1
+        if len(buffer) > max_line_bytes:
+            yield index, None, too_long
+            index += 1
+            buffer = b""
+            skipping = True
+
+    if buffer.strip():
+        yield (index, *_parse_line(buffer))
+
+
+def _parse_line(line: bytes) -> Tuple[Any, Optional[str]]:
+    try:
+        return json.loads(line), None
+    except ValueError as e:
+        return None, f"Invalid JSON: {str(e)}"
+
+
+async def stream_ndjson(
+    chunks: AsyncIterator[bytes],
+    handler: Callable[[List[Any]], Awaitable[List[Any]]],
+    parse: Callable[[Any], Any] = lambda value: value,
+    batch_size: int = 32,
+    max_in_flight: int = 2
+) -> AsyncIterator[bytes]:
+    """
+    Stream NDJSON results for NDJSON input, one micro-batch at a time
+
+    At most ``max_in_flight`` micro-batches are being processed at once;
+    input is not read further until the oldest finishes, so memory stays
+    constant regardless of stream length. Output preserves input order and
+    every input line produces exactly one output line, either
+    ``{"index": i, "result": ...}`` or ``{"index": i, "error": "..."}``.
+
+    Args:
+        chunks: Request body chunks
+        handler: Coroutine mapping a list of parsed items to results
+        parse: Converts one JSON value into a handler item (may raise)
+        batch_size: Items per handler call
+        max_in_flight: Micro-batches processed concurrently
+
+    Yields:
+        Encoded NDJSON lines
+    """
+    batch_size = max(1, batch_size)
+    max_in_flight = max(1, max_in_flight)
+    pending: deque = deque()
+    batch = []
+
+    async def run(records):
+        parsed = []
+        for index, value, error in records:
+            item = None
+            if error is None:
+                try:
+                    item = parse(value)
+                except Exception as e:
+                    error = str(e)
+            parsed.append((index, item, error))
+
+        valid = [(index, item) for index, item, error in parsed if error is None]
+        outputs = {}
+        if valid:
+            try:
+                results = await handler([item for _, item in valid])
+                outputs = {index: {"index": index, "result": result} for (index, _), result in zip(valid, results)}
+            except Exception as e:
+                logger.error(f"Streaming batch error: {str(e)}")
+                outputs = {index: {"index": index, "error": str(e)} for index, _ in valid}
+
+        return b"".join(
+            (json.dumps(outputs[index] if error is None else {"index": index, "error": error}) + "\n").encode("utf-8")
+            for index, _, error in parsed
+        )
+
+    try:
+        async for record in iter_ndjson(chunks):
+            batch.append(record)
+            if len(batch) < batch_size:
+                continue
+
+            pending.append(asyncio.create_task(run(batch)))
+            batch = []
+
+            # Emit whatever is already finished, then apply backpressure
+            while pending and pending[0].done():
+                yield pending.popleft().result()
+            while len(pending) >= max_in_flight:
+                yield await pending.popleft()
+
+        if batch:
+            pending.append(asyncio.create_task(run(batch)))
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # Client went away mid-stream
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,430 @@
+"""
+Vector Index - Persistent IVF approximate-nearest-neighbour search over issue embeddings
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def claim_snapshot_owner(path: str):
+    """
+    Take the lock that makes this process the writer of the snapshot at ``path``
+
+    Each HTTP worker holds its own index; only the lock holder saves, so
+    workers do not overwrite each other's snapshots. The lock lasts until
+    the returned handle is closed or the process exits.
+
+    Returns:
+        Open lock file, or None if another process holds the lock
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    handle = open(f"{path}.lock", "a")
+    try:
+        import fcntl
+    except ImportError:
+        # No advisory locks (Windows): assume a single worker
+        return handle
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+class _InvertedList:
+    """Growable block of vectors and their issue IDs for one coarse cell"""
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.vectors = np.empty((capacity, dim), dtype=np.float32)
+        self.ids: List[str] = []
+
+    @classmethod
+    def from_block(cls, ids: List[str], vectors: np.ndarray) -> "_InvertedList":
+        lst = cls(vectors.shape[1], max(64, len(ids)))
+        lst.vectors[:len(ids)] = vectors
+        lst.ids = list(ids)
+        return lst
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    def append(self, issue_id: str, vector: np.ndarray) -> int:
+        if self.size == len(self.vectors):
+            grown = np.empty((max(64, 2 * len(self.vectors)), self.vectors.shape[1]), dtype=np.float32)
+            grown[:self.size] = self.vectors[:self.size]
+            self.vectors = grown
+        self.vectors[self.size] = vector
+        self.ids.append(issue_id)
+        return self.size - 1
+
+    def remove(self, pos: int) -> Optional[str]:
+        """Swap-remove the entry at ``pos``; returns the ID that moved into it"""
+        last = self.size - 1
+        moved = None
+        if pos != last:
+            self.vectors[pos] = self.vectors[last]
+            self.ids[pos] = self.ids[last]
+            moved = self.ids[pos]
+        self.ids.pop()
+        return moved
+
+    def view(self) -> np.ndarray:
+        return self.vectors[:self.size]
+
+
+class VectorIndex:
+    """
+    Inverted-file (IVF) index with a spherical k-means coarse quantizer
+
+    Vectors are L2-normalized so inner product equals cosine similarity.
+    Until ``train_threshold`` vectors are indexed everything lives in one
+    list and search is exact. After training, a query scans only the
+    ``n_probe`` cells whose centroids are closest. Inserts and deletes by
+    issue ID are incremental; the index retrains itself in a background
+    thread once it has grown ``retrain_growth`` times past the size it was
+    trained on, and keeps serving from the current cells meanwhile.
+    """
+
+    def __init__(
+        self,
+        dim: int = 384,
+        n_lists: int = 1024,
+        n_probe: int = 16,
+        train_threshold: int = 20000,
+        retrain_growth: float = 4.0
+    ):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_threshold = train_threshold
+        self.retrain_growth = retrain_growth
+
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[_InvertedList] = [_InvertedList(dim)]
+        self.locations: Dict[str, Tuple[int, int]] = {}
+        self.trained_size = 0
+        self._lock = threading.RLock()
+
+        # One training at a time; IDs added or removed while one runs are
+        # replayed onto its cells when they are swapped in
+        self._train_lock = threading.Lock()
+        self._trainer: Optional[threading.Thread] = None
+        self._changed: Optional[set] = None
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        X = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        return X / (np.linalg.norm(X, axis=1, keepdims=True) + 1e-10)
+
+    def _assign(self, X: np.ndarray, centroids: Optional[np.ndarray] = None, block: int = 8192) -> np.ndarray:
+        if centroids is None:
+            centroids = self.centroids
+        if centroids is None:
+            return np.zeros(len(X), dtype=np.int64)
+        return np.concatenate([
+            np.argmax(X[i:i + block] @ centroids.T, axis=1)
+            for i in range(0, len(X), block)
+        ]) if len(X) else np.zeros(0, dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def add(self, ids: List[str], vectors) -> int:
+        """
+        Insert or replace vectors by issue ID
+
+        An ID repeated within the batch is indexed once, with its last
+        vector. Crossing the training size starts (re)training in a
+        background thread.
+
+        Returns:
+            Number of vectors indexed
+        """
+        if len(ids) == 0:
+            return 0
+        X = self._normalize(vectors)
+        if X.shape != (len(ids), self.dim):
+            raise ValueError(f"Expected {len(ids)} vectors of dimension {self.dim}, got {X.shape}")
+
+        # Last occurrence of each ID wins
+        rows = {str(issue_id): row for row, issue_id in enumerate(ids)}
+        ids = list(rows)
+        if len(ids) < len(X):
+            X = X[np.fromiter(rows.values(), dtype=np.int64, count=len(ids))]
+
+        with self._lock:
+            for issue_id in ids:
+                if issue_id in self.locations:
+                    self._remove_locked(issue_id)
+
+            for issue_id, cell, vector in zip(ids, self._assign(X), X):
+                pos = self.lists[cell].append(issue_id, vector)
+                self.locations[issue_id] = (int(cell), pos)
+            if self._changed is not None:
+                self._changed.update(ids)
+
+            if self._needs_training():
+                self._train_in_background()
+
+        return len(ids)
+
+    def remove(self, issue_id: str) -> bool:
+        """Delete one issue from the index; returns False if it was absent"""
+        with self._lock:
+            if issue_id not in self.locations:
+                return False
+            self._remove_locked(issue_id)
+            if self._changed is not None:
+                self._changed.add(issue_id)
+            return True
+
+    def _remove_locked(self, issue_id: str):
+        self._remove_from(self.lists, self.locations, issue_id)
+
+    @staticmethod
+    def _remove_from(lists: List[_InvertedList], locations: Dict[str, Tuple[int, int]], issue_id: str):
+        cell, pos = locations.pop(issue_id)
+        moved = lists[cell].remove(pos)
+        if moved is not None:
+            locations[moved] = (cell, pos)
+
+    def _needs_training(self) -> bool:
+        size = len(self)
+        if size < max(self.train_threshold, self.n_lists):
+            return False
+        return not self.is_trained or size >= self.trained_size * self.retrain_growth
+
+    def _train_in_background(self):
+        if self._trainer is not None and self._trainer.is_alive():
+            return
+        self._trainer = threading.Thread(target=self._train_logged, name="vector-index-train", daemon=True)
+        self._trainer.start()
+
+    def _train_logged(self):
+        try:
+            self.train()
+        except Exception as e:
+            logger.error(f"IVF index training failed: {str(e)}")
+
+    def wait_for_training(self, timeout: Optional[float] = None):
+        """Block until a background training started by ``add`` has finished"""
+        trainer = self._trainer
+        if trainer is not None:
+            trainer.join(timeout)
+
+    def train(self, iterations: int = 10, sample_size: int = 100000, seed: int = 0):
+        """
+        (Re)build the coarse quantizer with spherical k-means and reassign all vectors
+
+        k-means, the reassignment and building the new cells run on a
+        snapshot without holding the index lock, so searches and inserts
+        continue against the current cells. Under the lock, only the IDs
+        added or removed since the snapshot are replayed onto the new cells
+        before they are swapped in.
+        """
+        with self._train_lock:
+            started = time.perf_counter()
+            with self._lock:
+                ids, X = self._all_locked()
+                self._changed = set()
+            n_lists = min(self.n_lists, len(ids))
+            if n_lists == 0:
+                with self._lock:
+                    self._changed = None
+                return
+
+            rng = np.random.default_rng(seed)
+            sample = X[rng.choice(len(X), size=min(sample_size, len(X)), replace=False)]
+            centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+
+            for _ in range(iterations):
+                assignment = self._assign(sample, centroids)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sample)
+                counts = np.bincount(assignment, minlength=n_lists)
+                empty = counts == 0
+                # Reseed empty cells from random points so no centroid is wasted
+                sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+                centroids = self._normalize(sums)
+
+            # Group the snapshot by cell: one sort instead of an append per vector
+            cells = self._assign(X, centroids)
+            order = np.argsort(cells, kind="stable")
+            sorted_cells = cells[order]
+            starts = np.searchsorted(sorted_cells, np.arange(n_lists + 1))
+            sorted_ids = [ids[row] for row in order]
+            lists = [
+                _InvertedList.from_block(sorted_ids[starts[cell]:starts[cell + 1]], X[order[starts[cell]:starts[cell + 1]]])
+                for cell in range(n_lists)
+            ]
+            positions = np.arange(len(ids)) - starts[sorted_cells]
+            locations = dict(zip(sorted_ids, zip(sorted_cells.tolist(), positions.tolist())))
+
+            with self._lock:
+                changed, self._changed = self._changed, None
+                for issue_id in changed:
+                    if issue_id in locations:
+                        self._remove_from(lists, locations, issue_id)
+                live = [issue_id for issue_id in changed if issue_id in self.locations]
+                if live:
+                    V = np.stack([self.lists[cell].vectors[pos] for cell, pos in (self.locations[i] for i in live)])
+                    for issue_id, cell, vector in zip(live, self._assign(V, centroids), V):
+                        pos = lists[cell].append(issue_id, vector)
+                        locations[issue_id] = (int(cell), pos)
+
+                self.centroids = centroids
+                self.lists = lists
+                self.locations = locations
+                self.trained_size = len(locations)
+
+            logger.info(
+                f"Trained IVF index: {len(locations)} vectors, {n_lists} lists "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+
+    def _all_locked(self) -> Tuple[List[str], np.ndarray]:
+        ids = [issue_id for lst in self.lists for issue_id in lst.ids]
+        vectors = [lst.view() for lst in self.lists if lst.size]
+        X = np.concatenate(vectors) if vectors else np.empty((0, self.dim), dtype=np.float32)
+        return ids, X
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query,
+        top_k: int = 5,
+        min_similarity: float = 0.0,
+        n_probe: Optional[int] = None,
+        exact: bool = False
+    ) -> List[Dict]:
+        """
+        Find the most similar indexed issues
+
+        Args:
+            query: Query embedding
+            top_k: Number of neighbours to return
+            min_similarity: Minimum cosine similarity
+            n_probe: Cells to scan (defaults to self.n_probe)
+            exact: Scan every cell (brute force)
+
+        Returns:
+            List of dicts with 'issue_id' and 'similarity', best first
+
+        Raises:
+            ValueError: The query is not one vector of dimension ``dim``
+        """
+        q = self._normalize(query)
+        if q.shape != (1, self.dim):
+            raise ValueError(f"Expected a query vector of dimension {self.dim}, got {q.shape}")
+        q = q[0]
+
+        with self._lock:
+            if exact or not self.is_trained:
+                cells = range(len(self.lists))
+            else:
+                probe = min(n_probe or self.n_probe, len(self.lists))
+                cells = np.argpartition(-(self.centroids @ q), probe - 1)[:probe]
+
+            candidates = [self.lists[cell] for cell in cells if self.lists[cell].size]
+            if not candidates:
+                return []
+            ids = [issue_id for lst in candidates for issue_id in lst.ids]
+            similarities = np.concatenate([lst.view() @ q for lst in candidates])
+
+        k = min(top_k, len(ids))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+
+        return [
+            {'issue_id': ids[idx], 'similarity': float(similarities[idx])}
+            for idx in top
+            if similarities[idx] >= min_similarity
+        ]
+
+    def recall_at_k(self, queries, top_k: int = 10, n_probe: Optional[int] = None) -> float:
+        """Mean overlap between approximate and exact top-k for the given queries"""
+        hits = 0
+        total = 0
+        for query in np.atleast_2d(np.asarray(queries, dtype=np.float32)):
+            exact = {r['issue_id'] for r in self.search(query, top_k, -1.0, exact=True)}
+            approx = {r['issue_id'] for r in self.search(query, top_k, -1.0, n_probe=n_probe)}
+            hits += len(exact & approx)
+            total += len(exact)
+        return hits / total if total else 0.0
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str):
+        """Snapshot the index to a ``.npz`` file (written atomically)"""
+        with self._lock:
+            ids, X = self._all_locked()
+            cells = np.array([self.locations[issue_id][0] for issue_id in ids], dtype=np.int64)
+            centroids = self.centroids if self.centroids is not None else np.empty((0, self.dim), dtype=np.float32)
+            trained_size = self.trained_size
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            ids=np.array(ids, dtype=str),
+            vectors=X,
+            cells=cells,
+            centroids=centroids,
+            config=np.array([self.dim, self.n_lists, self.n_probe, self.train_threshold, trained_size]),
+            retrain_growth=np.array(self.retrain_growth)
+        )
+        os.replace(tmp_path, path)
+        logger.info(f"Saved vector index ({len(ids)} vectors) to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "VectorIndex":
+        data = np.load(path, allow_pickle=False)
+        dim, n_lists, n_probe, train_threshold, trained_size = (int(v) for v in data['config'])
+        index = cls(dim, n_lists, n_probe, train_threshold, float(data['retrain_growth']))
+
+        if len(data['centroids']):
+            index.centroids = data['centroids'].astype(np.float32)
+            index.lists = [_InvertedList(dim) for _ in range(len(index.centroids))]
+        index.trained_size = trained_size
+
+        for issue_id, cell, vector in zip(data['ids'], data['cells'], data['vectors']):
+            pos = index.lists[cell].append(str(issue_id), vector)
+            index.locations[str(issue_id)] = (int(cell), pos)
+
+        logger.info(f"Loaded vector index ({len(index)} vectors) from {path}")
+        return index
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            sizes = [lst.size for lst in self.lists]
+            return {
+                'vectors': len(self),
+                'dimension': self.dim,
+                'trained': self.is_trained,
+                'lists': len(self.lists),
+                'n_probe': self.n_probe,
+                'largest_list': max(sizes) if sizes else 0,
+                'memory_bytes': sum(lst.vectors.nbytes for lst in self.lists)
+            }